@@ -1,28 +1,37 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
 import pandas as pd
-import numpy as np
-import yfinance as yf
 from datetime import datetime, timedelta
 
+from indicators import Indicators
+from instrumentation import start_run
+from output import open_sink, read_table, write_table
+from pipeline import STREAM_CHUNK, chunked, stream_prices
+from price_store import default_store
+from strategy_engine import trade_indices, trade_rows
+from timeframes import Timeframes
+from trade_stats import build_report, summary, write_report
+from health import TickerHealth
+from universe import load_universe
+
 # ==========================================================
 # 1. TICKER-UNIVERSUM
 # ==========================================================
 
-TICKERS = [
-    "AAPL","ADBE","ADI","ADP","ADSK","ALGN","ALXN","AMAT","AMGN","AMD","AMZN",
-    "ANSS","ASML","ATVI","AVGO","BIDU","BIIB","BMRN","BKNG","CDNS","CDW","CERN",
-    "CHKP","CHTR","CMCSA","CPRT","COST","CSCO","CSGP","CSX","CTAS","CTSH","CTXS",
-    "DLTR","DXCM","EA","EBAY","EXC","EXPE","FAST","FB","FISV","FOX","FOXA",
-    "GILD","GOOG","GOOGL","IDXX","ILMN","INCY","INTC","INTU","ISRG","JD","KHC",
-    "KLAC","LBTYA","LBTYK","LRCX","LULU","MAR","MCHP","MDLZ","MELI","META",
-    "MNST","MRVL","MU","NFLX","NTAP","NTES","NVDA","NXPI","ORLY","PAYX","PCAR",
-    "PEP","PYPL","QCOM","REGN","ROST","SBUX","SIRI","SGEN","SNPS","SPLK","TCOM",
-    "TMUS","TSLA","TTWO","TXN","ULTA","VRSK","VRSN","VRTX","XLNX"
-]
+# universes/nasdaq100_2021.csv (Zusammensetzung 2021), UNIVERSES=... überschreibt;
+# delistete Symbole (universes/delisted.csv) und pausierte Ticker (health.py) werden übersprungen.
+# Erst beim Aufruf geladen, damit der Import des Moduls nichts liest und nichts ausgibt
+UNIVERSE = "nasdaq100_2021"
+
+
+def load_tickers(health=None):
+    # Ohne eigenen Health-Cache: gespeicherten Stand nur lesen
+    tickers = load_universe(UNIVERSE, health if health is not None else TickerHealth())
+    print(f"Universum geladen: {len(tickers)} Aktien")
+    return tickers
 
-print(f"Universum geladen: {len(TICKERS)} Aktien")
 
 # ==========================================================
 # 2. ZEITRAUM
@@ -33,57 +42,47 @@ HISTORY_START = pd.Timestamp("2016-01-01")
 EXIT_DATE = pd.Timestamp.today().normalize()
 
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-OUTPUT_FILE = f"daily_backtest_{timestamp}.xlsx"
-MISSING_FILE = f"missing_tickers_{timestamp}.xlsx"
-
-# ==========================================================
-# 3. INDICATORS (DAILY)
-# ==========================================================
-
-def add_indicators(df):
-
-    def to_1d(x):
-        if isinstance(x, pd.DataFrame):
-            return x.iloc[:,0].astype(float)
-        return x.astype(float)
+# Ohne Endung – Format über OUTPUT_FORMAT (output.py: Parquet oder CSV)
+OUTPUT_FILE = f"daily_backtest_{timestamp}"
+MISSING_FILE = f"missing_tickers_{timestamp}"
+STATS_FILE = f"trade_stats_{timestamp}.json"
 
-    close = to_1d(df["Close"])
-    high  = to_1d(df["High"])
-    low   = to_1d(df["Low"])
+# Offene Positionen mit aktuellem Kurs bewerten (ein gebündelter Abruf);
+# 0 = nur die bereits geladenen Schlusskurse verwenden
+FORCED_EXIT_REFRESH = os.getenv("FORCED_EXIT_REFRESH", "1") == "1"
 
-    df["ema50"]  = close.ewm(span=50).mean()
-    df["ema100"] = close.ewm(span=100).mean()
-    df["ema200"] = close.ewm(span=200).mean()
+COLUMNS = ["Ticker","Type","Date","Price","Return_%"]
 
-    df["sma20"]  = close.rolling(20).mean()
-    df["sma50"]  = close.rolling(50).mean()
-    df["sma200"] = close.rolling(200).mean()
+# Wochen-Trendfilter als Regel auf Wochenbars aus den Tageskursen (timeframes.py),
+# z.B. WEEKLY_FILTER="close > sma(30)"; leer = aus (Entry nur nach Tagesregeln)
+WEEKLY_FILTER = os.getenv("WEEKLY_FILTER", "")
 
-    # ATR
-    tr1 = high - low
-    tr2 = (high - close.shift(1)).abs()
-    tr3 = (low  - close.shift(1)).abs()
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    df["atr"] = tr.ewm(alpha=1/14).mean()
+# ==========================================================
+# 3. INDICATORS (DAILY)
+# ==========================================================
 
-    # ADX
-    up   = high.diff()
-    down = -low.diff()
+def add_indicators(df, ticker=None):
 
-    plus_dm  = np.where((up > down) & (up > 0), up, 0.0).reshape(-1,)
-    minus_dm = np.where((down > up) & (down > 0), down, 0.0).reshape(-1,)
+    # Gemeinsame, gecachte Indikatoren (indicators.py)
+    ind = Indicators(df, ticker)
 
-    plus = pd.Series(plus_dm, index=df.index).ewm(alpha=1/14).mean()
-    minus = pd.Series(minus_dm, index=df.index).ewm(alpha=1/14).mean()
+    df["ema50"]  = ind.ema(50)
+    df["ema100"] = ind.ema(100)
+    df["ema200"] = ind.ema(200)
 
-    plus_di  = 100 * plus  / df["atr"]
-    minus_di = 100 * minus / df["atr"]
+    df["sma20"]  = ind.sma(20)
+    df["sma50"]  = ind.sma(50)
+    df["sma200"] = ind.sma(200)
 
-    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
-    df["adx"] = dx.ewm(alpha=1/14).mean()
+    df["atr"] = ind.atr(14)
+    df["adx"] = ind.adx(14)
 
     # Trendstabilität
-    df["slope"] = df["sma200"] - df["sma200"].shift(10)
+    df["slope"] = ind.slope(200, 10)
+
+    # Wochenfilter: nur abgeschlossene Wochen, kein zusätzlicher Download
+    if WEEKLY_FILTER:
+        df["weekly_ok"] = Timeframes(df, ticker).mask("W", WEEKLY_FILTER).astype(float)
 
     return df
 
@@ -94,134 +93,158 @@ def add_indicators(df):
 
 def run_strategy(df, ticker):
 
-    rows = []
-    position = False
-    entry_price = 0
-    entry_date = None
-    cooldown_until = -1
-
     close = df["Close"].astype(float).values.reshape(-1,)
 
-    for i in range(len(df)):
-        date = df.index[i]
-
-        if date < BACKTEST_START:
-            continue
-
-        # ----------------------------------------------------------
-        # EXIT-LOGIK
-        # ----------------------------------------------------------
-        if position:
-
-            days_open = (date - entry_date).days
-
-            if days_open <= 50:
-                crit = df["ema200"].iloc[i]
-            elif days_open <= 100:
-                crit = df["ema100"].iloc[i]
-            else:
-                crit = df["ema50"].iloc[i]
-
-            if close[i] < crit:
-                exit_price = close[i]
-                ret = (exit_price / entry_price - 1) * 100
-                rows.append([ticker, "EXIT", date, exit_price, ret])
-
-                position = False
-                cooldown_until = i + 15
-                entry_price = 0
-                entry_date = None
-                continue
-
-        # ----------------------------------------------------------
-        # ENTRY-LOGIK (DAILY)
-        # ----------------------------------------------------------
-        if not position and i > cooldown_until:
-
-            if (
-                close[i] > df["sma200"].iloc[i] and
-                df["sma20"].iloc[i] > df["sma50"].iloc[i] and
-                df["adx"].iloc[i] > 20 and
-                df["slope"].iloc[i] > 0 and
-                abs(df["ema50"].iloc[i] - df["ema200"].iloc[i]) / close[i] > 0.01 and
-                df["atr"].iloc[i] / close[i] > 0.005
-            ):
-                position = True
-                entry_price = close[i]
-                entry_date = date
-                rows.append([ticker, "ENTRY", date, entry_price, ""])
-                continue
-
     # ----------------------------------------------------------
-    # FORCED EXIT (gestern)
+    # ENTRY-Maske vektorisiert, EXIT/Cooldown in einem Array-Durchlauf
     # ----------------------------------------------------------
-    if position:
-        forced = yf.download(
-            ticker,
-            start=EXIT_DATE - timedelta(days=5),
-            end=EXIT_DATE + timedelta(days=1),
-            interval="1d",
-            progress=False
-        )
-
-        if not forced.empty:
-            forced_price = float(forced["Close"].iloc[-1])
-        else:
-            forced_price = close[-1]
-
-        ret = (forced_price / entry_price - 1) * 100
-        rows.append([ticker, "EXIT (FORCED)", EXIT_DATE, forced_price, ret])
+    entries, exits = trade_indices(df, start=BACKTEST_START)
+    rows = trade_rows(ticker, df.index, close, entries, exits)
 
+    # Offene Position bleibt als letzte ENTRY-Zeile stehen;
+    # Bewertung zum Stichtag übernimmt mark_to_market() für alle Ticker gemeinsam
     return rows
 
 
 # ==========================================================
-# 5. MAIN
+# 5. MARK-TO-MARKET (FORCED EXIT)
 # ==========================================================
 
-def main():
+def open_positions(rows):
+    # Ticker -> Entry-Preis, wenn die letzte Zeile des Tickers ein ENTRY ist
+    last = {}
+    for row in rows:
+        last[row[0]] = row
+    return {t: row[3] for t, row in last.items() if row[1] == "ENTRY"}
 
-    all_rows = []
-    missing = []
 
-    for ticker in TICKERS:
+def latest_closes(store, tickers):
+    # Ein gebündelter Abruf für alle offenen Positionen (inkl. heutigem Bar)
+    if not tickers:
+        return {}
+    prices = store.get_many(tickers, EXIT_DATE - timedelta(days=5), EXIT_DATE + timedelta(days=1))
+    return {t: float(r.data["Close"].iloc[-1]) for t, r in prices.items() if not r.data.empty}
+
+
+def mark_to_market(rows, last_close, quotes=None):
+    # Offene Positionen zum aktuellen Kurs schließen, sonst zum letzten geladenen Schlusskurs
+    quotes = quotes or {}
+    positions = open_positions(rows)
+    last_idx = {row[0]: i for i, row in enumerate(rows)}
+
+    out = []
+    for i, row in enumerate(rows):
+        out.append(row)
+        t = row[0]
+        if t in positions and last_idx[t] == i:
+            entry_price = positions[t]
+            forced_price = quotes.get(t, last_close.get(t))
+            ret = (forced_price / entry_price - 1) * 100
+            out.append([t, "EXIT (FORCED)", EXIT_DATE, forced_price, ret])
+    return out
+
+
+# ==========================================================
+# 6. MAIN
+# ==========================================================
+
+def format_rows(rows):
+    out = pd.DataFrame(rows, columns=COLUMNS)
+    out["Date"] = pd.to_datetime(out["Date"]).dt.strftime("%d.%m.%Y")
+    # ENTRY-Zeilen haben keine Rendite ("") -> NaN, damit die Spalte numerisch bleibt (Parquet)
+    out["Return_%"] = pd.to_numeric(out["Return_%"], errors="coerce")
+    return out
+
+
+def process_block(store, results, missing, report, quotes=None):
+    # Ein Block: Indikatoren + Signale pro Ticker, danach offene Positionen bewerten;
+    # quotes von außen (runner.py) ersetzen den eigenen Kursabruf
+    rows = []
+    last_close = {}
 
-        print(f"Lade {ticker} ...")
+    for ticker, result in results.items():
 
-        df = yf.download(
-            ticker,
-            start=HISTORY_START,
-            end=EXIT_DATE,
-            interval="1d",
-            progress=False
-        )
+        df = result.data
+        report.count(f"download_{result.status}")
 
         if df.empty:
-            print(f"❌ Keine Daten für {ticker}")
-            missing.append(ticker)
+            reason = result.error or result.status
+            print(f"❌ Keine Daten für {ticker} ({reason})")
+            missing.append([ticker, result.status, result.error or ""])
             continue
 
-        df = add_indicators(df)
-        trades = run_strategy(df, ticker)
-        all_rows.extend(trades)
+        with report.stage("indicators", ticker, rows=len(df)):
+            df = add_indicators(df, ticker)
+        with report.stage("signals", ticker, rows=len(df)):
+            trades = run_strategy(df, ticker)
+        rows.extend(trades)
+        last_close[ticker] = float(df["Close"].iloc[-1])
 
     # ------------------------------------------------------
-    # Excel sicher erzeugen
+    # Offene Positionen des Blocks gemeinsam bewerten (ein Abruf pro Block)
     # ------------------------------------------------------
-    if not all_rows:
-        print("⚠️ Keine Trades erzeugt – leere Excel wird erstellt.")
-        pd.DataFrame(columns=["Ticker","Type","Date","Price","Return_%"]).to_excel(OUTPUT_FILE, index=False)
-        return
+    with report.stage("mark_to_market"):
+        if quotes is None:
+            quotes = {}
+            if FORCED_EXIT_REFRESH:
+                quotes = latest_closes(store, list(open_positions(rows)))
+        return mark_to_market(rows, last_close, quotes)
 
-    out = pd.DataFrame(all_rows, columns=["Ticker","Type","Date","Price","Return_%"])
-    out["Date"] = pd.to_datetime(out["Date"]).dt.strftime("%d.%m.%Y")
-    out.to_excel(OUTPUT_FILE, index=False)
 
-    print(f"\nErgebnisse gespeichert in: {OUTPUT_FILE}")
+def main(tickers=None, prices=None, quotes=None):
+    # tickers/prices/quotes von außen (runner.py): kein eigener Download, Ticker-Health pflegt der Aufrufer
+
+    missing = []
+    store = default_store()
+    report = start_run("backtest_week_to_day")
+
+    health = None
+    if prices is None:
+        health = TickerHealth()
+        health.reprobe(store.fetcher)
+    if tickers is None:
+        tickers = load_tickers(health)
+
+    if prices is None:
+        source = stream_prices(store, tickers, HISTORY_START, EXIT_DATE)
+    else:
+        source = ({t: prices[t] for t in block} for block in chunked(tickers, STREAM_CHUNK))
+
+    # Lokaler Bestand + nur neue Bars, blockweise geladen und sofort geschrieben
+    print(f"Lade {len(tickers)} Ticker ...")
+    with report.profiled("backtest"), open_sink(OUTPUT_FILE, columns=COLUMNS) as sink:
+        for results in source:
+            if prices is None:
+                health.record(results)
+            rows = process_block(store, results, missing, report, quotes)
+            del results
+
+            with report.stage("write", rows=len(rows)):
+                sink.write(format_rows(rows))
+
+    if health is not None:
+        health.finish()
+        report.info["ticker_health"] = health.summary()
+
+    if sink.rows == 0:
+        print(f"⚠️ Keine Trades erzeugt – leere Datei wird erstellt: {sink.path}")
+    else:
+        print(f"\nErgebnisse gespeichert in: {sink.path}")
+
+    # Trefferquote, Profit-Faktor, CAGR, Drawdown ... direkt aus der geschriebenen Datei
+    if sink.rows:
+        with report.stage("trade_stats", rows=sink.rows):
+            stats = build_report(read_table(sink.path), sink.path)
+        print(summary(stats))
+        print(f"Trade-Statistik gespeichert in: {write_report(stats, STATS_FILE)}")
 
     if missing:
-        pd.DataFrame({"Ticker": missing}).to_excel(MISSING_FILE, index=False)
-        print(f"Fehlende Ticker gespeichert in: {MISSING_FILE}")
+        path = write_table(pd.DataFrame(missing, columns=["Ticker", "Status", "Fehler"]), MISSING_FILE)
+        print(f"Fehlende Ticker gespeichert in: {path}")
+
+    report.info.update({"tickers": len(tickers), "rows": sink.rows, "missing": len(missing)})
+    print(report.summary())
+    print("Run-Report:", report.write())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,218 @@
+# benchmark.py
+#
+# Benchmark der drei Pipelines auf synthetischen Daten (kein Netz)
+# - Deterministische OHLCV-Daten, 100 bis 10.000 Ticker, 2 bis 20 Jahre
+# - Pro Stufe: Laufzeit, Durchsatz (Bars/s), Spitzen-Speicher
+# - Vergleich gegen eine gespeicherte Baseline (JSON)
+#
+# Beispiele:
+#   python benchmark.py --preset small --save-baseline bench_baseline.json
+#   python benchmark.py --preset small --baseline bench_baseline.json
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from output import write_table
+from synthetic_data import synthetic_universe
+
+
+# ============================================
+# Größen
+# ============================================
+PRESETS = {
+    "small": (100, 2),
+    "medium": (1_000, 10),
+    "large": (10_000, 20),
+}
+
+PANEL_CHUNK = 500          # Ticker pro Panel-Block (begrenzt den Speicher)
+MEMORY_SAMPLE = 25         # Ticker für den Speicher-Durchlauf
+
+
+# ============================================
+# Stufen
+# ============================================
+def _stages() -> Dict[str, Callable]:
+    from backtest_week_to_day import add_indicators, run_strategy
+    from daily_engine import scan_today
+    from trendscreener import compute_signals
+
+    return {
+        # Week→Day-Backtest
+        "indicators": lambda t, df: add_indicators(df.copy()),
+        "backtest_signals": lambda t, df: run_strategy(add_indicators(df.copy()), t),
+        # Daily Global Screener (Logik von process_ticker_daily)
+        "daily_signals": lambda t, df: scan_today(df),
+        # Trendscreener, pro Ticker
+        "trend_signals": lambda t, df: compute_signals(t, df[["Close", "Volume"]]),
+    }
+
+
+class StageStats:
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.bars = 0
+        self.peak = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "seconds": round(self.seconds, 4),
+            "bars": self.bars,
+            "bars_per_s": round(self.bars / self.seconds, 1) if self.seconds > 0 else None,
+            "peak_mb": round(self.peak / 2 ** 20, 2),
+        }
+
+
+def _measure_peak(fn: Callable, *args) -> int:
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    return max(0, peak - before)
+
+
+# ============================================
+# Durchlauf
+# ============================================
+def run_benchmark(n_tickers: int, years: float, memory: bool = True, seed: int = 0) -> dict:
+    from panel import Panel, compute_signals_panel
+
+    stages = _stages()
+    stats = {name: StageStats() for name in list(stages) + ["trend_panel", "report"]}
+
+    rows: List[list] = []
+    chunk: Dict[str, pd.DataFrame] = {}
+
+    def flush_panel():
+        if not chunk:
+            return
+        bars = sum(len(df) for df in chunk.values())
+        t0 = time.perf_counter()
+        compute_signals_panel(Panel.from_frames(chunk, ["Close", "Volume"]))
+        stats["trend_panel"].seconds += time.perf_counter() - t0
+        stats["trend_panel"].bars += bars
+        chunk.clear()
+
+    # ----------------------------
+    # Laufzeit (ohne tracemalloc)
+    # ----------------------------
+    for ticker, df in synthetic_universe(n_tickers, years, seed=seed):
+        for name, fn in stages.items():
+            t0 = time.perf_counter()
+            result = fn(ticker, df)
+            stats[name].seconds += time.perf_counter() - t0
+            stats[name].bars += len(df)
+            if name == "backtest_signals":
+                rows.extend(result)
+
+        chunk[ticker] = df[["Close", "Volume"]]
+        if len(chunk) >= PANEL_CHUNK:
+            flush_panel()
+    flush_panel()
+
+    # ----------------------------
+    # Report schreiben (Ausgabeschicht, Format über OUTPUT_FORMAT)
+    # ----------------------------
+    report = pd.DataFrame(rows, columns=["Ticker", "Type", "Date", "Price", "Return_%"])
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        write_table(report, os.path.join(tmp, "report"))
+        stats["report"].seconds = time.perf_counter() - t0
+        stats["report"].bars = len(report)
+
+    # ----------------------------
+    # Spitzen-Speicher (Stichprobe, eigener Durchlauf)
+    # ----------------------------
+    if memory:
+        tracemalloc.start()
+        sample = dict(synthetic_universe(min(n_tickers, MEMORY_SAMPLE), years, seed=seed))
+        for ticker, df in sample.items():
+            for name, fn in stages.items():
+                stats[name].peak = max(stats[name].peak, _measure_peak(fn, ticker, df))
+        frames = {t: df[["Close", "Volume"]] for t, df in sample.items()}
+        stats["trend_panel"].peak = _measure_peak(lambda: compute_signals_panel(Panel.from_frames(frames, ["Close", "Volume"])))
+        with tempfile.TemporaryDirectory() as tmp:
+            stats["report"].peak = _measure_peak(lambda: write_table(report, os.path.join(tmp, "report")))
+        tracemalloc.stop()
+
+    return {
+        "config": {"tickers": n_tickers, "years": years, "seed": seed},
+        "stages": {name: s.as_dict() for name, s in stats.items()},
+    }
+
+
+# ============================================
+# Baseline-Vergleich
+# ============================================
+def compare(result: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    print("\n===== VERGLEICH MIT BASELINE =====")
+    for name, cur in result["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if not base or not base.get("seconds"):
+            continue
+        ratio = cur["seconds"] / base["seconds"]
+        flag = "⚠️" if ratio > 1 + tolerance else "  "
+        print(f"{flag} {name:18s} {base['seconds']:9.3f}s → {cur['seconds']:9.3f}s  ({ratio:5.2f}x)")
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+
+    if baseline.get("config") != result["config"]:
+        print("Hinweis: Baseline wurde mit anderer Größe erstellt:", baseline.get("config"))
+    return regressions
+
+
+def print_table(result: dict) -> None:
+    cfg = result["config"]
+    print(f"\n===== BENCHMARK: {cfg['tickers']} Ticker × {cfg['years']} Jahre =====")
+    print(f"{'Stufe':18s} {'Zeit [s]':>10s} {'Bars/s':>14s} {'Peak [MB]':>10s}")
+    for name, s in result["stages"].items():
+        rate = f"{s['bars_per_s']:,.0f}" if s["bars_per_s"] else "-"
+        print(f"{name:18s} {s['seconds']:10.3f} {rate:>14s} {s['peak_mb']:10.2f}")
+
+
+# ============================================
+# CLI
+# ============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark der Screener-Pipelines (synthetische Daten)")
+    parser.add_argument("--preset", choices=sorted(PRESETS))
+    parser.add_argument("--tickers", type=int, default=100)
+    parser.add_argument("--years", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--output", help="Ergebnis als JSON speichern")
+    parser.add_argument("--save-baseline", help="Ergebnis als neue Baseline speichern")
+    parser.add_argument("--baseline", help="Mit gespeicherter Baseline vergleichen")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="erlaubte Verlangsamung (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    n_tickers, years = PRESETS[args.preset] if args.preset else (args.tickers, args.years)
+    result = run_benchmark(n_tickers, years, memory=not args.no_memory, seed=args.seed)
+    print_table(result)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2)
+            print(f"\nGespeichert: {path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print("\nLangsamer als Baseline:", ", ".join(regressions))
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# cli.py
+#
+# Gemeinsamer Einstiegspunkt für die Screener
+# - Unterbefehle: scan (Daily Global Screener), trend, backtest, dry-run
+# - Screener-Module werden erst im gewählten Unterbefehl importiert; beim Import lädt kein Modul
+#   Universum, Kurse oder Telegram -> schneller Start, Module in Worker-Prozessen wiederverwendbar
+# - yfinance / numba erst beim ersten echten Abruf bzw. kompilierten Lauf
+# - dry-run: Daily-Scan nur auf dem lokalen Kursbestand (OFFLINE=1), kein Telegram,
+#   Checkpoints und Exporte bleiben unverändert
+#
+# Beispiele:
+#   python cli.py scan
+#   python cli.py dry-run --universes nasdaq100,mdax
+#   python cli.py backtest --offline --tickers AAPL,MSFT
+
+import argparse
+import os
+from typing import List, Optional
+
+
+# ============================================
+# Unterbefehle
+# ============================================
+def _scan(tickers: Optional[List[str]]) -> None:
+    import daily_global_screener as m
+    m.main(tickers)
+
+
+def _dry_run(tickers: Optional[List[str]]) -> None:
+    os.environ["OFFLINE"] = "1"
+    import daily_global_screener as m
+    m.main(tickers, dry_run=True)
+
+
+def _trend(tickers: Optional[List[str]]) -> None:
+    import trendscreener as m
+    m.run_trendscreener(tickers)
+
+
+def _backtest(tickers: Optional[List[str]]) -> None:
+    import backtest_week_to_day as m
+    m.main(tickers)
+
+
+COMMANDS = {
+    "scan": (_scan, "Daily Global Screener mit Telegram-Versand"),
+    "trend": (_trend, "Trend-Screener (Historie, heute, letzte 30)"),
+    "backtest": (_backtest, "Week→Day-Backtest mit Trade-Statistik"),
+    "dry-run": (_dry_run, "Daily-Scan ohne Netz, ohne Telegram, ohne Speichern"),
+}
+
+
+# ============================================
+# CLI
+# ============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily Trading Screener")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name, (func, text) in COMMANDS.items():
+        p = sub.add_parser(name, help=text, description=text)
+        p.add_argument("--universes", help="z.B. nasdaq100,mdax (überschreibt das Standard-Universum)")
+        p.add_argument("--tickers", help="Komma-getrennte Ticker statt Universum")
+        p.add_argument("--offline", action="store_true", help="nur lokaler Kursbestand (OFFLINE=1)")
+        p.set_defaults(func=func)
+
+    args = parser.parse_args(argv)
+
+    # Vor dem Import der Screener setzen: Module lesen die Umgebung beim Aufruf
+    if args.universes:
+        os.environ["UNIVERSES"] = args.universes
+    if args.offline:
+        os.environ["OFFLINE"] = "1"
+
+    tickers = [t.strip() for t in args.tickers.split(",") if t.strip()] if args.tickers else None
+    args.func(tickers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# daily_engine.py
+#
+# Array-basierter Kern des Daily Global Screeners
+# - ENTRY: Crossover (Close > SMA200 UND SMA20 > SMA50, am Vortag noch nicht)
+# - EXIT: gestaffelter EMA-Stop (EMA200 / EMA100 / EMA50 nach Haltedauer)
+# - TP1 / TP2: einmal pro Trade
+# - Sprung von Trade zu Trade über float64-Arrays statt df.iloc pro Bar
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from indicators import Indicators
+from instrumentation import timed
+from strategy_engine import scan_first
+
+
+# ============================================
+# Parameter (wie bisher in process_ticker_daily)
+# ============================================
+TIER1_DAYS = 60          # darunter: EMA200 als Stop
+TIER2_DAYS = 200         # darunter: EMA100, danach EMA50
+STOP_BUFFER = 0.97       # EXIT wenn Close <= Stop * 0.97
+TP1_MULT = 4.0           # Schwelle wie im bestehenden Screener (Close >= Entry * 4)
+TP2_MULT = 8.0           # Schwelle wie im bestehenden Screener (Close >= Entry * 8)
+
+EVENT_ENTRY = "ENTRY"
+EVENT_EXIT = "EXIT"
+EVENT_TP1 = "TP1"
+EVENT_TP2 = "TP2"
+
+
+# ============================================
+# Zustand eines Tickers
+# ============================================
+@dataclass
+class DailyState:
+    in_trade: bool = False
+    entry_price: float = float("nan")
+    entry_day: int = 0           # Kalendertag (Tage seit 1970-01-01)
+    tp1_done: bool = False
+    tp2_done: bool = False
+
+    @property
+    def entry_date(self) -> Optional[pd.Timestamp]:
+        if not self.in_trade:
+            return None
+        return pd.Timestamp(np.datetime64(self.entry_day, "D"))
+
+
+# ============================================
+# Indikatoren -> Arrays
+# ============================================
+def daily_arrays(df: pd.DataFrame, start=None, ticker: Optional[str] = None) -> Dict[str, np.ndarray]:
+    # Gemeinsame, gecachte Indikatoren (indicators.py)
+    with timed("indicators", ticker, rows=len(df)):
+        ind = Indicators(df, ticker)
+
+        frame = pd.DataFrame({
+            "close": ind.close,
+            "sma20": ind.sma(20),
+            "sma50": ind.sma(50),
+            "sma200": ind.sma(200),
+            "ema200": ind.ema(200),
+            "ema100": ind.ema(100),
+            "ema50": ind.ema(50),
+        }, index=df.index)
+
+    # Wie bisher: nur vollständige Zeilen (inkl. OHLCV), ab Backtest-Start
+    valid = frame.notna().all(axis=1).to_numpy() & df.notna().all(axis=1).to_numpy()
+    if start is not None:
+        valid &= (df.index >= pd.Timestamp(start))
+
+    arrays = {k: np.ascontiguousarray(frame[k].to_numpy(dtype=np.float64)[valid]) for k in frame.columns}
+    arrays["days"] = pd.DatetimeIndex(df.index[valid]).values.astype("datetime64[D]").astype(np.int64)
+    return arrays
+
+
+def entry_crossings(a: Dict[str, np.ndarray]) -> np.ndarray:
+    cond = (a["close"] > a["sma200"]) & (a["sma20"] > a["sma50"])
+    cross = np.zeros_like(cond)
+    cross[1:] = cond[1:] & ~cond[:-1]
+    return np.flatnonzero(cross)
+
+
+# ============================================
+# Trade-Abschnitt ab Entry auflösen
+# ============================================
+def _first_stop(a: Dict[str, np.ndarray], lo: int, entry_day: int) -> int:
+    close, days = a["close"], a["days"]
+    ema50, ema100, ema200 = a["ema50"], a["ema100"], a["ema200"]
+
+    def stop_hit(s, e):
+        held = days[s:e] - entry_day
+        stop = np.where(held < TIER1_DAYS, ema200[s:e], np.where(held < TIER2_DAYS, ema100[s:e], ema50[s:e]))
+        return close[s:e] <= stop * STOP_BUFFER
+
+    return scan_first(stop_hit, lo, close.shape[0])
+
+
+def _first_target(close: np.ndarray, lo: int, hi: int, level: float) -> int:
+    if lo >= hi:
+        return -1
+    return scan_first(lambda s, e: close[s:e] >= level, lo, hi)
+
+
+def run_daily(a: Dict[str, np.ndarray], state: Optional[DailyState] = None, lo: int = 1) -> Tuple[DailyState, List[Tuple[int, str]]]:
+    # Verarbeitet Bars ab Index lo (Bar lo-1 dient als Vortag) und liefert
+    # den Endzustand sowie alle Ereignisse als (Index, Signal)
+    state = DailyState(**vars(state)) if state is not None else DailyState()
+    close = a["close"]
+    n = close.shape[0]
+    events: List[Tuple[int, str]] = []
+
+    crossings = entry_crossings(a)
+    i = lo
+
+    while i < n:
+        if not state.in_trade:
+            k = np.searchsorted(crossings, i)
+            if k >= crossings.size:
+                break
+            e = int(crossings[k])
+            state = DailyState(True, float(close[e]), int(a["days"][e]))
+            events.append((e, EVENT_ENTRY))
+            i = e + 1
+            continue
+
+        # Offener Trade: Stop zuerst, Ziele nur auf Bars vor dem Exit
+        x = _first_stop(a, i, state.entry_day)
+        end = x if x >= 0 else n
+
+        hits = []
+        if not state.tp2_done:
+            t2 = _first_target(close, i, end, state.entry_price * TP2_MULT)
+            if t2 >= 0:
+                hits.append((t2, 0, EVENT_TP2))
+                state.tp2_done = True
+        if not state.tp1_done:
+            t1 = _first_target(close, i, end, state.entry_price * TP1_MULT)
+            if t1 >= 0:
+                hits.append((t1, 1, EVENT_TP1))
+                state.tp1_done = True
+        events.extend((idx, ev) for idx, _, ev in sorted(hits))
+
+        if x < 0:
+            break
+
+        events.append((x, EVENT_EXIT))
+        state = DailyState()
+        i = x + 1
+
+    return state, events
+
+
+# ============================================
+# Tages-Scan: nur Endzustand + heutige Ereignisse
+# ============================================
+def scan_today(df: pd.DataFrame, start=None, ticker: Optional[str] = None) -> Tuple[DailyState, List[str]]:
+    a = daily_arrays(df, start, ticker)
+    n = a["close"].shape[0]
+    if n == 0:
+        return DailyState(), []
+
+    with timed("signal_loop", ticker, rows=n):
+        state, events = run_daily(a)
+    today = [ev for idx, ev in events if idx == n - 1]
+    return state, today
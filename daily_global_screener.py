@@ -1,9 +1,18 @@
 import pandas as pd
-import yfinance as yf
-import requests
 import datetime
 import os
 
+from daily_state import STATE_FILE, load_checkpoints, save_checkpoints, scan_ticker
+from instrumentation import start_run
+from notifier import TelegramNotifier
+from output import write_view
+from panel import Panel
+from price_store import default_store
+from ranking import RANK_FILL_DAYS, benchmark_change, load_benchmark, rank_universe
+from signal_db import SignalDB
+from health import TickerHealth
+from universe import names_for_run, load_universe as load_named_universe
+
 # ================================
 # KONFIGURATION
 # ================================
@@ -14,224 +23,122 @@ END = datetime.date.today().isoformat()
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
 
+UNIVERSE = "nasdaq100"
+
 
 # ================================
-# NASDAQ-100 Universe (ALLE 100 TICKER)
+# UNIVERSUM (universes/nasdaq100.csv, UNIVERSES=... überschreibt)
 # ================================
-def load_universe():
-
-    NASDAQ100 = [
-        "AAPL","MSFT","NVDA","AMZN","META","GOOGL","GOOG","TSLA","AVGO","PEP",
-        "COST","ADBE","CSCO","NFLX","AMD","INTC","AMGN","QCOM","TXN","SBUX",
-        "HON","ADI","AMAT","BKNG","MDLZ","REGN","ISRG","LRCX","MU","GILD",
-        "PANW","VRTX","KLAC","PYPL","ADP","MAR","ABNB","CRWD","MRVL","CHTR",
-        "IDXX","CDNS","MELI","KDP","SNPS","FTNT","AZN","ORLY","PCAR","MNST",
-        "ADSK","CTAS","PAYX","WDAY","NXPI","ROST","TEAM","ANSS","ODFL","EXC",
-        "LULU","AEP","XEL","KHC","CSX","MRNA","BIIB","EA","DLTR","LCID",
-        "PDD","JD","BIDU","ZM","DOCU","OKTA","ZS","SPLK","VRSN","EBAY",
-        "ILMN","MNDT","FISV","CTSH","ALGN","FAST","DXCM","CPRT","MTCH","SWKS",
-        "TTD","SGEN","QRVO","CRUS","JBHT","AVLR","TTWO","VRSK","NTES","BMRN"
-    ]
+def load_universe(health=None):
+
+    names = names_for_run(UNIVERSE)
+    tickers = load_named_universe(names, health)
 
     print("====================================")
-    print("📈 NASDAQ-100 geladen:", len(NASDAQ100))
+    print(f"📈 Universum geladen ({', '.join(names)}):", len(tickers))
     print("====================================")
 
-    return sorted(NASDAQ100)
-
-
-tickers = load_universe()
-checked_count = len(tickers)
+    return sorted(tickers)
 
 
 # ================================
-# NASDAQ-100 PERFORMANCE GESTERN
+# RELATIVE STÄRKE VS. NASDAQ-100 (ranking.py)
 # ================================
-try:
-    ndx = yf.download("^NDX", period="5d", progress=False)
-    ndx_pct = float(
-        (ndx["Close"].iloc[-1] - ndx["Close"].iloc[-2])
-        / ndx["Close"].iloc[-2] * 100
-    )
-except:
-    ndx_pct = 0.0
+# Ränge über das ganze Universum ab dem ältesten Signal-Datum (nachgeholte Signale bekommen
+# den RS ihres eigenen Tages, sonst nur der letzte Tag); Börsen mit anderem Kalender
+# behalten ihren letzten Schlusskurs (ranking.RANK_FILL_DAYS)
+RANK_SHOW = 10
 
 
-# ================================
-# Hilfsfunktion
-# ================================
-def force_float(x):
-    try:
-        if isinstance(x, pd.Series):
-            return float(x.iloc[0])
-        return float(x)
-    except:
-        return float("nan")
+def relative_strength(tickers, prices, benchmark, start=None):
+    frames = {T: prices[T].data for T in tickers if prices[T].status == "ok"}
+    close = Panel.from_frames(frames, ["Close"]).close.ffill(limit=RANK_FILL_DAYS)
+    if close.empty:
+        return None
+    start = close.index[-1] if start is None else min(pd.Timestamp(start), close.index[-1])
+    return rank_universe(close, benchmark, start=start)
 
 
 # ================================
 # SIGNAL-LOGIK (wie Backtest + TP1/TP2)
 # ================================
-def process_ticker_daily(ticker):
-    try:
-        df = yf.download(ticker, start=HISTORY_START, end=END, progress=False)
-    except:
-        return []
-
-    if df.empty:
-        return []
-
-    # Indikatoren berechnen
-    df["SMA20"]  = df["Close"].rolling(20).mean()
-    df["SMA50"]  = df["Close"].rolling(50).mean()
-    df["SMA120"] = df["Close"].rolling(120).mean()  # aktuell nicht genutzt, schadet aber nicht
-    df["SMA200"] = df["Close"].rolling(200).mean()
+def process_ticker_daily(ticker, df=None, checkpoints=None, store=None):
+    if df is None:
+        try:
+            df = (store or default_store()).get(ticker, HISTORY_START, END)
+        except Exception as e:
+            print("Ladefehler bei:", ticker, e)
+            return []
 
-    df["EMA200"] = df["Close"].ewm(span=200).mean()
-    df["EMA100"] = df["Close"].ewm(span=100).mean()
-    df["EMA50"]  = df["Close"].ewm(span=50).mean()
-
-    df = df.dropna().copy()
     if df.empty:
         return []
 
-    df = df[df.index >= BACKTEST_START]
-    if df.empty:
-        return []
-
-    last_date = df.index[-1].date()   # Schlusskurs des Vortags (für die Telegram-Meldung)
-    signals_today = []
+    # ENTRY-Crossover, EMA-Stop, TP1/TP2 über Arrays (daily_engine);
+    # ab Checkpoint nur neue Bars, sonst komplettes Replay.
+    # Gemeldet wird, was seit dem letzten Lauf passiert ist (ohne Checkpoint: letzter Bar),
+    # jeweils mit dem Datum des Bars
+    if checkpoints is None:
+        checkpoints = {}
+    events = scan_ticker(ticker, df, checkpoints, HISTORY_START, BACKTEST_START)
 
-    in_trade = False          # max. 1 Trade pro Ticker
-    entry_price = None
-    entry_date = None
-    tp1_done = False
-    tp2_done = False
-
-    # ================================
-    # LOOP über die Historie
-    # ================================
-    for i in range(1, len(df)):
-
-        row  = df.iloc[i]
-        prev = df.iloc[i - 1]
-
-        date = row.index if hasattr(row, "index") else row.name
-        # row.name ist ein Timestamp (Index)
-
-        date = row.name
-
-        close      = force_float(row["Close"])
-        close_prev = force_float(prev["Close"])
-
-        sma20      = force_float(row["SMA20"])
-        sma50      = force_float(row["SMA50"])
-        sma200     = force_float(row["SMA200"])
-
-        sma20_prev  = force_float(prev["SMA20"])
-        sma50_prev  = force_float(prev["SMA50"])
-        sma200_prev = force_float(prev["SMA200"])
-
-        # ====================================================
-        # ENTRY — nur wenn aktuell kein Trade für diesen Ticker
-        # Regel: Close > SMA200 UND SMA20 > SMA50
-        # Einstiegssignal am Schlusskurs, Umsetzung am Open des nächsten Tages
-        # ====================================================
-        entry_condition_now = (
-            close > sma200 and
-            sma20 > sma50
-        )
-
-        entry_condition_prev = (
-            close_prev > sma200_prev and
-            sma20_prev > sma50_prev
-        )
-
-        if not in_trade:
-            if entry_condition_now and not entry_condition_prev:
-                in_trade    = True
-                entry_price = close          # Einstiegskurs (Schlusskurs), Order am nächsten Open
-                entry_date  = date
-                tp1_done    = False
-                tp2_done    = False
-
-                if date.date() == last_date:
-                    signals_today.append([ticker, "ENTRY"])
-
-            continue
-
-        # ====================================================
-        # EXIT (dynamischer EMA-Stop) – nur nach Entry
-        # Stop wechselt je nach Haltedauer, wie im Backtest
-        # ====================================================
-        days_in_trade = (date - entry_date).days
-
-        if days_in_trade < 60:
-            stop = force_float(row["EMA200"])
-        elif days_in_trade < 200:
-            stop = force_float(row["EMA100"])
-        else:
-            stop = force_float(row["EMA50"])
-
-        # EXIT-Bedingung (Trade bleibt offen, bis Stop verletzt)
-        if close <= stop * 0.97:
-            if date.date() == last_date:
-                signals_today.append([ticker, "EXIT"])
-
-            # Trade wird geschlossen, nächster ENTRY wieder erlaubt
-            in_trade    = False
-            entry_price = None
-            entry_date  = None
-            tp1_done    = False
-            tp2_done    = False
-            continue
-
-        # ====================================================
-        # TP2 = +80% Gewinn seit Entry (nur einmal pro Trade)
-        # ====================================================
-        if in_trade and (entry_price is not None) and (not tp2_done):
-            if close >= entry_price * 8:
-                tp2_done = True
-                if date.date() == last_date:
-                    signals_today.append([ticker, "TP2"])
-
-        # ====================================================
-        # TP1 = +35% Gewinn seit Entry (nur einmal pro Trade)
-        # ====================================================
-        if in_trade and (entry_price is not None) and (not tp1_done):
-            if close >= entry_price * 4:
-                tp1_done = True
-                if date.date() == last_date:
-                    signals_today.append([ticker, "TP1"])
-
-    return signals_today
+    return [[ticker, ev, date] for date, ev in events]
 
 
 # ================================
 # SCAN AUSFÜHREN
 # ================================
-all_signals = []
+def scan(tickers, prices, checkpoints, notifier, report):
+    all_signals = []
+
+    # Hot Path: Indikatoren + Signal-Schleife (Messpunkte in daily_engine / daily_state)
+    with report.profiled("scan"):
+        for T in tickers:
+            result = prices[T]
+            if result.status != "ok":
+                print("Keine Daten:", T, result.error or result.status)
+                continue
+
+            print("Berechne:", T)
+            try:
+                s = process_ticker_daily(T, result.data, checkpoints)
+                all_signals.extend(s)
+                for _, ev, _ in s:
+                    notifier.push_event(ev, f"*{ev}*: {T}")
+            except Exception as e:
+                report.count("scan_error")
+                print("Fehler bei:", T, e)
+
+    return pd.DataFrame(all_signals, columns=["Ticker", "Signal", "Date"])
 
-for T in tickers:
-    print("Berechne:", T)
-    try:
-        s = process_ticker_daily(T)
-        all_signals.extend(s)
-    except Exception as e:
-        print("Fehler bei:", T, e)
 
-signals_df = pd.DataFrame(all_signals, columns=["Ticker", "Signal"])
+# ================================
+# SIGNAL-HISTORIE (signals.db, Strategie "daily")
+# ================================
+def signal_records(signals_df, prices):
+    # Jedes Signal mit dem Datum und Schlusskurs seines Bars (aus dem Scan)
+    rows = []
+    for T, ev, date, rs in signals_df[["Ticker", "Signal", "Date", "RS"]].itertuples(index=False):
+        close = prices[T].data["Close"]
+        rows.append([date, T, ev, float(close.get(date, float("nan"))), rs])
+    return pd.DataFrame(rows, columns=["date", "ticker", "signal", "close", "rs_score"])
 
 
 # ================================
 # TELEGRAM FORMAT
 # ================================
-entry_list = signals_df[signals_df["Signal"] == "ENTRY"]["Ticker"].tolist()
-tp1_list   = signals_df[signals_df["Signal"] == "TP1"]["Ticker"].tolist()
-tp2_list   = signals_df[signals_df["Signal"] == "TP2"]["Ticker"].tolist()
-exit_list  = signals_df[signals_df["Signal"] == "EXIT"]["Ticker"].tolist()
+def _with_rs(rows):
+    # "AAPL (RS 92)", stärkste zuerst
+    rows = rows.sort_values("RS", ascending=False, kind="stable")
+    return [T if pd.isna(rs) else f"{T} (RS {rs:.0f})" for T, rs in rows[["Ticker", "RS"]].itertuples(index=False)]
+
 
-text = f"""📡 *DAILY GLOBAL SCREENER*
+def format_message(signals_df, checked_count, ndx_pct, leaders=None):
+    entry_list = _with_rs(signals_df[signals_df["Signal"] == "ENTRY"])
+    tp1_list   = signals_df[signals_df["Signal"] == "TP1"]["Ticker"].tolist()
+    tp2_list   = signals_df[signals_df["Signal"] == "TP2"]["Ticker"].tolist()
+    exit_list  = signals_df[signals_df["Signal"] == "EXIT"]["Ticker"].tolist()
+
+    return f"""📡 *DAILY GLOBAL SCREENER*
 Ich habe heute ✅ *{checked_count} Aktien* für dich gescannt
 
 📈 *ENTRY Signale:*
@@ -246,26 +153,116 @@ Ich habe heute ✅ *{checked_count} Aktien* für dich gescannt
 📉 *EXIT Signale:*
 {chr(10).join(exit_list) if exit_list else "Keine"}
 
+💪 *Relative Stärke Top {RANK_SHOW} (vs. Nasdaq-100):*
+{chr(10).join(leaders) if leaders else "Keine"}
+
 📉 *Nasdaq-100 gestern:* {ndx_pct:+.2f} %
 """
 
-# ================================
-# TELEGRAM SENDEN
-# ================================
-requests.post(
-    f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage",
-    data={"chat_id": CHAT_ID, "text": text, "parse_mode": "Markdown"},
-)
 
 # ================================
-# EXCEL EXPORT
+# HAUPTPROGRAMM
 # ================================
-signals_df.to_excel("daily_signals.xlsx", index=False)
+def main(tickers=None, prices=None, dry_run=False):
+    # tickers/prices von außen (runner.py): kein eigener Download, Ticker-Health pflegt der Aufrufer
+    # dry_run: kein Telegram-Versand, Checkpoints und Export werden nicht gespeichert
+
+    # Laufzeit-Report (run_report_daily_global_screener.json), RUN_PROFILE=1 für cProfile/tracemalloc
+    report = start_run("daily_global_screener")
+
+    # Versand im Hintergrund; TELEGRAM_PUSH_EVENTS=ENTRY,EXIT meldet Signale schon während des Scans
+    if dry_run:
+        notifier = TelegramNotifier(None, None, push_events=())
+    else:
+        notifier = TelegramNotifier(TELEGRAM_TOKEN, CHAT_ID).start()
+
+    # Checkpoints pro Ticker: nur neue Bars seit dem letzten Lauf verarbeiten
+    checkpoints = load_checkpoints(STATE_FILE)
+
+    # Ticker ohne Daten werden pausiert und im Hintergrund erneut geprüft
+    health = None
+    if prices is None:
+        store = default_store()
+        health = TickerHealth()
+        health.reprobe(store.fetcher)
+
+    with report.stage("universe") as st:
+        if tickers is None:
+            tickers = load_universe(health)
+        st.rows = len(tickers)
+    checked_count = len(tickers)
+
+    # Benchmark aus dem Kursbestand: Tagesveränderung und Basis der relativen Stärke
+    with report.stage("download_benchmark"):
+        benchmark = load_benchmark(prices, HISTORY_START, END)
+        ndx_pct = benchmark_change(benchmark)
+
+    # Ganzes Universum gebündelt laden (lokaler Bestand + neue Bars)
+    if prices is None:
+        with report.stage("download") as st:
+            prices = store.get_many(tickers, HISTORY_START, END)
+            st.rows = sum(len(r.data) for r in prices.values())
+        health.record(prices)
+
+    for result in prices.values():
+        report.count(f"download_{result.status}")
+
+    signals_df = scan(tickers, prices, checkpoints, notifier, report)
+
+    with report.stage("ranking", rows=len(tickers)):
+        first_signal = signals_df["Date"].min() if not signals_df.empty else None
+        ranking = relative_strength(tickers, prices, benchmark, first_signal)
+        leaders = []
+        signals_df["RS"] = float("nan")
+        if ranking is not None:
+            top = ranking.latest(RANK_SHOW)
+            leaders = [f"{T} (RS {rs:.0f})" for T, rs in top[["ticker", "rs_score"]].itertuples(index=False)]
+            signals_df["RS"] = ranking.lookup(signals_df["Date"], signals_df["Ticker"]).round(1)
+
+    if not dry_run and not signals_df.empty:
+        with report.stage("signal_db", rows=len(signals_df)):
+            with SignalDB() as db:
+                db.insert(signal_records(signals_df, prices), "daily")
+
+    with report.stage("checkpoint_save"):
+        if not dry_run:
+            save_checkpoints(checkpoints, STATE_FILE)
+        if health is not None:
+            health.finish()
+            report.info["ticker_health"] = health.summary()
+
+    # ================================
+    # TELEGRAM SENDEN
+    # ================================
+    text = format_message(signals_df, checked_count, ndx_pct, leaders)
+    with report.stage("telegram", rows=len(text)):
+        if dry_run:
+            print(text)
+        else:
+            notifier.push(text)
+        notifier.close()
+    report.count("telegram_sent", notifier.sent)
+    report.count("telegram_failed", notifier.failed)
+
+    # ================================
+    # EXPORT (Parquet/CSV + Excel-Sicht)
+    # ================================
+    if not dry_run:
+        with report.stage("export", rows=len(signals_df)):
+            write_view(signals_df, "daily_signals")
+
+    report.info.update({"checked": checked_count, "signals": len(signals_df)})
+    print(report.summary())
+    print("Run-Report:", report.write())
+
+    print("\n====================================")
+    print("GLOBAL SCREENER FERTIG")
+    print("Gescannt:", checked_count)
+    print("Signale:", len(signals_df))
+    print("====================================\n")
 
-print("\n====================================")
-print("GLOBAL SCREENER FERTIG")
-print("Gescannt:", checked_count)
-print("Signale:", len(signals_df))
-print("====================================\n")
+    return signals_df
 
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# daily_state.py
+#
+# Checkpoints pro Ticker für den Daily Global Screener
+# - Speichert Trade-Zustand (in_trade, Entry, TP-Flags) + laufende SMA/EMA-Akkumulatoren
+# - Nächster Lauf verarbeitet nur die neuen Bars seit dem Checkpoint
+# - Fallback auf komplettes Replay, wenn Checkpoint fehlt oder veraltet ist
+# - Ereignisse mit dem Datum ihres Bars: nach verpassten Läufen alle neuen Bars, nicht nur der letzte
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from daily_engine import DailyState, daily_arrays, run_daily
+from indicators import IncrementalIndicators
+from instrumentation import timed
+
+
+# ============================================
+# Speicherort & Version
+# ============================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.getenv("SCREENER_STATE_FILE", os.path.join(BASE_DIR, "screener_state.json"))
+
+STATE_VERSION = 3
+
+SMA_WINDOWS = (20, 50, 200)
+EMA_SPANS = (50, 100, 200)
+
+ROW_FIELDS = ("close", "sma20", "sma50", "sma200", "ema50", "ema100", "ema200")
+
+
+# ============================================
+# Datei lesen / schreiben
+# ============================================
+def load_checkpoints(path: str = STATE_FILE) -> Dict[str, dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != STATE_VERSION:
+        return {}
+    return data.get("tickers", {})
+
+
+def save_checkpoints(checkpoints: Dict[str, dict], path: str = STATE_FILE) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": STATE_VERSION, "tickers": checkpoints}, f)
+    os.replace(tmp, path)
+
+
+# ============================================
+# Hilfsfunktionen
+# ============================================
+def _closes(df: pd.DataFrame) -> np.ndarray:
+    close = df["Close"]
+    if isinstance(close, pd.DataFrame):
+        close = close.iloc[:, 0]
+    return close.to_numpy(dtype=np.float64)
+
+
+def _day(ts) -> int:
+    return int(np.datetime64(pd.Timestamp(ts), "D").astype(np.int64))
+
+
+def _date(day: int) -> pd.Timestamp:
+    return pd.Timestamp(np.datetime64(int(day), "D"))
+
+
+# Ereignis = (Datum des Bars, Signal)
+Event = Tuple[pd.Timestamp, str]
+
+
+def _dated(events: List[Tuple[int, str]], days: np.ndarray, lo: int) -> List[Event]:
+    return [(_date(days[idx]), ev) for idx, ev in events if idx >= lo]
+
+
+def _stored(events: List[Event]) -> list:
+    return [[_day(ts), ev] for ts, ev in events]
+
+
+# ============================================
+# Checkpoint aus komplettem Replay erzeugen
+# ============================================
+def _config_key(history_start, backtest_start) -> str:
+    return f"{pd.Timestamp(history_start).date()}|{pd.Timestamp(backtest_start).date()}"
+
+
+def _full_replay(df: pd.DataFrame, backtest_start, config: str, ticker: Optional[str] = None) -> Tuple[Optional[dict], List[Event]]:
+    a = daily_arrays(df, backtest_start, ticker)
+    n = a["close"].shape[0]
+    if n == 0:
+        return None, []
+
+    with timed("signal_loop", ticker, rows=n):
+        state, events = run_daily(a)
+    # Ohne Checkpoint ist unbekannt, was schon gemeldet wurde -> nur der letzte Bar
+    today = _dated(events, a["days"], n - 1)
+
+    # Checkpoint nur, wenn der letzte Bar auch der letzte gültige Bar ist
+    if a["days"][-1] != _day(df.index[-1]):
+        return None, today
+
+    close = _closes(df)
+    checkpoint = {
+        "config": config,
+        "last_day": int(a["days"][-1]),
+        "last_close": float(close[-1]),
+        "state": vars(state).copy(),
+        "prev": {k: float(a[k][-1]) for k in ROW_FIELDS},
+        "indicators": IncrementalIndicators.from_history(close, SMA_WINDOWS, EMA_SPANS).state(),
+        "events": _stored(today),
+    }
+    return checkpoint, today
+
+
+# ============================================
+# Checkpoint um neue Bars fortschreiben
+# ============================================
+def _advance(checkpoint: dict, new: pd.DataFrame, ticker: Optional[str] = None) -> Tuple[Optional[dict], List[Event]]:
+    closes = _closes(new)
+    complete = new.notna().all(axis=1).to_numpy()
+
+    ind = IncrementalIndicators.from_state(checkpoint["indicators"])
+
+    rows = {k: [checkpoint["prev"][k]] for k in ROW_FIELDS}
+    days = [checkpoint["last_day"]]
+
+    with timed("indicators", ticker, rows=len(new)):
+        for x, ok, ts in zip(closes, complete, new.index):
+            values = ind.update(float(x))
+
+            # Unvollständige Zeilen fließen in die Indikatoren ein, aber nicht in die Signale
+            if not ok or any(np.isnan(v) for v in values.values()):
+                continue
+
+            rows["close"].append(float(x))
+            for k, v in values.items():
+                rows[k].append(v)
+            days.append(_day(ts))
+
+    a = {k: np.asarray(v, dtype=np.float64) for k, v in rows.items()}
+    a["days"] = np.asarray(days, dtype=np.int64)
+    n = a["close"].shape[0]
+
+    with timed("signal_loop", ticker, rows=n - 1):
+        state, events = run_daily(a, DailyState(**checkpoint["state"]), lo=1)
+    # Alle Bars nach dem Checkpoint (mehrere nach verpassten Läufen), jeweils mit eigenem Datum
+    today = _dated(events, a["days"], 1)
+
+    if days[-1] != _day(new.index[-1]):
+        # Letzter Bar unvollständig -> beim nächsten Lauf neu aufsetzen
+        return None, today
+
+    updated = dict(checkpoint)
+    updated.update({
+        "last_day": int(days[-1]),
+        "last_close": float(closes[-1]),
+        "state": vars(state).copy(),
+        "prev": {k: float(a[k][-1]) for k in ROW_FIELDS},
+        "indicators": ind.state(),
+        "events": _stored(today),
+    })
+    return updated, today
+
+
+# ============================================
+# Einstieg für den Screener
+# ============================================
+def scan_ticker(
+    ticker: str,
+    df: pd.DataFrame,
+    checkpoints: Dict[str, dict],
+    history_start,
+    backtest_start,
+) -> List[Event]:
+
+    config = _config_key(history_start, backtest_start)
+    checkpoint = checkpoints.get(ticker)
+
+    if df.empty:
+        checkpoints.pop(ticker, None)
+        return []
+
+    # Checkpoint gültig? Gleiche Konfiguration und unveränderter Schlusskurs am Checkpoint-Tag
+    usable = False
+    if checkpoint is not None and checkpoint.get("config") == config:
+        days = df.index.values.astype("datetime64[D]").astype(np.int64)
+        pos = int(np.searchsorted(days, checkpoint["last_day"]))
+        if pos < len(days) and days[pos] == checkpoint["last_day"]:
+            usable = bool(np.isclose(_closes(df)[pos], checkpoint["last_close"], rtol=1e-9, atol=0.0))
+
+    if usable:
+        new = df.iloc[pos + 1:]
+        if new.empty:
+            # Erneuter Lauf am selben Tag: Ereignisse des letzten Laufs wiederholen
+            return [(_date(day), ev) for day, ev in checkpoint.get("events", [])]
+        updated, today = _advance(checkpoint, new, ticker)
+    else:
+        updated, today = _full_replay(df, backtest_start, config, ticker)
+
+    if updated is None:
+        checkpoints.pop(ticker, None)
+    else:
+        checkpoints[ticker] = updated
+    return today
@@ -0,0 +1,239 @@
+# data_access.py
+#
+# Gemeinsame Datenzugriffsschicht
+# - Universum in Batches laden (ein Request pro Batch statt pro Ticker)
+# - Batches parallel über einen begrenzten Thread-Pool (yfinance-Aufrufe serialisiert, YF_LOCK)
+# - Retry mit exponentiellem Backoff (Batch- und Ticker-Ebene)
+# - Strukturiertes Ergebnis pro Ticker: ok / empty / error
+# - Fehler einzelner Ticker im yfinance-Batch (Timeout, Rate-Limit) werden wiederholt
+# - Austauschbarer Fetcher (yfinance, offline, lokaler Stub)
+# - yfinance wird erst beim ersten echten Abruf importiert (Offline-/Cache-Läufe starten schneller)
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================
+# OHLCV-Format
+# ============================================
+FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+STATUS_OK = "ok"
+STATUS_EMPTY = "empty"
+STATUS_ERROR = "error"
+
+
+def empty_ohlcv() -> pd.DataFrame:
+    return pd.DataFrame(columns=FIELDS, index=pd.DatetimeIndex([], name="Date"), dtype=float)
+
+
+def normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    if df is None or df.empty:
+        return empty_ohlcv()
+
+    df = df.copy()
+
+    # yfinance liefert auch für Einzelticker MultiIndex-Spalten (Price, Ticker)
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    df = df.loc[:, ~df.columns.duplicated()]
+
+    for col in FIELDS:
+        if col not in df.columns:
+            df[col] = np.nan
+    df = df[FIELDS].astype(float)
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize().rename("Date")
+
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    return df.dropna(subset=["Close"])
+
+
+# ============================================
+# Ergebnis pro Ticker
+# ============================================
+@dataclass
+class FetchResult:
+    ticker: str
+    status: str
+    data: pd.DataFrame = field(default_factory=empty_ohlcv, repr=False)
+    error: Optional[str] = None
+    attempts: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+
+# Signatur eines Batch-Fetchers: (tickers, start, end) -> {ticker: DataFrame | Exception}
+# end ist exklusiv; eine Exception als Wert markiert einen Fehler nur für diesen Ticker
+BatchFetcher = Callable[[List[str], pd.Timestamp, pd.Timestamp], Dict[str, Union[pd.DataFrame, Exception]]]
+
+
+# ============================================
+# Fetcher
+# ============================================
+class FetchError(Exception):
+    pass
+
+
+# yf.download setzt bei jedem Aufruf die Modul-Globals yf.shared._DFS / _ERRORS zurück und
+# ist daher nicht thread-sicher: Download + Auslesen der Fehler nur unter dieser Sperre
+# (Batches aus fetch_universe, Probe-Abrufe aus health.py); innerhalb eines Batches
+# parallelisiert yfinance selbst (threads=True)
+YF_LOCK = threading.Lock()
+
+# Meldungen von yfinance, die "keine Kurse" bedeuten (endgültig leer, kein Retry)
+NO_DATA_MARKERS = ("possibly delisted", "no price data found", "no data found")
+
+
+def yf_errors(yf, tickers: List[str]) -> Dict[str, Exception]:
+    # yfinance meldet Fehler einzelner Ticker im Batch (Timeout, Rate-Limit, ...) nicht als
+    # Exception, sondern nur in yf.shared._ERRORS -> als Fehler pro Ticker, damit fetch_batch
+    # sie erneut versucht statt sie als leer abzuhaken
+    errors = getattr(getattr(yf, "shared", None), "_ERRORS", None) or {}
+    out = {}
+    for t in tickers:
+        msg = errors.get(t.upper(), errors.get(t))
+        if msg and not any(m in str(msg).lower() for m in NO_DATA_MARKERS):
+            out[t] = FetchError(str(msg))
+    return out
+
+
+def yf_batch_fetch(tickers: List[str], start: pd.Timestamp, end: pd.Timestamp) -> Dict[str, Union[pd.DataFrame, Exception]]:
+    import yfinance as yf
+
+    with YF_LOCK:
+        raw = yf.download(
+            tickers,
+            start=start,
+            end=end,
+            interval="1d",
+            auto_adjust=True,
+            group_by="ticker",
+            threads=True,
+            progress=False,
+        )
+        errors = yf_errors(yf, tickers)
+
+    out = {}
+    for t in tickers:
+        if t in errors:
+            out[t] = errors[t]
+        elif raw is None or raw.empty:
+            out[t] = empty_ohlcv()
+        elif isinstance(raw.columns, pd.MultiIndex) and t in raw.columns.get_level_values(0):
+            out[t] = normalize_ohlcv(raw[t])
+        elif not isinstance(raw.columns, pd.MultiIndex) and len(tickers) == 1:
+            out[t] = normalize_ohlcv(raw)
+        else:
+            out[t] = empty_ohlcv()
+    return out
+
+
+def offline_batch_fetch(tickers: List[str], start: pd.Timestamp, end: pd.Timestamp) -> Dict[str, pd.DataFrame]:
+    # Kein Netz: jeder Ticker liefert "keine neuen Daten"
+    return {t: empty_ohlcv() for t in tickers}
+
+
+# ============================================
+# Batch mit Retry laden
+# ============================================
+def _backoff_delay(backoff: float, attempt: int) -> float:
+    return backoff * (2 ** (attempt - 1))
+
+
+def fetch_batch(
+    tickers: List[str],
+    start,
+    end,
+    fetcher: BatchFetcher = yf_batch_fetch,
+    retries: int = 3,
+    backoff: float = 1.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Dict[str, FetchResult]:
+
+    start = pd.Timestamp(start)
+    end = pd.Timestamp(end)
+
+    results: Dict[str, FetchResult] = {}
+    pending = list(tickers)
+    attempt = 0
+
+    while pending and attempt < retries:
+        attempt += 1
+
+        try:
+            frames = fetcher(pending, start, end)
+        except Exception as e:
+            frames = {t: e for t in pending}
+
+        failed = []
+        for t in pending:
+            frame = frames.get(t)
+
+            if isinstance(frame, Exception):
+                results[t] = FetchResult(t, STATUS_ERROR, error=f"{type(frame).__name__}: {frame}", attempts=attempt)
+                failed.append(t)
+                continue
+
+            frame = normalize_ohlcv(frame)
+            status = STATUS_OK if not frame.empty else STATUS_EMPTY
+            results[t] = FetchResult(t, status, data=frame, attempts=attempt)
+
+        # Nur fehlerhafte Ticker erneut versuchen – leere Antworten sind endgültig
+        pending = failed
+        if pending and attempt < retries:
+            sleep(_backoff_delay(backoff, attempt))
+
+    return results
+
+
+# ============================================
+# Universum laden
+# ============================================
+def fetch_universe(
+    tickers: List[str],
+    start,
+    end,
+    fetcher: BatchFetcher = yf_batch_fetch,
+    batch_size: int = 25,
+    max_workers: int = 4,
+    retries: int = 3,
+    backoff: float = 1.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Dict[str, FetchResult]:
+
+    # Reihenfolge beibehalten, Duplikate nur einmal laden
+    unique = list(dict.fromkeys(tickers))
+    if not unique:
+        return {}
+
+    batches = [unique[i:i + batch_size] for i in range(0, len(unique), batch_size)]
+
+    results: Dict[str, FetchResult] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as pool:
+        futures = [
+            pool.submit(fetch_batch, batch, start, end, fetcher, retries, backoff, sleep)
+            for batch in batches
+        ]
+        for fut in futures:
+            results.update(fut.result())
+
+    return {t: results[t] for t in unique}
+
+
+def summarize(results: Dict[str, FetchResult]) -> Dict[str, int]:
+    summary = {STATUS_OK: 0, STATUS_EMPTY: 0, STATUS_ERROR: 0}
+    for r in results.values():
+        summary[r.status] = summary.get(r.status, 0) + 1
+    return summary
@@ -0,0 +1,206 @@
+# health.py
+#
+# Ticker-Health: persistenter Negativ-Cache für Ticker ohne Daten
+# - Leere Antworten, veraltete Bestände und Fehler werden mit Zeitstempel festgehalten
+# - Tote Ticker (leer / veraltet, oder ERROR_THRESHOLD Fehler in Folge) werden nicht mehr angefragt
+# - Nach Ablauf der TTL: kurzer Probe-Abruf im Hintergrund statt Abruf im eigentlichen Lauf;
+#   liefert der Ticker wieder Daten, ist er ab dem nächsten Lauf wieder dabei
+# - Schutz vor Massen-Ausfällen: liefert mehr als die Hälfte eines Abrufs nichts,
+#   gilt das als Störung der Quelle und wird nicht gespeichert
+# - OFFLINE=1: nur lesen, nichts aufzeichnen und nicht proben
+
+import datetime
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from data_access import STATUS_ERROR, STATUS_OK, BatchFetcher, FetchResult, fetch_batch
+
+
+# ============================================
+# Konfiguration
+# ============================================
+HEALTH_FILE = os.getenv("TICKER_HEALTH_FILE", "ticker_health.json")
+TTL_DAYS = float(os.getenv("TICKER_HEALTH_TTL_DAYS", "14"))          # tote Ticker bis zum nächsten Probe
+ERROR_TTL_HOURS = float(os.getenv("TICKER_ERROR_TTL_HOURS", "24"))    # wiederholt fehlerhafte Ticker
+ERROR_THRESHOLD = int(os.getenv("TICKER_ERROR_THRESHOLD", "3"))
+STALE_DAYS = int(os.getenv("TICKER_STALE_DAYS", "10"))                 # letzter Bar älter -> wie leer
+PROBE_LIMIT = int(os.getenv("TICKER_PROBE_LIMIT", "20"))               # Probes pro Lauf
+PROBE_WINDOW_DAYS = 10
+
+OUTAGE_SHARE = 0.5
+OUTAGE_MIN = 5
+
+STATUS_STALE = "stale"
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now().replace(microsecond=0)
+
+
+def _ts(x: datetime.datetime) -> str:
+    return x.isoformat(timespec="seconds")
+
+
+# ============================================
+# Health-Cache
+# ============================================
+class TickerHealth:
+
+    def __init__(
+        self,
+        path: Optional[str] = HEALTH_FILE,
+        ttl_days: float = TTL_DAYS,
+        error_ttl_hours: float = ERROR_TTL_HOURS,
+        error_threshold: int = ERROR_THRESHOLD,
+        stale_days: int = STALE_DAYS,
+        enabled: Optional[bool] = None,
+    ):
+        self.path = path
+        self.ttl = datetime.timedelta(days=ttl_days)
+        self.error_ttl = datetime.timedelta(hours=error_ttl_hours)
+        self.error_threshold = error_threshold
+        self.stale_days = stale_days
+        self.enabled = os.getenv("OFFLINE") != "1" if enabled is None else enabled
+
+        self.entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._probe: Optional[Future] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    # ----------------------------
+    # Abfragen
+    # ----------------------------
+    def is_skipped(self, ticker: str) -> bool:
+        entry = self.entries.get(ticker)
+        return bool(entry and entry.get("dead"))
+
+    def partition(self, tickers: Iterable[str]):
+        active, skipped = [], []
+        for t in tickers:
+            (skipped if self.is_skipped(t) else active).append(t)
+        return active, skipped
+
+    def due_for_probe(self, now: Optional[datetime.datetime] = None, limit: int = PROBE_LIMIT) -> List[str]:
+        now = now or _now()
+        due = [
+            (e["last_checked"], t) for t, e in self.entries.items()
+            if e.get("dead") and datetime.datetime.fromisoformat(e["skip_until"]) <= now
+        ]
+        return [t for _, t in sorted(due)[:limit]]
+
+    def summary(self) -> Dict[str, int]:
+        out = {"tracked": len(self.entries), "dead": 0}
+        for e in self.entries.values():
+            out["dead"] += int(bool(e.get("dead")))
+            out[e["status"]] = out.get(e["status"], 0) + 1
+        return out
+
+    # ----------------------------
+    # Aufzeichnen
+    # ----------------------------
+    def classify(self, res: FetchResult, now: datetime.datetime) -> str:
+        if res.status != STATUS_OK:
+            return res.status
+        # Bestand aus dem PriceStore ohne neue Bars (z.B. delistet, aber lokal noch vorhanden)
+        last = res.data.index[-1] if not res.data.empty else None
+        if last is not None and last < pd.Timestamp(now.date()) - pd.Timedelta(days=self.stale_days):
+            return STATUS_STALE
+        return STATUS_OK
+
+    def record(self, results: Dict[str, FetchResult], now: Optional[datetime.datetime] = None, guard: bool = True) -> None:
+        if not self.enabled or not results:
+            return
+        now = now or _now()
+        statuses = {t: self.classify(res, now) for t, res in results.items()}
+
+        bad = sum(s != STATUS_OK for s in statuses.values())
+        if guard and len(statuses) >= OUTAGE_MIN and bad > OUTAGE_SHARE * len(statuses):
+            print(f"Ticker-Health: {bad}/{len(statuses)} ohne Daten – vermutlich Störung der Quelle, nicht gespeichert")
+            return
+
+        with self._lock:
+            for t, status in statuses.items():
+                if status == STATUS_OK:
+                    self.entries.pop(t, None)
+                    continue
+
+                e = self.entries.setdefault(t, {"first_failure": _ts(now), "failures": 0, "errors": 0})
+                e["status"] = status
+                e["last_checked"] = _ts(now)
+
+                if status == STATUS_ERROR:
+                    # Fehler sind meist vorübergehend: erst nach mehreren in Folge pausieren
+                    e["errors"] += 1
+                    e["last_error"] = results[t].error
+                    if e["errors"] >= self.error_threshold:
+                        e["dead"] = True
+                        e["skip_until"] = _ts(now + self.error_ttl)
+                else:
+                    # Leer / veraltet: TTL verdoppelt sich bei wiederholtem Befund (max. 8x)
+                    e["failures"] += 1
+                    e["errors"] = 0
+                    e["dead"] = True
+                    e["skip_until"] = _ts(now + self.ttl * min(2 ** (e["failures"] - 1), 8))
+
+    # ----------------------------
+    # Probe im Hintergrund
+    # ----------------------------
+    def reprobe(self, fetcher: BatchFetcher, now: Optional[datetime.datetime] = None, limit: int = PROBE_LIMIT) -> Optional[Future]:
+        if not self.enabled:
+            return None
+        now = now or _now()
+        due = self.due_for_probe(now, limit)
+        if not due:
+            return None
+
+        print(f"Ticker-Health: prüfe {len(due)} pausierte Ticker im Hintergrund")
+        start = pd.Timestamp(now.date()) - pd.Timedelta(days=PROBE_WINDOW_DAYS)
+        end = pd.Timestamp(now.date()) + pd.Timedelta(days=1)
+
+        # Läuft parallel zum eigentlichen Abruf: yfinance-Aufrufe beider Seiten teilen
+        # data_access.YF_LOCK, sonst überschreiben sie sich gegenseitig die Ergebnisse
+        def probe():
+            results = fetch_batch(due, start, end, fetcher, retries=1)
+            # Probes betreffen nur tote Ticker -> kein Störungsschutz
+            self.record(results, now, guard=False)
+            return results
+
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ticker-probe")
+        self._probe = self._pool.submit(probe)
+        return self._probe
+
+    def finish(self, timeout: Optional[float] = 60) -> None:
+        # Probe abwarten (begrenzt) und speichern
+        if self._probe is not None:
+            try:
+                results = self._probe.result(timeout)
+                revived = [t for t, r in results.items() if r.status == STATUS_OK]
+                if revived:
+                    print("Ticker-Health: wieder aktiv ab nächstem Lauf:", ", ".join(revived))
+            except Exception as e:
+                print("Ticker-Health: Probe fehlgeschlagen:", e)
+            self._pool.shutdown(wait=False)
+            self._probe = None
+        self.save()
+
+    def save(self) -> None:
+        if not self.path or not self.enabled:
+            return
+        with self._lock:
+            data = json.dumps(self.entries, indent=1, sort_keys=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
@@ -0,0 +1,283 @@
+# indicators.py
+#
+# Gemeinsame Indikator-Bibliothek für alle Screener
+# - SMA / EMA / ATR / ADX / Slope / Rolling-Max / Momentum an einer Stelle
+# - Einmal pro Ticker und Datenstand berechnet, LRU-Cache mit Verdrängung
+# - Inkrementelle O(1)-Updates beim Anhängen eines neuen Bars (laufende Summen, EWM-Zustand)
+
+import math
+import os
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================
+# Hilfsfunktionen
+# ============================================
+VERSION_FIELDS = ("Close", "High", "Low", "Volume")
+
+
+def to_1d(x) -> pd.Series:
+    if isinstance(x, pd.DataFrame):
+        x = x.iloc[:, 0]
+    return x.astype(float)
+
+
+def data_version(df: pd.DataFrame) -> tuple:
+    # Ändert sich bei neuen Bars und bei rückwirkend angepassten Kursen; alle Eingaben der
+    # Indikatoren (Close für SMA/EMA, High/Low für ATR/ADX, Volume für volume_sma)
+    if df.empty:
+        return (0,)
+    version = [len(df), int(df.index[0].value), int(df.index[-1].value)]
+    for name in VERSION_FIELDS:
+        if name in df.columns:
+            values = to_1d(df[name]).to_numpy(dtype=np.float64)
+            version += [float(values[-1]), float(np.nansum(values))]
+    return tuple(version)
+
+
+# ============================================
+# LRU-Cache
+# ============================================
+class IndicatorCache:
+
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, pd.Series]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, fn: Callable[[], pd.Series]) -> pd.Series:
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+        self.misses += 1
+        value = fn()
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+CACHE = IndicatorCache(int(os.getenv("INDICATOR_CACHE_SIZE", "2048")))
+
+
+# ============================================
+# Indikatoren eines Tickers
+# ============================================
+class Indicators:
+
+    def __init__(self, df: pd.DataFrame, ticker: Optional[str] = None, cache: Optional[IndicatorCache] = CACHE):
+        self.df = df
+        self.ticker = ticker
+        self.cache = cache if ticker is not None else None
+        self.close = to_1d(df["Close"])
+        self.version = data_version(df)
+
+    def _series(self, name: str) -> pd.Series:
+        return to_1d(self.df[name])
+
+    def _cached(self, name: str, params: tuple, fn: Callable[[], pd.Series]) -> pd.Series:
+        if self.cache is None:
+            return fn()
+        return self.cache.get_or_compute((self.ticker, self.version, name, params), fn)
+
+    # ----------------------------
+    # Trend
+    # ----------------------------
+    def sma(self, window: int) -> pd.Series:
+        return self._cached("sma", (window,), lambda: self.close.rolling(window).mean())
+
+    def ema(self, span: int) -> pd.Series:
+        return self._cached("ema", (span,), lambda: self.close.ewm(span=span).mean())
+
+    def slope(self, window: int = 200, lag: int = 10) -> pd.Series:
+        return self._cached("slope", (window, lag), lambda: self.sma(window) - self.sma(window).shift(lag))
+
+    # ----------------------------
+    # Volatilität / Trendstärke
+    # ----------------------------
+    def atr(self, n: int = 14) -> pd.Series:
+        def compute():
+            high, low, close = self._series("High"), self._series("Low"), self.close
+            tr1 = high - low
+            tr2 = (high - close.shift(1)).abs()
+            tr3 = (low - close.shift(1)).abs()
+            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+            return tr.ewm(alpha=1 / n).mean()
+
+        return self._cached("atr", (n,), compute)
+
+    def adx(self, n: int = 14) -> pd.Series:
+        def compute():
+            high, low = self._series("High"), self._series("Low")
+            up = high.diff()
+            down = -low.diff()
+
+            plus_dm = np.where((up > down) & (up > 0), up, 0.0).reshape(-1,)
+            minus_dm = np.where((down > up) & (down > 0), down, 0.0).reshape(-1,)
+
+            plus = pd.Series(plus_dm, index=self.close.index).ewm(alpha=1 / n).mean()
+            minus = pd.Series(minus_dm, index=self.close.index).ewm(alpha=1 / n).mean()
+
+            atr = self.atr(n)
+            plus_di = 100 * plus / atr
+            minus_di = 100 * minus / atr
+
+            dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
+            return dx.ewm(alpha=1 / n).mean()
+
+        return self._cached("adx", (n,), compute)
+
+    # ----------------------------
+    # Momentum / Breakout / Volumen
+    # ----------------------------
+    def pct_change(self, periods: int) -> pd.Series:
+        return self._cached("pct_change", (periods,), lambda: self.close.pct_change(periods))
+
+    def rolling_max(self, window: int) -> pd.Series:
+        return self._cached("rolling_max", (window,), lambda: self.close.rolling(window).max())
+
+    def volume_sma(self, window: int) -> pd.Series:
+        return self._cached("volume_sma", (window,), lambda: self._series("Volume").rolling(window).mean())
+
+
+# ============================================
+# Inkrementelle Zustände (O(1) pro neuem Bar)
+# ============================================
+class RollingMean:
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: deque = deque()
+        self.total = 0.0
+        self.comp = 0.0      # Neumaier-Kompensation gegen Drift der laufenden Summe
+
+    def _add(self, x: float) -> None:
+        t = self.total + x
+        if abs(self.total) >= abs(x):
+            self.comp += (self.total - t) + x
+        else:
+            self.comp += (x - t) + self.total
+        self.total = t
+
+    def update(self, x: float) -> float:
+        self.values.append(float(x))
+        self._add(float(x))
+        if len(self.values) > self.window:
+            self._add(-self.values.popleft())
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if len(self.values) < self.window:
+            return float("nan")
+        return (self.total + self.comp) / self.window
+
+    def state(self) -> dict:
+        return {"window": self.window, "values": list(self.values)}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "RollingMean":
+        obj = cls(state["window"])
+        for x in state["values"]:
+            obj.values.append(float(x))
+        obj.total = math.fsum(obj.values)
+        return obj
+
+    @classmethod
+    def from_series(cls, values, window: int) -> "RollingMean":
+        return cls.from_state({"window": window, "values": list(np.asarray(values, dtype=np.float64)[-window:])})
+
+
+class EwmMean:
+    # Entspricht pandas ewm(..., adjust=True): Zähler und Nenner der gewichteten Summe
+
+    def __init__(self, alpha: float, num: float = 0.0, den: float = 0.0):
+        self.alpha = alpha
+        self.num = num
+        self.den = den
+
+    @classmethod
+    def from_span(cls, span: int) -> "EwmMean":
+        return cls(2.0 / (span + 1.0))
+
+    def update(self, x: float) -> float:
+        decay = 1.0 - self.alpha
+        if self.den > 0.0:
+            self.num *= decay
+            self.den *= decay
+        if not math.isnan(x):
+            self.num += x
+            self.den += 1.0
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.num / self.den if self.den > 0.0 else float("nan")
+
+    def state(self) -> dict:
+        return {"alpha": self.alpha, "num": self.num, "den": self.den}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "EwmMean":
+        return cls(state["alpha"], state["num"], state["den"])
+
+    @classmethod
+    def from_series(cls, values, alpha: float) -> "EwmMean":
+        x = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(x)
+        if not valid.any():
+            return cls(alpha)
+        # Gewichte ab der ersten gültigen Beobachtung, wie pandas bei führenden NaN
+        x = x[int(np.argmax(valid)):]
+        decay = 1.0 - alpha
+        weights = decay ** np.arange(x.shape[0] - 1, -1, -1, dtype=np.float64)
+        ok = ~np.isnan(x)
+        return cls(alpha, float(weights[ok] @ x[ok]), float(weights[ok].sum()))
+
+
+class IncrementalIndicators:
+    # Laufende SMA/EMA-Zustände eines Tickers, serialisierbar für Checkpoints
+
+    def __init__(self, sma_windows=(20, 50, 200), ema_spans=(50, 100, 200)):
+        self.sma: Dict[int, RollingMean] = {w: RollingMean(w) for w in sma_windows}
+        self.ema: Dict[int, EwmMean] = {s: EwmMean.from_span(s) for s in ema_spans}
+
+    @classmethod
+    def from_history(cls, close, sma_windows=(20, 50, 200), ema_spans=(50, 100, 200)) -> "IncrementalIndicators":
+        obj = cls(sma_windows, ema_spans)
+        obj.sma = {w: RollingMean.from_series(close, w) for w in sma_windows}
+        obj.ema = {s: EwmMean.from_series(close, 2.0 / (s + 1.0)) for s in ema_spans}
+        return obj
+
+    def update(self, x: float) -> Dict[str, float]:
+        out = {f"sma{w}": r.update(x) for w, r in self.sma.items()}
+        out.update({f"ema{s}": e.update(x) for s, e in self.ema.items()})
+        return out
+
+    def state(self) -> dict:
+        return {
+            "sma": {str(w): r.state() for w, r in self.sma.items()},
+            "ema": {str(s): e.state() for s, e in self.ema.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "IncrementalIndicators":
+        obj = cls((), ())
+        obj.sma = {int(w): RollingMean.from_state(s) for w, s in state["sma"].items()}
+        obj.ema = {int(s): EwmMean.from_state(e) for s, e in state["ema"].items()}
+        return obj
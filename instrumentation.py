@@ -0,0 +1,184 @@
+# instrumentation.py
+#
+# Leichtgewichtige Laufzeit-Messung für die Screener
+# - Zeit + Zeilenzahl pro Stufe (Universum, Download, Indikatoren, Signale, Telegram, Excel)
+# - Zeiten pro Ticker -> langsamste Ticker im Report
+# - Maschinenlesbarer JSON-Run-Report
+# - Optional (RUN_PROFILE=1): cProfile- und tracemalloc-Dumps des Hot Paths
+
+import cProfile
+import datetime
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+# ============================================
+# Konfiguration
+# ============================================
+PROFILE = os.getenv("RUN_PROFILE") == "1"
+REPORT_DIR = os.getenv("RUN_REPORT_DIR", ".")
+SLOWEST_N = 10
+
+
+# ============================================
+# Stufen-Statistik
+# ============================================
+class StageTiming:
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows = 0
+
+    def as_dict(self) -> dict:
+        return {"calls": self.calls, "seconds": round(self.seconds, 4), "rows": self.rows}
+
+
+class Stage:
+    # Wird im with-Block zurückgegeben, damit der Aufrufer die Zeilenzahl setzen kann
+
+    def __init__(self, rows: int = 0):
+        self.rows = rows
+
+
+# ============================================
+# Run-Report
+# ============================================
+class RunReport:
+
+    def __init__(self, name: str, profile: bool = PROFILE, report_dir: str = REPORT_DIR):
+        self.name = name
+        self.profile = profile
+        self.report_dir = report_dir
+        self.started = datetime.datetime.now()
+        self._t0 = time.perf_counter()
+
+        self.stages: Dict[str, StageTiming] = {}
+        self.tickers: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.info: Dict[str, object] = {}
+        self.artifacts: Dict[str, str] = {}
+
+    # ----------------------------
+    # Messen
+    # ----------------------------
+    def record(self, stage: str, seconds: float, rows: int = 0, ticker: Optional[str] = None) -> None:
+        s = self.stages.setdefault(stage, StageTiming())
+        s.calls += 1
+        s.seconds += seconds
+        s.rows += rows or 0
+
+        if ticker is not None:
+            per = self.tickers.setdefault(ticker, {})
+            per[stage] = per.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str, ticker: Optional[str] = None, rows: int = 0):
+        st = Stage(rows)
+        t0 = time.perf_counter()
+        try:
+            yield st
+        finally:
+            self.record(name, time.perf_counter() - t0, st.rows, ticker)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    # ----------------------------
+    # Profiling des Hot Paths (nur mit RUN_PROFILE=1)
+    # ----------------------------
+    @contextmanager
+    def profiled(self, label: str):
+        if not self.profile:
+            yield
+            return
+
+        prof = cProfile.Profile()
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(10)
+
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+
+            base = os.path.join(self.report_dir, f"run_{self.name}_{label}")
+            prof.dump_stats(base + ".prof")
+            self.artifacts[f"{label}_cprofile"] = base + ".prof"
+
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            with open(base + "_tracemalloc.txt", "w", encoding="utf-8") as f:
+                f.write(f"Peak: {peak / 2 ** 20:.2f} MB\n\n")
+                for stat in snapshot.statistics("lineno")[:30]:
+                    f.write(f"{stat}\n")
+            self.artifacts[f"{label}_tracemalloc"] = base + "_tracemalloc.txt"
+            self.info[f"{label}_peak_mb"] = round(peak / 2 ** 20, 2)
+
+            if started_tracing:
+                tracemalloc.stop()
+
+    # ----------------------------
+    # Ausgabe
+    # ----------------------------
+    def as_dict(self) -> dict:
+        totals = {t: sum(v.values()) for t, v in self.tickers.items()}
+        slowest = sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:SLOWEST_N]
+
+        return {
+            "run": self.name,
+            "started": self.started.isoformat(timespec="seconds"),
+            "total_seconds": round(time.perf_counter() - self._t0, 4),
+            "stages": {k: v.as_dict() for k, v in self.stages.items()},
+            "slowest_tickers": [
+                {"ticker": t, "seconds": round(s, 4), "stages": {k: round(v, 4) for k, v in self.tickers[t].items()}}
+                for t, s in slowest
+            ],
+            "counters": self.counters,
+            "info": self.info,
+            "artifacts": self.artifacts,
+        }
+
+    def write(self, path: Optional[str] = None) -> str:
+        path = path or os.path.join(self.report_dir, f"run_report_{self.name}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2, default=str)
+        return path
+
+    def summary(self) -> str:
+        lines = [f"Laufzeit {self.name}: {time.perf_counter() - self._t0:.2f}s"]
+        for name, s in self.stages.items():
+            lines.append(f"  {name:14s} {s.seconds:8.3f}s  ({s.calls} Aufrufe, {s.rows} Zeilen)")
+        return "\n".join(lines)
+
+
+# ============================================
+# Aktiver Report – Messpunkte in Bibliotheksmodulen ohne Durchreichen
+# ============================================
+_ACTIVE: Optional[RunReport] = None
+
+
+def start_run(name: str, **kwargs) -> RunReport:
+    global _ACTIVE
+    _ACTIVE = RunReport(name, **kwargs)
+    return _ACTIVE
+
+
+def active() -> Optional[RunReport]:
+    return _ACTIVE
+
+
+@contextmanager
+def timed(stage: str, ticker: Optional[str] = None, rows: int = 0):
+    report = _ACTIVE
+    if report is None:
+        yield Stage(rows)
+        return
+    with report.stage(stage, ticker, rows) as st:
+        yield st
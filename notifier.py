@@ -0,0 +1,240 @@
+# notifier.py
+#
+# Telegram-Benachrichtigung
+# - Eine gepoolte HTTP-Session (aiohttp, sonst requests.Session im Thread)
+# - Lange Nachrichten werden an Zeilengrenzen in Teile ≤ 4096 Zeichen zerlegt
+# - Retry mit exponentiellem Backoff, 429 "retry_after" wird respektiert
+# - Eigene Event-Loop in einem Hintergrund-Thread: push() blockiert den Scan nicht,
+#   Einzelmeldungen können schon während des Scans verschickt werden
+# - TELEGRAM_API_URL zeigt für Tests auf einen lokalen Stub-Server
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+from typing import Iterable, List, Optional
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp ist optional
+    aiohttp = None
+
+
+# ============================================
+# Konfiguration
+# ============================================
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+TELEGRAM_TIMEOUT = float(os.getenv("TELEGRAM_TIMEOUT", "10"))
+TELEGRAM_RETRIES = int(os.getenv("TELEGRAM_RETRIES", "4"))
+
+# Kategorien, die sofort beim Fund gemeldet werden (z.B. "ENTRY,EXIT"); leer = nur Zusammenfassung
+TELEGRAM_PUSH_EVENTS = {x.strip().upper() for x in os.getenv("TELEGRAM_PUSH_EVENTS", "").split(",") if x.strip()}
+
+MAX_MESSAGE_LEN = 4096
+
+
+# ============================================
+# Nachricht zerlegen
+# ============================================
+def split_message(text: str, limit: int = MAX_MESSAGE_LEN) -> List[str]:
+    parts: List[str] = []
+    current = ""
+
+    for line in text.split("\n"):
+        # Einzelne überlange Zeile hart trennen
+        while len(line) > limit:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(line[:limit])
+            line = line[limit:]
+
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            parts.append(current)
+            current = line
+        else:
+            current = candidate
+
+    if current.strip():
+        parts.append(current)
+    return parts
+
+
+# ============================================
+# Versand
+# ============================================
+class DeliveryError(Exception):
+    pass
+
+
+class TelegramNotifier:
+
+    def __init__(
+        self,
+        token: Optional[str],
+        chat_id: Optional[str],
+        api_url: str = TELEGRAM_API_URL,
+        timeout: float = TELEGRAM_TIMEOUT,
+        retries: int = TELEGRAM_RETRIES,
+        backoff: float = 1.0,
+        parse_mode: Optional[str] = "Markdown",
+        push_events: Iterable[str] = TELEGRAM_PUSH_EVENTS,
+    ):
+        self.token = token
+        self.chat_id = chat_id
+        self.url = f"{api_url.rstrip('/')}/bot{token}/sendMessage"
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.parse_mode = parse_mode
+        self.push_events = {e.upper() for e in push_events}
+
+        self.sent = 0
+        self.failed = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session = None
+        self._pending: List[Future] = []
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token and self.chat_id)
+
+    # ----------------------------
+    # Hintergrund-Loop
+    # ----------------------------
+    def start(self) -> "TelegramNotifier":
+        if self._loop is not None:
+            return self
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="telegram-notifier", daemon=True)
+        self._thread.start()
+        return self
+
+    def _submit(self, coro) -> Future:
+        self.start()
+        fut = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        self._pending.append(fut)
+        return fut
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        # Wartet auf alle offenen Nachrichten, schließt Session und Loop
+        self.flush(timeout)
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._close_session(), self._loop).result(timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._loop.close()
+        self._loop = None
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        pending, self._pending = self._pending, []
+        for fut in pending:
+            try:
+                fut.result(timeout)
+            except Exception as e:
+                print("Telegram-Versand fehlgeschlagen:", e)
+
+    def __enter__(self) -> "TelegramNotifier":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ----------------------------
+    # Öffentliche API (nicht blockierend)
+    # ----------------------------
+    def push(self, text: str) -> Optional[Future]:
+        if not self.enabled:
+            print("Telegram nicht konfiguriert (TELEGRAM_TOKEN / CHAT_ID) – Nachricht nicht gesendet")
+            return None
+        return self._submit(self.send(text))
+
+    def push_event(self, category: str, text: str) -> Optional[Future]:
+        # Einzelmeldung nur für die in TELEGRAM_PUSH_EVENTS gewählten Kategorien
+        if category.upper() not in self.push_events:
+            return None
+        return self.push(text)
+
+    # ----------------------------
+    # Async-Kern
+    # ----------------------------
+    async def send(self, text: str) -> List[dict]:
+        # Teile einer Nachricht nacheinander, damit die Reihenfolge im Chat stimmt
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            results = []
+            for part in split_message(text):
+                results.append(await self._deliver(part))
+            return results
+
+    async def _deliver(self, text: str) -> dict:
+        payload = {"chat_id": self.chat_id, "text": text}
+        if self.parse_mode:
+            payload["parse_mode"] = self.parse_mode
+
+        last_error = None
+        for attempt in range(self.retries + 1):
+            try:
+                status, body = await self._post(payload)
+            except Exception as e:
+                status, body, last_error = None, {}, e
+            else:
+                if status == 200 and body.get("ok", True):
+                    self.sent += 1
+                    return body
+                last_error = DeliveryError(f"HTTP {status}: {body.get('description', '')}")
+
+                # Client-Fehler außer Rate-Limit sind endgültig (z.B. falscher Token)
+                if status is not None and 400 <= status < 500 and status != 429:
+                    break
+
+            if attempt == self.retries:
+                break
+
+            delay = self.backoff * (2 ** attempt)
+            if status == 429:
+                delay = max(delay, float(body.get("parameters", {}).get("retry_after", delay)))
+            await asyncio.sleep(delay)
+
+        self.failed += 1
+        raise DeliveryError(str(last_error))
+
+    async def _post(self, payload: dict):
+        if aiohttp is not None:
+            if self._session is None:
+                self._session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=4),
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                )
+            async with self._session.post(self.url, data=payload) as resp:
+                try:
+                    body = await resp.json(content_type=None)
+                except ValueError:
+                    body = {}
+                return resp.status, body or {}
+
+        # Fallback: requests.Session (Keep-Alive) im Worker-Thread
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        resp = await asyncio.to_thread(self._session.post, self.url, data=payload, timeout=self.timeout)
+        try:
+            body = resp.json()
+        except ValueError:
+            body = {}
+        return resp.status_code, body or {}
+
+    async def _close_session(self) -> None:
+        if self._session is None:
+            return
+        if aiohttp is not None:
+            await self._session.close()
+        else:
+            self._session.close()
+        self._session = None
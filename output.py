@@ -0,0 +1,197 @@
+# output.py
+#
+# Austauschbare Ausgabeschicht
+# - Primäre Artefakte als Parquet (pyarrow) oder CSV, blockweise geschrieben
+# - Excel nur noch als abgeleitete Sicht für kleine Berichte (heute, letzte 30)
+# - Format per OUTPUT_FORMAT: auto (Parquet wenn pyarrow installiert, sonst CSV), parquet, csv, xlsx
+# - EXCEL_VIEWS=0 schaltet die Excel-Sichten ab
+
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow ist optional
+    pa = None
+    pq = None
+
+
+# ============================================
+# Konfiguration
+# ============================================
+OUTPUT_FORMAT = os.getenv("OUTPUT_FORMAT", "auto").lower()
+EXCEL_VIEWS = os.getenv("EXCEL_VIEWS", "1") == "1"
+
+EXTENSIONS = {"parquet": ".parquet", "csv": ".csv", "xlsx": ".xlsx"}
+
+
+def resolve_format(fmt: Optional[str] = None) -> str:
+    fmt = (fmt or OUTPUT_FORMAT).lower()
+    if fmt == "auto":
+        return "parquet" if pq is not None else "csv"
+    if fmt == "parquet" and pq is None:
+        print("pyarrow nicht installiert – schreibe CSV statt Parquet")
+        return "csv"
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"Unbekanntes Ausgabeformat: {fmt}")
+    return fmt
+
+
+def output_path(base: str, fmt: Optional[str] = None) -> str:
+    # Basis ohne Endung -> Pfad mit Endung des gewählten Formats
+    root, ext = os.path.splitext(base)
+    if ext in EXTENSIONS.values():
+        base = root
+    return base + EXTENSIONS[resolve_format(fmt)]
+
+
+# ============================================
+# Senken (gemeinsame Schnittstelle: write / close / rows / columns)
+# ============================================
+class Sink(ABC):
+
+    def __init__(self, path: str, columns: Optional[List[str]] = None, default_columns: Optional[List[str]] = None):
+        self.path = path
+        self.columns = list(columns) if columns is not None else None
+        self.default_columns = default_columns or []
+        self.rows = 0
+        self._closed = False
+
+    def write(self, df: pd.DataFrame) -> None:
+        if df is None or df.empty:
+            return
+        if self.columns is None:
+            self.columns = [str(c) for c in df.columns]
+        self._write(df.reindex(columns=self.columns))
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        if self.columns is None:
+            self.columns = list(self.default_columns)
+        self._close()
+        self._closed = True
+
+    @abstractmethod
+    def _write(self, df: pd.DataFrame) -> None:
+        ...
+
+    @abstractmethod
+    def _close(self) -> None:
+        ...
+
+    def __enter__(self) -> "Sink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class CsvSink(Sink):
+    # Jeder Block wird angehängt, Kopfzeile nur einmal
+
+    def __init__(self, path: str, columns: Optional[List[str]] = None, default_columns: Optional[List[str]] = None):
+        super().__init__(path, columns, default_columns)
+        self._header_written = False
+
+    def _write(self, df: pd.DataFrame) -> None:
+        df.to_csv(self.path, mode="a" if self._header_written else "w", header=not self._header_written, index=False)
+        self._header_written = True
+
+    def _close(self) -> None:
+        if not self._header_written:
+            pd.DataFrame(columns=self.columns).to_csv(self.path, index=False)
+
+
+class ParquetSink(Sink):
+    # Ein Row-Group pro Block; Schema vom ersten Block
+
+    def __init__(self, path: str, columns: Optional[List[str]] = None, default_columns: Optional[List[str]] = None):
+        if pq is None:
+            raise ImportError("ParquetSink benötigt pyarrow")
+        super().__init__(path, columns, default_columns)
+        self._writer = None
+
+    def _write(self, df: pd.DataFrame) -> None:
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = pa.Table.from_pandas(df, schema=self._writer.schema, preserve_index=False, safe=False)
+        self._writer.write_table(table)
+
+    def _close(self) -> None:
+        if self._writer is None:
+            schema = pa.schema([(c, pa.string()) for c in self.columns])
+            pq.write_table(schema.empty_table(), self.path)
+            return
+        self._writer.close()
+
+
+class ExcelSink(Sink):
+    # openpyxl im write_only-Modus: Zeilen werden direkt serialisiert statt im Workbook gehalten
+
+    def __init__(self, path: str, columns: Optional[List[str]] = None, default_columns: Optional[List[str]] = None):
+        from openpyxl import Workbook
+
+        super().__init__(path, columns, default_columns)
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet()
+        self._header_written = False
+
+    def _header(self) -> None:
+        if not self._header_written:
+            self._ws.append(self.columns)
+            self._header_written = True
+
+    def _write(self, df: pd.DataFrame) -> None:
+        self._header()
+
+        # NaN -> leere Zelle (wie DataFrame.to_excel)
+        values = df.astype(object)
+        values = values.where(values.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            self._ws.append(list(row))
+
+    def _close(self) -> None:
+        self._header()
+        self._wb.save(self.path)
+
+
+SINKS = {"parquet": ParquetSink, "csv": CsvSink, "xlsx": ExcelSink}
+
+
+def open_sink(base: str, fmt: Optional[str] = None, columns: Optional[List[str]] = None, default_columns: Optional[List[str]] = None) -> Sink:
+    fmt = resolve_format(fmt)
+    return SINKS[fmt](output_path(base, fmt), columns, default_columns)
+
+
+# ============================================
+# Kleine Berichte: Primärformat + optionale Excel-Sicht
+# ============================================
+def write_table(df: pd.DataFrame, base: str, fmt: Optional[str] = None) -> str:
+    with open_sink(base, fmt, columns=list(df.columns)) as sink:
+        sink.write(df)
+    return sink.path
+
+
+def write_view(df: pd.DataFrame, base: str, fmt: Optional[str] = None, excel: bool = EXCEL_VIEWS) -> List[str]:
+    paths = [write_table(df, base, fmt)]
+    if excel and resolve_format(fmt) != "xlsx":
+        path = output_path(base, "xlsx")
+        df.to_excel(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def read_table(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    if path.endswith(".xlsx"):
+        return pd.read_excel(path)
+    return pd.read_csv(path)
@@ -0,0 +1,189 @@
+# panel.py
+#
+# Querschnitts-Panel: ganzes Universum als Datum × Ticker-Matrix
+# - Gemeinsamer Kalender, fehlende Bars als NaN maskiert
+# - Rolling-Means, EWMs, Momentum jeweils als eine vektorisierte Operation über alle Spalten
+# - Trendscreener-Masken als Regeln (rules.py) über das ganze Panel
+# - Fenster zählen die eigenen Bars jedes Tickers: Spalten mit gleichem Handelskalender
+#   (z.B. alle .DE- bzw. alle US-Ticker) werden gemeinsam auf ihren Zeilen gerechnet und
+#   erst danach auf den gemeinsamen Kalender verteilt -> identisch zur Einzelberechnung,
+#   Feiertage der anderen Börse blanken keine SMA200 mehr
+
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_access import FIELDS
+from rules import TREND_RULES, PanelSource, compile_rules, frames, load_ruleset
+
+
+TREND_RULES_FILE = os.getenv("TREND_RULES_FILE")
+
+
+# ============================================
+# Panel
+# ============================================
+class Panel:
+
+    def __init__(self, fields: Dict[str, pd.DataFrame], valid: Optional[np.ndarray] = None):
+        self.fields = fields
+        first = fields["Close"] if "Close" in fields else next(iter(fields.values()))
+        self.dates: pd.DatetimeIndex = first.index
+        self.tickers: List[str] = list(first.columns)
+        # Zeilen, an denen ein Ticker eine eigene Bar hat (Datum × Ticker)
+        self.rows: np.ndarray = first.notna().to_numpy() if valid is None else valid
+        self._groups: Optional[List[Tuple[np.ndarray, np.ndarray]]] = None
+        self._memo: Dict[tuple, pd.DataFrame] = {}
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], fields: Iterable[str] = FIELDS) -> "Panel":
+        frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+        fields = [f for f in fields if all(f in df.columns for df in frames.values())]
+
+        if not frames:
+            empty = pd.DataFrame(index=pd.DatetimeIndex([], name="Date"), dtype=float)
+            return cls({f: empty for f in fields or ["Close"]})
+
+        # Gemeinsamer Kalender = Vereinigung aller Handelstage
+        calendar = pd.DatetimeIndex(np.unique(np.concatenate([df.index.values for df in frames.values()])), name="Date")
+        tickers = list(frames.keys())
+        positions = [calendar.get_indexer(df.index) for df in frames.values()]
+
+        valid = np.zeros((len(calendar), len(tickers)), dtype=bool)
+        for j, pos in enumerate(positions):
+            valid[pos, j] = True
+
+        out = {}
+        for f in fields:
+            matrix = np.full((len(calendar), len(tickers)), np.nan, dtype=np.float64)
+            for j, df in enumerate(frames.values()):
+                matrix[positions[j], j] = df[f].to_numpy(dtype=np.float64)
+            out[f] = pd.DataFrame(matrix, index=calendar, columns=tickers)
+        return cls(out, valid)
+
+    def __getitem__(self, field: str) -> pd.DataFrame:
+        return self.fields[field]
+
+    @property
+    def close(self) -> pd.DataFrame:
+        return self.fields["Close"]
+
+    @property
+    def volume(self) -> pd.DataFrame:
+        return self.fields["Volume"]
+
+    def valid(self, field: str = "Close") -> pd.DataFrame:
+        return self.fields[field].notna()
+
+    def frame(self, ticker: str) -> pd.DataFrame:
+        # Einzelner Ticker zurück als OHLCV-Frame (ohne NaN-Zeilen)
+        df = pd.DataFrame({f: x[ticker] for f, x in self.fields.items()})
+        return df.dropna(subset=["Close"])
+
+    # ----------------------------
+    # Kalendergruppen: Spalten mit gleichen eigenen Zeilen
+    # ----------------------------
+    def calendar_groups(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        # Zeilen vor der ersten / nach der letzten Bar ändern kein Fenster -> zählen als
+        # Handelstage, damit Ticker mit anderem Start (IPO, kürzere Historie) in der
+        # Gruppe ihrer Börse bleiben; nur echte Lücken trennen Gruppen
+        if self._groups is None:
+            seen = np.cumsum(self.rows, axis=0) > 0
+            ahead = np.cumsum(self.rows[::-1], axis=0)[::-1] > 0
+            key = self.rows | ~seen | ~ahead
+
+            groups: Dict[bytes, List[int]] = {}
+            for j in range(key.shape[1]):
+                groups.setdefault(np.packbits(key[:, j]).tobytes(), []).append(j)
+            self._groups = [(np.flatnonzero(key[:, cols[0]]), np.asarray(cols)) for cols in groups.values()]
+        return self._groups
+
+    def per_ticker(self, x, fn) -> pd.DataFrame:
+        # fn auf den eigenen Zeilen jeder Kalendergruppe, Ergebnis zurück auf den Kalender;
+        # außerhalb der eigenen Bars NaN
+        values = np.asarray(x, dtype=np.float64)
+        groups = self.calendar_groups()
+
+        if len(groups) == 1 and len(groups[0][0]) == len(self.dates):
+            out = np.array(fn(pd.DataFrame(values)), dtype=np.float64)
+        else:
+            out = np.full_like(values, np.nan)
+            for rows, cols in groups:
+                idx = np.ix_(rows, cols)
+                out[idx] = np.asarray(fn(pd.DataFrame(values[idx])), dtype=np.float64)
+
+        out[~self.rows] = np.nan
+        return pd.DataFrame(out, index=self.dates, columns=self.tickers)
+
+    # ----------------------------
+    # Vektorisierte Operationen über alle Spalten (memoisiert)
+    # ----------------------------
+    def _cached(self, key: tuple, fn) -> pd.DataFrame:
+        if key not in self._memo:
+            self._memo[key] = fn()
+        return self._memo[key]
+
+    def sma(self, window: int, field: str = "Close") -> pd.DataFrame:
+        return self._cached(("sma", field, window), lambda: self.per_ticker(self.fields[field], lambda x: x.rolling(window).mean()))
+
+    def ema(self, span: int, field: str = "Close") -> pd.DataFrame:
+        return self._cached(("ema", field, span), lambda: self.per_ticker(self.fields[field], lambda x: x.ewm(span=span).mean()))
+
+    def rolling_max(self, window: int, field: str = "Close") -> pd.DataFrame:
+        return self._cached(("rolling_max", field, window), lambda: self.per_ticker(self.fields[field], lambda x: x.rolling(window).max()))
+
+    def rolling_min(self, window: int, field: str = "Close") -> pd.DataFrame:
+        return self._cached(("rolling_min", field, window), lambda: self.per_ticker(self.fields[field], lambda x: x.rolling(window).min()))
+
+    def pct_change(self, periods: int, field: str = "Close") -> pd.DataFrame:
+        def ret(x: pd.DataFrame) -> np.ndarray:
+            x = x.to_numpy()
+            out = np.full_like(x, np.nan)
+            if 0 < periods < x.shape[0]:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    out[periods:] = x[periods:] / x[:-periods] - 1.0
+            return out
+
+        return self._cached(("pct_change", field, periods), lambda: self.per_ticker(self.fields[field], ret))
+
+    def shift(self, x, periods: int) -> pd.DataFrame:
+        # Um eigene Bars verschieben (nicht um Kalenderzeilen)
+        return self.per_ticker(x, lambda v: v.shift(periods))
+
+
+# ============================================
+# Trendscreener-Masken für das ganze Panel (Regeln aus rules.py)
+# ============================================
+def trend_masks(panel: Panel, rules: Optional[Dict[str, str]] = None) -> Dict[str, pd.DataFrame]:
+    # TREND_RULES_FILE=regeln.json ergänzt / ersetzt die Standard-Regeln ohne Codeänderung
+    ruleset = compile_rules(rules) if rules else load_ruleset(TREND_RULES_FILE, TREND_RULES)
+    return frames(ruleset.evaluate(PanelSource(panel)), panel.close)
+
+
+def compute_signals_panel(panel: Panel, mask: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    # Gleiches Ausgabeformat wie trendscreener.compute_signals, für alle Ticker auf einmal
+    if mask is None:
+        mask = trend_masks(panel)["signal"]
+
+    m = mask.to_numpy()
+    rows, cols = np.nonzero(m)
+    if rows.size == 0:
+        return pd.DataFrame()
+
+    # Sortierung wie bisher: Ticker für Ticker, innerhalb chronologisch
+    order = np.lexsort((rows, cols))
+    rows, cols = rows[order], cols[order]
+
+    tickers = np.asarray(panel.tickers, dtype=object)
+    out = pd.DataFrame({
+        "Close": panel.close.to_numpy()[rows, cols],
+        "Volume": panel.volume.to_numpy()[rows, cols],
+    })
+    out["ticker"] = tickers[cols]
+    out["date"] = panel.dates[rows]
+    out["ret_3m"] = panel.pct_change(63).to_numpy()[rows, cols]
+    out["ret_6m"] = panel.pct_change(126).to_numpy()[rows, cols]
+    out["ret_12m"] = panel.pct_change(252).to_numpy()[rows, cols]
+    return out
@@ -0,0 +1,61 @@
+# pipeline.py
+#
+# Streaming-Pipeline: Laden → Indikatoren → Signale → Senke
+# - Universum blockweise laden (ein gebündelter Abruf pro Block)
+# - Nächster Block wird geladen, während der aktuelle gerechnet wird
+# - Ergebnisse pro Block sofort an eine inkrementelle Senke (output.py), Kursdaten danach freigegeben
+# - Spitzen-Speicher hängt von der Blockgröße ab, nicht von der Universumsgröße
+
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List
+
+from data_access import FetchResult
+from instrumentation import timed
+
+
+# ============================================
+# Konfiguration
+# ============================================
+STREAM_CHUNK = int(os.getenv("STREAM_CHUNK", "100"))   # Ticker pro Block
+
+
+# ============================================
+# Quelle: Kurse blockweise aus dem PriceStore
+# ============================================
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    it = iter(items)
+    while True:
+        block = list(itertools.islice(it, max(1, size)))
+        if not block:
+            return
+        yield block
+
+
+def stream_prices(store, tickers: Iterable[str], start, end, chunk_size: int = STREAM_CHUNK, prefetch: bool = True) -> Iterator[Dict[str, FetchResult]]:
+    blocks = chunked(tickers, chunk_size)
+
+    if not prefetch:
+        for block in blocks:
+            with timed("download") as st:
+                results = store.get_many(block, start, end)
+                st.rows = sum(len(r.data) for r in results.values())
+            yield results
+        return
+
+    # Höchstens ein Block im Voraus -> Netz und Rechnen überlappen, Speicher bleibt begrenzt
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        block = next(blocks, None)
+        pending = pool.submit(store.get_many, block, start, end) if block else None
+
+        while pending is not None:
+            with timed("download") as st:
+                results = pending.result()
+                st.rows = sum(len(r.data) for r in results.values())
+
+            block = next(blocks, None)
+            pending = pool.submit(store.get_many, block, start, end) if block else None
+
+            yield results
+            del results
@@ -0,0 +1,334 @@
+# portfolio.py
+#
+# Portfolio-Simulation für den Week→Day-Backtest
+# - ENTRY/EXIT-Signale aller Ticker als ein zeitlich geordneter Event-Strom (heapq.merge)
+# - Startkapital, Positionsgröße (ATR-Risiko oder gleichgewichtet), max. gleichzeitige Positionen
+# - Am selben Tag: erst Exits (Kapital frei), dann Entries
+# - Tägliche Equity-, Drawdown- und Exposure-Reihen ohne Tagesschleife über alle Ticker:
+#   Bestandswerte nur über die Haltedauer jeder Position aufaddieren, Cash per kumulierter Summe
+#
+# Beispiel:
+#   python portfolio.py --capital 100000 --max-positions 20 --sizing atr --risk 0.01
+
+import argparse
+import heapq
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from strategy_engine import trade_indices
+
+
+# ============================================
+# Parameter
+# ============================================
+INITIAL_CAPITAL = 100_000.0
+MAX_POSITIONS = 20
+SIZING = "atr"             # "atr" oder "equal"
+RISK_PER_TRADE = 0.01      # Anteil der Equity, der bei ATR_MULT × ATR Rückgang verloren geht
+ATR_MULT = 2.0
+MAX_WEIGHT = 0.20          # max. Anteil der Equity pro Position
+FEE_BPS = 0.0              # Gebühren je Seite in Basispunkten
+
+EXIT, ENTRY = 0, 1         # Sortierschlüssel: Exits vor Entries am selben Tag
+
+
+@dataclass
+class PortfolioConfig:
+    capital: float = INITIAL_CAPITAL
+    max_positions: int = MAX_POSITIONS
+    sizing: str = SIZING
+    risk: float = RISK_PER_TRADE
+    atr_mult: float = ATR_MULT
+    max_weight: float = MAX_WEIGHT
+    fee_bps: float = FEE_BPS
+
+
+# ============================================
+# Kursdaten je Ticker auf dem gemeinsamen Kalender
+# ============================================
+@dataclass
+class TickerData:
+    ticker: str
+    dates: np.ndarray
+    close: np.ndarray
+    atr: np.ndarray
+    entries: np.ndarray
+    exits: np.ndarray                  # -1 = offen bis zum Ende
+    pos: Optional[np.ndarray] = None   # Position jedes Bars im gemeinsamen Kalender (align)
+
+
+def ticker_data(ticker: str, df: pd.DataFrame, start=None, **params) -> TickerData:
+    # df mit Indikatoren (backtest_week_to_day.add_indicators)
+    entries, exits = trade_indices(df, start=start, **params)
+    return TickerData(
+        ticker=ticker,
+        dates=df.index.values.astype("datetime64[ns]"),
+        close=df["Close"].to_numpy(dtype=np.float64),
+        atr=df["atr"].to_numpy(dtype=np.float64),
+        entries=entries,
+        exits=exits,
+    )
+
+
+def align(data: Dict[str, TickerData]) -> pd.DatetimeIndex:
+    calendar = pd.DatetimeIndex(np.unique(np.concatenate([td.dates for td in data.values()])), name="Date")
+    for td in data.values():
+        td.pos = calendar.get_indexer(pd.DatetimeIndex(td.dates))
+    return calendar
+
+
+# ============================================
+# Event-Strom
+# ============================================
+def ticker_events(td: TickerData) -> List[Tuple[int, int, str, int]]:
+    # (Kalenderposition, Art, Ticker, Bar-Index) – je Ticker bereits zeitlich sortiert
+    events = []
+    for e, x in zip(td.entries, td.exits):
+        events.append((int(td.pos[e]), ENTRY, td.ticker, int(e)))
+        if x >= 0:
+            events.append((int(td.pos[x]), EXIT, td.ticker, int(x)))
+    return events
+
+
+def event_stream(data: Dict[str, TickerData]) -> Iterator[Tuple[int, int, str, int]]:
+    # k-Wege-Merge über einen Heap: O(N log K) statt globaler Sortierung
+    return heapq.merge(*(ticker_events(td) for td in data.values()))
+
+
+# ============================================
+# Simulation
+# ============================================
+@dataclass
+class Position:
+    ticker: str
+    shares: float
+    entry_bar: int
+    entry_pos: int
+    entry_price: float
+    cost: float
+
+
+@dataclass
+class PortfolioResult:
+    equity: pd.DataFrame
+    trades: pd.DataFrame
+    skipped: int
+    summary: Dict[str, float] = field(default_factory=dict)
+
+
+def _position_size(cfg: PortfolioConfig, equity: float, cash: float, price: float, atr: float) -> float:
+    if cfg.sizing == "atr":
+        if not np.isfinite(atr) or atr <= 0:
+            return 0.0
+        shares = cfg.risk * equity / (cfg.atr_mult * atr)
+    elif cfg.sizing == "equal":
+        shares = equity / cfg.max_positions / price
+    else:
+        raise ValueError(f"Unbekannte Positionsgröße: {cfg.sizing}")
+
+    shares = min(shares, cfg.max_weight * equity / price)
+    shares = min(shares, cash / (price * (1 + cfg.fee_bps / 10_000)))
+    return float(np.floor(shares))
+
+
+def _held_value(td: TickerData, shares: float, calendar_pos: int) -> float:
+    # Letzter Schlusskurs bis einschließlich calendar_pos (Lücken -> letzter bekannter Kurs)
+    i = int(np.searchsorted(td.pos, calendar_pos, side="right")) - 1
+    return shares * td.close[i]
+
+
+def simulate(data: Dict[str, TickerData], cfg: Optional[PortfolioConfig] = None, start=None) -> PortfolioResult:
+    # start: Backtest-Beginn; die Historie davor dient nur den Indikatoren und zählt nicht
+    # in Equity-Kurve, CAGR und Exposure
+    cfg = cfg or PortfolioConfig()
+    calendar = align(data)
+    n_days = len(calendar)
+    fee = cfg.fee_bps / 10_000
+
+    cash = cfg.capital
+    open_pos: Dict[str, Position] = {}
+    flows = np.zeros(n_days)           # Cash-Veränderung je Kalendertag
+    closed: List[Position] = []
+    closed_info: List[Tuple[int, int, float]] = []   # (exit_bar, exit_pos, exit_price)
+    skipped = 0
+
+    equity_cache: Tuple[int, float] = (-1, 0.0)
+
+    for day, kind, ticker, bar in event_stream(data):
+        td = data[ticker]
+
+        if kind == EXIT:
+            p = open_pos.pop(ticker, None)
+            if p is None:
+                continue   # Entry wurde mangels Kapital/Plätzen übersprungen
+            price = td.close[bar]
+            proceeds = p.shares * price * (1 - fee)
+            cash += proceeds
+            flows[day] += proceeds
+            closed.append(p)
+            closed_info.append((bar, day, price))
+            equity_cache = (-1, 0.0)
+            continue
+
+        if ticker in open_pos or len(open_pos) >= cfg.max_positions:
+            skipped += 1
+            continue
+
+        # Equity zum Entry-Tag (Cash + offene Positionen zum Schlusskurs), einmal pro Tag
+        if equity_cache[0] != day:
+            held = sum(_held_value(data[p.ticker], p.shares, day) for p in open_pos.values())
+            equity_cache = (day, cash + held)
+        equity = equity_cache[1]
+
+        price = td.close[bar]
+        shares = _position_size(cfg, equity, cash, price, td.atr[bar])
+        if shares <= 0:
+            skipped += 1
+            continue
+
+        cost = shares * price * (1 + fee)
+        cash -= cost
+        flows[day] -= cost
+        open_pos[ticker] = Position(ticker, shares, bar, day, price, cost)
+        equity_cache = (day, equity - shares * price * fee)
+
+    equity = _equity_curve(data, calendar, cfg.capital, flows, closed, closed_info, open_pos)
+    if start is not None:
+        equity = equity.loc[pd.Timestamp(start):]
+    trades = _trade_table(data, calendar, closed, closed_info, open_pos)
+    result = PortfolioResult(equity, trades, skipped)
+    result.summary = portfolio_summary(result, cfg)
+    return result
+
+
+# ============================================
+# Tägliche Reihen
+# ============================================
+def _add_holding(holdings: np.ndarray, counts: np.ndarray, td: TickerData, shares: float, a: int, b: int) -> None:
+    # Bestandswert über [a, b) im Kalender, Lücken des Tickers mit letztem Kurs gefüllt
+    if b <= a:
+        return
+    days = np.arange(a, b)
+    idx = np.searchsorted(td.pos, days, side="right") - 1
+    holdings[a:b] += shares * td.close[idx]
+    counts[a] += 1
+    counts[b] -= 1
+
+
+def _equity_curve(data, calendar, capital, flows, closed, closed_info, open_pos) -> pd.DataFrame:
+    n = len(calendar)
+    holdings = np.zeros(n)
+    counts = np.zeros(n + 1)
+
+    for p, (_, exit_pos, _) in zip(closed, closed_info):
+        _add_holding(holdings, counts, data[p.ticker], p.shares, p.entry_pos, exit_pos)
+    for p in open_pos.values():
+        _add_holding(holdings, counts, data[p.ticker], p.shares, p.entry_pos, n)
+
+    cash = capital + np.cumsum(flows)
+    equity = cash + holdings
+    peak = np.maximum.accumulate(equity)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return pd.DataFrame({
+            "cash": cash,
+            "holdings": holdings,
+            "equity": equity,
+            "drawdown": equity / peak - 1.0,
+            "exposure": holdings / equity,
+            "positions": np.cumsum(counts[:n]).astype(np.int64),
+        }, index=calendar)
+
+
+def _trade_table(data, calendar, closed, closed_info, open_pos) -> pd.DataFrame:
+    rows = []
+    for p, (_, exit_pos, exit_price) in zip(closed, closed_info):
+        rows.append([p.ticker, calendar[p.entry_pos], calendar[exit_pos], p.shares, p.entry_price, exit_price, "closed"])
+
+    last = len(calendar) - 1
+    for p in open_pos.values():
+        td = data[p.ticker]
+        rows.append([p.ticker, calendar[p.entry_pos], calendar[last], p.shares, p.entry_price, td.close[-1], "open"])
+
+    trades = pd.DataFrame(rows, columns=["Ticker", "Entry_Date", "Exit_Date", "Shares", "Entry_Price", "Exit_Price", "Status"])
+    trades["PnL"] = trades["Shares"] * (trades["Exit_Price"] - trades["Entry_Price"])
+    trades["Return_%"] = (trades["Exit_Price"] / trades["Entry_Price"] - 1) * 100
+    return trades.sort_values(["Entry_Date", "Ticker"]).reset_index(drop=True)
+
+
+def portfolio_summary(result: PortfolioResult, cfg: PortfolioConfig) -> Dict[str, float]:
+    eq = result.equity
+    if eq.empty:
+        return {}
+    years = max((eq.index[-1] - eq.index[0]).days / 365.25, 1e-9)
+    final = float(eq["equity"].iloc[-1])
+    return {
+        "start_capital": cfg.capital,
+        "final_equity": round(final, 2),
+        "total_return_%": round((final / cfg.capital - 1) * 100, 2),
+        "cagr_%": round(((final / cfg.capital) ** (1 / years) - 1) * 100, 2),
+        "max_drawdown_%": round(float(eq["drawdown"].min()) * 100, 2),
+        "avg_exposure_%": round(float(eq["exposure"].mean()) * 100, 2),
+        "max_positions": int(eq["positions"].max()),
+        "trades": int(len(result.trades)),
+        "skipped_entries": int(result.skipped),
+    }
+
+
+# ============================================
+# Laden + CLI
+# ============================================
+def load_data(tickers: Iterable[str], start, history_start, end) -> Dict[str, TickerData]:
+    from backtest_week_to_day import add_indicators
+    from pipeline import stream_prices
+    from price_store import default_store
+
+    data = {}
+    for results in stream_prices(default_store(), list(tickers), history_start, end):
+        for t, res in results.items():
+            if res.data.empty:
+                continue
+            td = ticker_data(t, add_indicators(res.data, t), start)
+            if td.entries.size:
+                data[t] = td
+    return data
+
+
+def main(argv=None):
+    from backtest_week_to_day import BACKTEST_START, EXIT_DATE, HISTORY_START, load_tickers
+    from output import write_table
+
+    parser = argparse.ArgumentParser(description="Portfolio-Simulation Week→Day")
+    parser.add_argument("--capital", type=float, default=INITIAL_CAPITAL)
+    parser.add_argument("--max-positions", type=int, default=MAX_POSITIONS)
+    parser.add_argument("--sizing", choices=["atr", "equal"], default=SIZING)
+    parser.add_argument("--risk", type=float, default=RISK_PER_TRADE)
+    parser.add_argument("--atr-mult", type=float, default=ATR_MULT)
+    parser.add_argument("--max-weight", type=float, default=MAX_WEIGHT)
+    parser.add_argument("--fee-bps", type=float, default=FEE_BPS)
+    parser.add_argument("--output", default="portfolio")
+    args = parser.parse_args(argv)
+
+    cfg = PortfolioConfig(args.capital, args.max_positions, args.sizing, args.risk, args.atr_mult, args.max_weight, args.fee_bps)
+
+    data = load_data(load_tickers(), BACKTEST_START, HISTORY_START, EXIT_DATE)
+    if not data:
+        print("Keine Signale – keine Simulation.")
+        return
+
+    result = simulate(data, cfg, BACKTEST_START)
+
+    equity_path = write_table(result.equity.reset_index(), f"{args.output}_equity")
+    trades_path = write_table(result.trades, f"{args.output}_trades")
+
+    print("\n===== PORTFOLIO =====")
+    for k, v in result.summary.items():
+        print(f"{k:18s} {v}")
+    print(f"\nGespeichert: {equity_path}, {trades_path}")
+
+
+if __name__ == "__main__":
+    main()
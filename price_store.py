@@ -0,0 +1,276 @@
+# price_store.py
+#
+# Lokaler Kursspeicher (OHLCV) für alle Screener
+# - Ein Satz NumPy-Dateien pro Ticker (memory-mapped lesbar)
+# - Inkrementelles Nachladen: nur Bars ab dem letzten gespeicherten Datum
+# - Kurse sind adjustiert (auto_adjust): weicht der erneut geladene Überlappungsbereich
+#   vom Bestand ab (Split / Dividende), wird die ganze Historie neu geladen
+# - Austauschbare Datenquelle (yfinance, offline, Fake-Daten)
+
+import datetime
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_access import (
+    FIELDS,
+    STATUS_EMPTY,
+    STATUS_ERROR,
+    STATUS_OK,
+    BatchFetcher,
+    FetchResult,
+    empty_ohlcv,
+    fetch_universe,
+    normalize_ohlcv,
+    offline_batch_fetch,
+    yf_batch_fetch,
+)
+
+
+# ============================================
+# Speicherort
+# ============================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.getenv("PRICE_STORE_DIR", os.path.join(BASE_DIR, "price_store"))
+
+OVERLAP_BARS = 5                                                    # erneut geladene Bars am Ende
+ADJUST_TOLERANCE = float(os.getenv("PRICE_ADJUST_TOLERANCE", "5e-4"))  # relative Abweichung der Closes
+
+
+# ============================================
+# PriceStore
+# ============================================
+class PriceStore:
+
+    def __init__(self, root: str = STORE_DIR, fetcher: Optional[BatchFetcher] = None, **fetch_options):
+        self.root = root
+        self.fetcher = fetcher or yf_batch_fetch
+        self.fetch_options = fetch_options   # batch_size, max_workers, retries, backoff
+        os.makedirs(self.root, exist_ok=True)
+
+    # ----------------------------
+    # Dateipfade
+    # ----------------------------
+    def _base(self, ticker: str) -> str:
+        safe = ticker.replace("/", "_").replace("\\", "_")
+        return os.path.join(self.root, safe)
+
+    def _paths(self, ticker: str):
+        base = self._base(ticker)
+        return base + ".dates.npy", base + ".ohlcv.npy", base + ".meta.json"
+
+    # ----------------------------
+    # Lesen
+    # ----------------------------
+    def load(self, ticker: str, mmap: bool = True) -> pd.DataFrame:
+        dates_path, values_path, _ = self._paths(ticker)
+        if not (os.path.exists(dates_path) and os.path.exists(values_path)):
+            return empty_ohlcv()
+
+        mode = "r" if mmap else None
+        try:
+            dates = np.load(dates_path, mmap_mode=mode)
+            values = np.load(values_path, mmap_mode=mode)
+        except (OSError, ValueError):
+            return empty_ohlcv()
+
+        # Abgebrochener Schreibvorgang -> Bestand als leer behandeln
+        if values.ndim != 2 or len(dates) != len(values) or values.shape[1] != len(FIELDS):
+            return empty_ohlcv()
+
+        index = pd.DatetimeIndex(np.asarray(dates, dtype="datetime64[ns]"), name="Date")
+        return pd.DataFrame(np.asarray(values), index=index, columns=FIELDS)
+
+    def last_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        dates_path, _, _ = self._paths(ticker)
+        if not os.path.exists(dates_path):
+            return None
+        try:
+            dates = np.load(dates_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if len(dates) == 0:
+            return None
+        return pd.Timestamp(dates[-1])
+
+    def _read_meta(self, ticker: str) -> dict:
+        _, _, meta_path = self._paths(ticker)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    # ----------------------------
+    # Schreiben (atomar pro Datei)
+    # ----------------------------
+    def write(self, ticker: str, df: pd.DataFrame, start: Optional[pd.Timestamp] = None) -> None:
+        df = normalize_ohlcv(df)
+        dates_path, values_path, meta_path = self._paths(ticker)
+
+        dates = df.index.values.astype("datetime64[ns]")
+        values = np.ascontiguousarray(df[FIELDS].to_numpy(dtype=np.float64))
+
+        # Werte zuerst, Datumsachse zuletzt: load() erkennt Teilstände an der Länge
+        for path, arr in ((values_path, values), (dates_path, dates)):
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, arr)
+            os.replace(tmp, path)
+
+        meta = self._read_meta(ticker)
+        if start is not None:
+            known = meta.get("start")
+            if known is None or pd.Timestamp(start) < pd.Timestamp(known):
+                meta["start"] = pd.Timestamp(start).strftime("%Y-%m-%d")
+        meta["updated"] = datetime.datetime.now().isoformat(timespec="seconds")
+
+        tmp = meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+    def append(self, ticker: str, new: pd.DataFrame, start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        new = normalize_ohlcv(new)
+        old = self.load(ticker, mmap=False)
+
+        if old.empty:
+            merged = new
+        elif new.empty:
+            merged = old
+        else:
+            # Überlappende Bars (z.B. unvollständiger letzter Tag) werden ersetzt
+            old = old[~old.index.isin(new.index)]
+            merged = pd.concat([old, new]).sort_index()
+
+        self.write(ticker, merged, start=start)
+        return merged
+
+    # ----------------------------
+    # Nachladen
+    # ----------------------------
+    def _fetch_ranges(self, ticker: str, start: pd.Timestamp, end: pd.Timestamp):
+        stored = self.load(ticker)
+        if stored.empty:
+            return [(start, end)]
+
+        ranges = []
+
+        # Historie nach vorne ergänzen, falls früher angefragt als je geladen
+        known_start = self._read_meta(ticker).get("start")
+        if known_start is None or start < pd.Timestamp(known_start):
+            first = stored.index[0]
+            if start < first:
+                ranges.append((start, first))
+
+        # Letzte Bars erneut holen: der letzte kann beim letzten Lauf unvollständig gewesen sein,
+        # die davor zeigen eine geänderte Adjustierung (_readjusted)
+        last = stored.index[-1]
+        if last + pd.Timedelta(days=1) < end:
+            ranges.append((stored.index[-min(OVERLAP_BARS, len(stored))], end))
+
+        return ranges
+
+    def _full_start(self, ticker: str, start: pd.Timestamp) -> pd.Timestamp:
+        known = self._read_meta(ticker).get("start")
+        first = self.load(ticker).index[0]
+        return min(start, first, pd.Timestamp(known) if known else first)
+
+    def _readjusted(self, ticker: str, new: pd.DataFrame) -> bool:
+        # Gleiche abgeschlossene Bars mit anderem Close -> Bestand hat die alte Adjustierung
+        old = self.load(ticker)
+        if old.empty or new.empty:
+            return False
+        common = old.index[:-1].intersection(new.index)
+        if common.empty:
+            return False
+        before = old["Close"].reindex(common).to_numpy()
+        after = new["Close"].reindex(common).to_numpy()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return bool(np.any(np.abs(after / before - 1.0) > ADJUST_TOLERANCE))
+
+    def update_many(self, tickers: List[str], start, end) -> Dict[str, FetchResult]:
+        start = pd.Timestamp(start).normalize()
+        end = pd.Timestamp(end).normalize()
+        tickers = list(dict.fromkeys(tickers))
+
+        # Ticker mit identischem Nachladezeitraum gemeinsam anfragen
+        groups: Dict[tuple, List[str]] = {}
+        for t in tickers:
+            for rng in self._fetch_ranges(t, start, end):
+                groups.setdefault(rng, []).append(t)
+
+        fetched: Dict[str, FetchResult] = {}
+        reload: Dict[tuple, List[str]] = {}
+        for (a, b), group in groups.items():
+            for t, res in fetch_universe(group, a, b, fetcher=self.fetcher, **self.fetch_options).items():
+                if res.status != STATUS_ERROR:
+                    if self._readjusted(t, res.data):
+                        reload.setdefault((self._full_start(t, start), end), []).append(t)
+                        continue
+                    self.append(t, res.data, start=start)
+                prev = fetched.get(t)
+                if prev is None or prev.status == STATUS_OK:
+                    fetched[t] = res
+
+        # Split / Dividende seit dem letzten Lauf: ganze Historie ersetzen statt mischen;
+        # schlägt das fehl, bleibt der alte (in sich konsistente) Bestand
+        for (a, b), group in reload.items():
+            print(f"Adjustierung geändert, lade Historie neu: {', '.join(group)}")
+            for t, res in fetch_universe(group, a, b, fetcher=self.fetcher, **self.fetch_options).items():
+                if res.status == STATUS_OK:
+                    self.write(t, res.data, start=a)
+                fetched[t] = res
+
+        results = {}
+        for t in tickers:
+            data = self.load(t, mmap=False)
+            res = fetched.get(t)
+            if not data.empty:
+                # Vorhandener Bestand zählt als Erfolg, Fehler beim Nachladen bleibt sichtbar
+                error = res.error if res is not None else None
+                attempts = res.attempts if res is not None else 0
+                results[t] = FetchResult(t, STATUS_OK, data=data, error=error, attempts=attempts)
+            else:
+                results[t] = FetchResult(t, res.status, error=res.error, attempts=res.attempts)
+        return results
+
+    def update(self, ticker: str, start, end) -> pd.DataFrame:
+        return self.update_many([ticker], start, end)[ticker].data
+
+    # ----------------------------
+    # Zugriff
+    # ----------------------------
+    @staticmethod
+    def _slice(df: pd.DataFrame, start, end) -> pd.DataFrame:
+        if df.empty:
+            return df
+        return df[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))].copy()
+
+    def get_many(self, tickers: List[str], start, end, update: bool = True) -> Dict[str, FetchResult]:
+        if update:
+            results = self.update_many(tickers, start, end)
+        else:
+            results = {}
+            for t in dict.fromkeys(tickers):
+                data = self.load(t, mmap=False)
+                status = STATUS_OK if not data.empty else STATUS_EMPTY
+                results[t] = FetchResult(t, status, data=data)
+
+        for res in results.values():
+            res.data = self._slice(res.data, start, end)
+        return results
+
+    def get(self, ticker: str, start, end, update: bool = True) -> pd.DataFrame:
+        return self.get_many([ticker], start, end, update=update)[ticker].data
+
+
+# ============================================
+# Standardinstanz – OFFLINE=1 nutzt nur den lokalen Bestand
+# ============================================
+def default_store(**fetch_options) -> PriceStore:
+    fetcher = offline_batch_fetch if os.getenv("OFFLINE") == "1" else yf_batch_fetch
+    return PriceStore(STORE_DIR, fetcher=fetcher, **fetch_options)
@@ -0,0 +1,210 @@
+# ranking.py
+#
+# Relative Stärke im Querschnitt gegen den Nasdaq-100 (^NDX)
+# - Renditen über 63 / 126 / 252 Handelstage für das ganze Universum pro Datum (Datum × Ticker)
+# - Perzentil-Rang pro Datum und Horizont als eine Sortierung je Zeile, Score = gewichteter
+#   Mittelwert der Ränge (0-100, 100 = stärkster Ticker)
+# - Relative Stärke zum Benchmark: (1 + r) / (1 + r_NDX) - 1; am selben Datum ändert der Benchmark
+#   die Reihenfolge nicht, die Ränge kommen daher direkt aus den Renditen
+# - Top-k pro Datum per argpartition (O(Ticker)), sortiert werden nur die k Gewinner
+# - Zeilen blockweise (RANK_CHUNK Tage) -> Speicher unabhängig von der Länge der Historie
+#
+# Beispiel:
+#   ranking = rank_universe(panel.close, load_benchmark(start="2024-01-01"))
+#   ranking.leaders(20)                      # Top 20 pro Datum
+#   ranking.lookup(signals["date"], signals["ticker"])
+
+import os
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from price_store import default_store
+
+
+# ============================================
+# Konfiguration
+# ============================================
+BENCHMARK = "^NDX"
+HORIZONS = (63, 126, 252)
+HORIZON_NAMES = {63: "3m", 126: "6m", 252: "12m"}
+
+RANK_TOP_K = int(os.getenv("RANK_TOP_K", "20"))
+RANK_CHUNK = int(os.getenv("RANK_CHUNK", "256"))
+# Gemeinsamer Kalender mehrerer Börsen: Feiertage behalten den letzten Schlusskurs
+# (höchstens RANK_FILL_DAYS Tage), sonst fällt der Ticker an beiden Enden aus dem Ranking
+RANK_FILL_DAYS = int(os.getenv("RANK_FILL_DAYS", "5"))
+
+
+# ============================================
+# Benchmark aus dem Kursbestand
+# ============================================
+def load_benchmark(prices=None, start=None, end=None) -> pd.Series:
+    # Aus übergebenen Kursen (runner.py), sonst aus dem lokalen Bestand (+ neue Bars)
+    if prices is not None and BENCHMARK in prices:
+        df = prices[BENCHMARK].data
+    else:
+        end = end if end is not None else pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+        df = default_store().get_many([BENCHMARK], start, end)[BENCHMARK].data
+    if df.empty:
+        return pd.Series(dtype=float)
+    return df["Close"].astype(float)
+
+
+# ============================================
+# Vektorisierte Ränge
+# ============================================
+def _name(h: int) -> str:
+    return HORIZON_NAMES.get(h, f"{h}d")
+
+
+def _returns(x: np.ndarray, rows: np.ndarray, h: int) -> np.ndarray:
+    # h-Tage-Rendite für ausgewählte Zeilen der Kursmatrix (Zeilen des gemeinsamen Kalenders)
+    out = np.full((rows.shape[0], x.shape[1]), np.nan)
+    ok = rows >= h
+    if ok.any():
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[ok] = x[rows[ok]] / x[rows[ok] - h] - 1.0
+    return out
+
+
+def row_percentiles(x: np.ndarray) -> np.ndarray:
+    # Perzentil-Rang (0, 1] pro Zeile über alle gültigen Werte; NaN bleibt NaN, gleiche Werte stabil
+    valid = ~np.isnan(x)
+    order = np.argsort(x, axis=1, kind="stable")            # NaN am Ende
+    ranks = np.empty(x.shape, dtype=np.float64)
+    positions = np.broadcast_to(np.arange(1, x.shape[1] + 1, dtype=np.float64), x.shape)
+    np.put_along_axis(ranks, order, positions, axis=1)
+
+    count = valid.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = ranks / count
+    out[~valid] = np.nan
+    return out
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Spaltenindizes und Scores der k besten pro Zeile (absteigend); fehlende Scores -> NaN
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty
+
+    s = np.where(np.isnan(scores), -np.inf, scores)
+    part = np.argpartition(-s, k - 1, axis=1)[:, :k]
+    values = np.take_along_axis(s, part, axis=1)
+    order = np.argsort(-values, axis=1, kind="stable")
+    idx = np.take_along_axis(part, order, axis=1)
+    values = np.take_along_axis(values, order, axis=1)
+    values[np.isinf(values)] = np.nan
+    return idx, values
+
+
+# ============================================
+# Ranking des Universums
+# ============================================
+@dataclass
+class Ranking:
+    close: pd.DataFrame             # Datum × Ticker (gemeinsamer Kalender)
+    benchmark: pd.Series            # Benchmark-Schlusskurse auf dem Kalender von close
+    rows: np.ndarray                # berechnete Zeilen von close
+    scores: np.ndarray              # len(rows) × Ticker, 0-100
+    horizons: Tuple[int, ...]
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        return self.close.index[self.rows]
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.scores, index=self.dates, columns=self.close.columns)
+
+    def lookup(self, dates, tickers) -> np.ndarray:
+        # Score zu (Datum, Ticker)-Paaren, z.B. für Signalzeilen; unbekannte Paare -> NaN
+        r = self.dates.get_indexer(pd.DatetimeIndex(pd.to_datetime(np.asarray(dates))))
+        c = self.close.columns.get_indexer(np.asarray(tickers, dtype=object))
+        out = np.full(r.shape[0], np.nan)
+        ok = (r >= 0) & (c >= 0)
+        out[ok] = self.scores[r[ok], c[ok]]
+        return out
+
+    def leaders(self, k: int = RANK_TOP_K) -> pd.DataFrame:
+        # Top-k pro Datum mit Renditen und relativer Stärke zum Benchmark je Horizont
+        idx, values = top_k(self.scores, k)
+        line, pos = np.nonzero(~np.isnan(values))
+        cols = idx[line, pos]
+        rows = self.rows[line]
+
+        x = self.close.to_numpy(dtype=np.float64)
+        out = pd.DataFrame({
+            "date": self.close.index[rows],
+            "ticker": self.close.columns.to_numpy(dtype=object)[cols],
+            "rs_rank": pos + 1,
+            "rs_score": values[line, pos],
+            "close": x[rows, cols],
+        })
+
+        bench = self.benchmark.to_numpy(dtype=np.float64)
+        for h in self.horizons:
+            ret = np.full(rows.shape[0], np.nan)
+            rel = np.full(rows.shape[0], np.nan)
+            ok = rows >= h
+            with np.errstate(invalid="ignore", divide="ignore"):
+                ret[ok] = x[rows[ok], cols[ok]] / x[rows[ok] - h, cols[ok]] - 1.0
+                rel[ok] = (1.0 + ret[ok]) / (bench[rows[ok]] / bench[rows[ok] - h]) - 1.0
+            out[f"ret_{_name(h)}"] = ret
+            out[f"rs_{_name(h)}"] = rel
+        return out
+
+    def latest(self, k: int = RANK_TOP_K) -> pd.DataFrame:
+        leaders = self.leaders(k)
+        if leaders.empty:
+            return leaders
+        return leaders[leaders["date"] == leaders["date"].max()].reset_index(drop=True)
+
+
+def rank_universe(
+    close: pd.DataFrame,
+    benchmark: Optional[pd.Series] = None,
+    start=None,
+    horizons: Sequence[int] = HORIZONS,
+    weights: Optional[Sequence[float]] = None,
+    chunk_rows: int = RANK_CHUNK,
+) -> Ranking:
+
+    close = close.sort_index()
+    x = close.to_numpy(dtype=np.float64)
+    horizons = tuple(horizons)
+    w = np.asarray(weights if weights is not None else [1.0] * len(horizons), dtype=np.float64)
+    w = w / w.sum()
+
+    # Nur Zeilen ab start berechnen; die Renditen greifen trotzdem auf die Historie davor zurück
+    first = 0 if start is None else int(close.index.searchsorted(pd.Timestamp(start)))
+    rows = np.arange(first, len(close), dtype=np.int64)
+
+    # Benchmark auf den Kalender des Universums (Feiertage anderer Börsen: letzter Kurs)
+    if benchmark is None or benchmark.empty:
+        bench = pd.Series(np.nan, index=close.index)
+    else:
+        bench = benchmark.sort_index().reindex(close.index, method="ffill")
+
+    # Score = gewichtetes Mittel der Perzentil-Ränge; fehlt ein Horizont, kein Score
+    scores = np.empty((rows.shape[0], x.shape[1]))
+    for lo in range(0, rows.shape[0], max(1, chunk_rows)):
+        block = rows[lo:lo + chunk_rows]
+        acc = np.zeros((block.shape[0], x.shape[1]))
+        for h, wk in zip(horizons, w):
+            acc += wk * row_percentiles(_returns(x, block, h))
+        scores[lo:lo + block.shape[0]] = acc * 100.0
+
+    return Ranking(close, bench, rows, scores, horizons)
+
+
+def benchmark_change(benchmark: pd.Series) -> float:
+    # Tagesveränderung des Benchmarks in Prozent (letzter gegen vorletzten Schlusskurs)
+    b = benchmark.dropna()
+    if len(b) < 2:
+        return 0.0
+    return float((b.iloc[-1] / b.iloc[-2] - 1.0) * 100)
+
@@ -0,0 +1,492 @@
+# rules.py
+#
+# Deklarative Screening-Regeln
+# - Regeln als Ausdrücke in Python-Syntax, z.B. "close > sma(200) and ret(63) > 0.15"
+# - Einmal per ast geparst und in einen Ausdrucksgraphen übersetzt (Knoten = Tupel)
+# - Gleiche Teilausdrücke haben denselben Schlüssel -> über alle Regeln eines RuleSets
+#   nur einmal berechnet (ein sma(50) für Trend-, Breakout- und Qualitätsregel)
+# - Auswertung als NumPy-Masken über einen ganzen Ticker (1D) oder ein Panel (Datum × Ticker)
+# - Regeln dürfen andere Regeln per Name verwenden ("signal": "momentum and trend")
+#   und benannte Parameter (adx_min), die erst bei der Auswertung eingesetzt werden
+# - Eigene Screens ohne Codeänderung: JSON-Datei {"name": "ausdruck", ...} per load_rules();
+#   load_ruleset() liest und kompiliert sie einmal pro Prozess (neu nur bei geänderter mtime)
+#
+# Funktionen:
+#   sma(n[, feld]) ema(n[, feld]) highest(n[, feld]) lowest(n[, feld]) ret(n[, feld])
+#   atr(n) adx(n) slope(n, lag) shift(ausdruck, n) abs(ausdruck)
+# Felder: close open high low volume
+
+import ast
+import json
+import operator
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from indicators import Indicators, to_1d
+
+
+# ============================================
+# Standard-Regeln
+# ============================================
+TREND_RULES = {
+    "momentum": "ret(63) > 0.15 and ret(126) > 0.30 and ret(252) > 0.40",
+    "trend": (
+        "close > sma(50) and sma(50) > sma(150) and sma(150) > sma(200)"
+        " and sma(50) > shift(sma(50), 20) and sma(200) > shift(sma(200), 20)"
+    ),
+    "breakout": "close >= 0.98 * highest(126) and volume >= 1.5 * sma(50, volume)",
+    "quality": "close >= 3.0 and sma(50, volume) >= 100000",
+    "signal": "momentum and trend and breakout and quality",
+}
+
+# Week→Day-Entry (backtest_week_to_day / strategy_engine), Schwellen als Parameter für den Sweep
+ENTRY_RULES = {
+    "entry": (
+        "close > sma(200) and sma(20) > sma(50) and adx(14) > adx_min and slope(200, 10) > 0"
+        " and abs(ema(50) - ema(200)) / close > ema_spread_min and atr(14) / close > atr_min"
+    ),
+}
+
+FIELDS = {"close": "Close", "open": "Open", "high": "High", "low": "Low", "volume": "Volume"}
+
+
+class RuleError(ValueError):
+    pass
+
+
+# ============================================
+# Parser: Ausdruck -> Graph aus Tupeln
+# ============================================
+# Indikator-Funktionen: Name -> Anzahl Zahlen-Argumente (mit Standardwerten)
+INDICATORS: Dict[str, Tuple[Optional[int], ...]] = {
+    "sma": (None,),
+    "ema": (None,),
+    "highest": (None,),
+    "lowest": (None,),
+    "ret": (None,),
+    "atr": (14,),
+    "adx": (14,),
+    "slope": (200, 10),
+}
+FIELD_ARG = {"sma", "ema", "highest", "lowest", "ret"}
+
+BIN_OPS = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/"}
+CMP_OPS = {ast.Gt: ">", ast.GtE: ">=", ast.Lt: "<", ast.LtE: "<=", ast.Eq: "==", ast.NotEq: "!="}
+
+
+def _int_arg(node: ast.AST, fn: str) -> int:
+    if isinstance(node, ast.Constant) and isinstance(node.value, int) and not isinstance(node.value, bool):
+        return node.value
+    raise RuleError(f"{fn}(): ganze Zahl erwartet, nicht {ast.unparse(node)}")
+
+
+class _Parser:
+
+    def __init__(self, rules: Mapping[str, str], params: Iterable[str]):
+        self.rules = rules
+        self.params = set(params)
+        self.done: Dict[str, tuple] = {}
+        self.stack: list = []
+
+    def rule(self, name: str) -> tuple:
+        if name in self.done:
+            return self.done[name]
+        if name in self.stack:
+            raise RuleError(f"Zirkuläre Regel: {' -> '.join(self.stack + [name])}")
+        self.stack.append(name)
+        try:
+            tree = ast.parse(self.rules[name].strip(), mode="eval")
+        except SyntaxError as e:
+            raise RuleError(f"Regel {name}: Syntaxfehler ({e.msg})") from None
+        node = self.visit(tree.body)
+        self.stack.pop()
+        self.done[name] = node
+        return node
+
+    def visit(self, n: ast.AST) -> tuple:
+        if isinstance(n, ast.BoolOp):
+            kind = "and" if isinstance(n.op, ast.And) else "or"
+            parts = []
+            for v in n.values:
+                node = self.visit(v)
+                # verschachtelte and/or flach ziehen -> ein Puffer pro Kette
+                parts.extend(node[1] if node[0] == kind else [node])
+            return (kind, tuple(parts))
+
+        if isinstance(n, ast.UnaryOp):
+            if isinstance(n.op, ast.Not):
+                return ("not", self.visit(n.operand))
+            if isinstance(n.op, ast.USub):
+                inner = self.visit(n.operand)
+                return ("const", -inner[1]) if inner[0] == "const" else ("neg", inner)
+            if isinstance(n.op, ast.UAdd):
+                return self.visit(n.operand)
+
+        if isinstance(n, ast.BinOp) and type(n.op) in BIN_OPS:
+            return ("bin", BIN_OPS[type(n.op)], self.visit(n.left), self.visit(n.right))
+
+        if isinstance(n, ast.Compare):
+            # a < b < c -> (a < b) and (b < c)
+            nodes = [self.visit(n.left)] + [self.visit(c) for c in n.comparators]
+            parts = []
+            for op, left, right in zip(n.ops, nodes, nodes[1:]):
+                if type(op) not in CMP_OPS:
+                    raise RuleError(f"Vergleich nicht erlaubt: {ast.unparse(n)}")
+                parts.append(("cmp", CMP_OPS[type(op)], left, right))
+            return parts[0] if len(parts) == 1 else ("and", tuple(parts))
+
+        if isinstance(n, ast.Constant) and isinstance(n.value, (int, float)) and not isinstance(n.value, bool):
+            return ("const", float(n.value))
+
+        if isinstance(n, ast.Name):
+            if n.id in FIELDS:
+                return ("field", n.id)
+            if n.id in self.rules:
+                return self.rule(n.id)
+            if n.id in self.params:
+                return ("param", n.id)
+            raise RuleError(f"Unbekannter Name: {n.id}")
+
+        if isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and not n.keywords:
+            return self.call(n.func.id, n.args, n)
+
+        raise RuleError(f"Nicht unterstützter Ausdruck: {ast.unparse(n)}")
+
+    def call(self, fn: str, args: list, n: ast.AST) -> tuple:
+        if fn == "shift":
+            if len(args) != 2:
+                raise RuleError("shift(ausdruck, n) erwartet zwei Argumente")
+            return ("shift", self.visit(args[0]), _int_arg(args[1], fn))
+
+        if fn == "abs":
+            if len(args) != 1:
+                raise RuleError("abs(ausdruck) erwartet ein Argument")
+            return ("abs", self.visit(args[0]))
+
+        if fn not in INDICATORS:
+            raise RuleError(f"Unbekannte Funktion: {fn}()")
+
+        defaults = INDICATORS[fn]
+        field = "close"
+        if fn in FIELD_ARG and len(args) == len(defaults) + 1:
+            last = args[-1]
+            if not (isinstance(last, ast.Name) and last.id in FIELDS):
+                raise RuleError(f"{fn}(): Feld erwartet, nicht {ast.unparse(last)}")
+            field, args = last.id, args[:-1]
+
+        if len(args) > len(defaults):
+            raise RuleError(f"{fn}(): zu viele Argumente in {ast.unparse(n)}")
+        values = [_int_arg(a, fn) for a in args] + list(defaults[len(args):])
+        if any(v is None for v in values):
+            raise RuleError(f"{fn}(): Fenster fehlt in {ast.unparse(n)}")
+        return ("ind", fn, tuple(values), field)
+
+
+# ============================================
+# Datenquellen: liefern Felder und Basis-Indikatoren als Arrays
+# ============================================
+class Source(ABC):
+    # Gemeinsame pandas-Implementierung für Series (ein Ticker) und DataFrame (Panel)
+
+    @abstractmethod
+    def data(self, field: str):
+        ...
+
+    def field(self, field: str) -> np.ndarray:
+        return np.asarray(self.data(field), dtype=np.float64)
+
+    def indicator(self, fn: str, args: tuple, field: str) -> np.ndarray:
+        return np.asarray(self.compute(fn, args, field), dtype=np.float64)
+
+    def shift(self, x: np.ndarray, n: int) -> np.ndarray:
+        return _shift(x, n)
+
+    def compute(self, fn: str, args: tuple, field: str):
+        x = self.data(field)
+        if fn == "sma":
+            return x.rolling(args[0]).mean()
+        if fn == "ema":
+            return x.ewm(span=args[0]).mean()
+        if fn == "highest":
+            return x.rolling(args[0]).max()
+        if fn == "lowest":
+            return x.rolling(args[0]).min()
+        if fn == "ret":
+            return x / x.shift(args[0]) - 1.0
+        raise RuleError(f"{fn}() ist für diese Datenquelle nicht verfügbar")
+
+
+class FrameSource(Source):
+    # Ein Ticker (OHLCV-Frame); Indikatoren über den gemeinsamen Cache aus indicators.py
+
+    def __init__(self, df: pd.DataFrame, ticker: Optional[str] = None):
+        self.df = df
+        self.ind = Indicators(df, ticker)
+
+    def data(self, field: str) -> pd.Series:
+        return self.ind.close if field == "close" else to_1d(self.df[FIELDS[field]])
+
+    def compute(self, fn: str, args: tuple, field: str):
+        ind = self.ind
+        if field == "close":
+            if fn == "sma":
+                return ind.sma(args[0])
+            if fn == "ema":
+                return ind.ema(args[0])
+            if fn == "highest":
+                return ind.rolling_max(args[0])
+            if fn == "ret":
+                return ind.pct_change(args[0])
+        elif field == "volume" and fn == "sma":
+            return ind.volume_sma(args[0])
+        if fn == "atr":
+            return ind.atr(args[0])
+        if fn == "adx":
+            return ind.adx(args[0])
+        if fn == "slope":
+            return ind.slope(*args)
+        return super().compute(fn, args, field)
+
+
+class PanelSource(Source):
+    # Ganzes Universum (panel.Panel); Indikatoren über den Memo-Cache des Panels
+
+    def __init__(self, panel):
+        self.panel = panel
+
+    def data(self, field: str) -> pd.DataFrame:
+        return self.panel[FIELDS[field]]
+
+    def compute(self, fn: str, args: tuple, field: str):
+        f = FIELDS[field]
+        if fn == "sma":
+            return self.panel.sma(args[0], f)
+        if fn == "ema":
+            return self.panel.ema(args[0], f)
+        if fn == "highest":
+            return self.panel.rolling_max(args[0], f)
+        if fn == "lowest":
+            return self.panel.rolling_min(args[0], f)
+        if fn == "ret":
+            return self.panel.pct_change(args[0], f)
+        return super().compute(fn, args, field)
+
+    def shift(self, x: np.ndarray, n: int) -> np.ndarray:
+        # Um eigene Bars des Tickers, nicht um Zeilen des gemeinsamen Kalenders
+        return self.panel.shift(x, n).to_numpy()
+
+
+class ArraySource(Source):
+    # Vorberechnete Arrays (strategy_engine.strategy_arrays, Shared Memory im Sweep)
+
+    ALIASES = {
+        ("field", "close"): "close",
+        ("sma", (20,), "close"): "sma20",
+        ("sma", (50,), "close"): "sma50",
+        ("sma", (200,), "close"): "sma200",
+        ("ema", (50,), "close"): "ema50",
+        ("ema", (100,), "close"): "ema100",
+        ("ema", (200,), "close"): "ema200",
+        ("adx", (14,), "close"): "adx",
+        ("atr", (14,), "close"): "atr",
+        ("slope", (200, 10), "close"): "slope",
+    }
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+
+    def _get(self, key: tuple, text: str) -> np.ndarray:
+        name = self.ALIASES.get(key)
+        if name is None or name not in self.arrays:
+            raise RuleError(f"{text} ist nicht vorberechnet")
+        return self.arrays[name]
+
+    def data(self, field: str) -> np.ndarray:
+        return self.field(field)
+
+    def field(self, field: str) -> np.ndarray:
+        return self._get(("field", field), field)
+
+    def indicator(self, fn: str, args: tuple, field: str) -> np.ndarray:
+        return self._get((fn, args, field), f"{fn}{args}")
+
+
+# ============================================
+# Auswertung
+# ============================================
+_BIN = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv}
+_CMP = {">": np.greater, ">=": np.greater_equal, "<": np.less, "<=": np.less_equal, "==": np.equal, "!=": np.not_equal}
+
+
+BOOLEAN = {"cmp", "and", "or", "not"}
+
+
+def _children(node: tuple) -> tuple:
+    kind = node[0]
+    if kind in ("and", "or"):
+        return node[1]
+    if kind in ("shift", "abs", "neg", "not"):
+        return (node[1],)
+    if kind in ("bin", "cmp"):
+        return (node[2], node[3])
+    return ()
+
+
+def _shift(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.full_like(x, np.nan, dtype=np.float64)
+    if 0 < n < x.shape[0]:
+        out[n:] = x[:-n]
+    elif n == 0:
+        out[:] = x
+    return out
+
+
+class RuleSet:
+
+    def __init__(self, rules: Mapping[str, str], params: Iterable[str] = ()):
+        self.rules = dict(rules)
+        self.params = tuple(params)
+        parser = _Parser(self.rules, self.params)
+        self.graph: Dict[str, tuple] = {name: parser.rule(name) for name in self.rules}
+
+        for name, node in self.graph.items():
+            if node[0] not in BOOLEAN:
+                raise RuleError(f"Regel {name} ist keine Bedingung: {self.rules[name]}")
+
+    def nodes(self) -> int:
+        # Anzahl verschiedener Knoten (nach Zusammenlegen gleicher Teilausdrücke)
+        seen = set()
+        stack = list(self.graph.values())
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(_children(node))
+        return len(seen)
+
+    def lookback(self, names: Optional[Iterable[str]] = None) -> Optional[int]:
+        # Bars vor einem Tag, die dessen Auswertung braucht; None = ganze Historie
+        # (ema/atr/adx gewichten exponentiell, jeder frühere Bar wirkt nach)
+        def bars(node: tuple) -> Optional[int]:
+            kind = node[0]
+            if kind == "ind":
+                fn, args = node[1], node[2]
+                if fn in ("sma", "highest", "lowest"):
+                    return args[0] - 1
+                if fn == "ret":
+                    return args[0]
+                if fn == "slope":
+                    return args[0] - 1 + args[1]
+                return None
+            parts = [bars(c) for c in _children(node)]
+            if any(p is None for p in parts):
+                return None
+            inner = max(parts, default=0)
+            return inner + node[2] if kind == "shift" else inner
+
+        needed = [bars(self.graph[name]) for name in (names or self.graph)]
+        return None if any(n is None for n in needed) else max(needed, default=0)
+
+    def evaluate(
+        self,
+        source: Source,
+        names: Optional[Iterable[str]] = None,
+        params: Optional[Mapping[str, float]] = None,
+    ) -> Dict[str, np.ndarray]:
+
+        params = params or {}
+        missing = [p for p in self.params if p not in params]
+        if missing:
+            raise RuleError(f"Parameter fehlen: {', '.join(missing)}")
+
+        memo: Dict[tuple, np.ndarray] = {}
+
+        def ev(node: tuple):
+            if node in memo:
+                return memo[node]
+            kind = node[0]
+
+            if kind == "const":
+                return node[1]
+            if kind == "param":
+                return float(params[node[1]])
+            if kind == "field":
+                value = source.field(node[1])
+            elif kind == "ind":
+                value = source.indicator(node[1], node[2], node[3])
+            elif kind == "shift":
+                value = source.shift(ev(node[1]), node[2])
+            elif kind == "abs":
+                value = np.abs(ev(node[1]))
+            elif kind == "neg":
+                value = -ev(node[1])
+            elif kind == "bin":
+                value = _BIN[node[1]](ev(node[2]), ev(node[3]))
+            elif kind == "cmp":
+                value = _CMP[node[1]](ev(node[2]), ev(node[3]))
+            elif kind == "not":
+                value = ~np.asarray(ev(node[1]), dtype=bool)
+            else:
+                # and / or: ein Ergebnis-Puffer pro Kette, Teilmasken in-place verknüpft
+                combine = np.logical_and if kind == "and" else np.logical_or
+                parts = node[1]
+                value = np.array(ev(parts[0]), dtype=bool, copy=True)
+                for p in parts[1:]:
+                    combine(value, ev(p), out=value)
+
+            memo[node] = value
+            return value
+
+        out = {}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for name in (names or self.graph):
+                value = ev(self.graph[name])
+                out[name] = np.asarray(value, dtype=bool)
+        return out
+
+
+# ============================================
+# Regeln aus Datei
+# ============================================
+_COMPILED: Dict[tuple, RuleSet] = {}
+
+
+def compile_rules(rules: Mapping[str, str], params: Iterable[str] = ()) -> RuleSet:
+    # Einmal parsen pro Regelsatz (auch über viele Ticker / Sweep-Kombinationen)
+    key = (tuple(sorted(rules.items())), tuple(params))
+    if key not in _COMPILED:
+        _COMPILED[key] = RuleSet(rules, params)
+    return _COMPILED[key]
+
+
+def load_rules(path: Optional[str], defaults: Mapping[str, str]) -> Dict[str, str]:
+    # JSON {"name": "ausdruck"}: ergänzt / überschreibt die Standard-Regeln
+    rules = dict(defaults)
+    if path:
+        if not os.path.exists(path):
+            raise RuleError(f"Regeldatei nicht gefunden: {path}")
+        with open(path, "r", encoding="utf-8") as f:
+            rules.update(json.load(f))
+    return rules
+
+
+_LOADED: Dict[tuple, RuleSet] = {}
+
+
+def load_ruleset(path: Optional[str], defaults: Mapping[str, str], params: Iterable[str] = ()) -> RuleSet:
+    # Für Aufrufe pro Ticker: Datei nicht jedes Mal lesen und parsen, nur mtime prüfen
+    mtime = os.stat(path).st_mtime_ns if path and os.path.exists(path) else None
+    key = (path, mtime, tuple(sorted(defaults.items())), tuple(params))
+    if key not in _LOADED:
+        _LOADED[key] = compile_rules(load_rules(path, defaults), params)
+    return _LOADED[key]
+
+
+def frames(masks: Dict[str, np.ndarray], like: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    # Panel-Masken zurück als DataFrames mit Kalender und Tickern
+    return {k: pd.DataFrame(v, index=like.index, columns=like.columns) for k, v in masks.items()}
+
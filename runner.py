@@ -0,0 +1,193 @@
+# runner.py
+#
+# Gemeinsamer Lauf aller Screener mit einem Datenabruf
+# - Universen aller Strategien vereinigen, Kurse einmal für den größten Zeitraum laden
+# - Jede Strategie bekommt ihren eigenen Zeitausschnitt -> gleiche Ergebnisse wie die Einzelläufe
+#   (EMAs hängen vom Startdatum ab, deshalb rechnet jede Strategie ihre Indikatoren auf ihrem Fenster)
+# - Strategien parallel in Worker-Prozessen; mit fork werden die Kurse ohne Kopie geerbt
+# - Ticker-Health und Probes einmal zentral statt pro Strategie
+# - Benchmark des Rankings (^NDX) im gemeinsamen Abruf, sonst lädt und schreibt ihn jeder Worker
+#
+# Beispiele:
+#   python runner.py
+#   python runner.py --only daily,trend --workers 2
+
+import argparse
+import multiprocessing
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from data_access import FetchResult
+from health import TickerHealth
+from instrumentation import start_run
+from price_store import PriceStore, default_store
+from ranking import BENCHMARK
+
+
+# ============================================
+# Strategien
+# ============================================
+@dataclass
+class Strategy:
+    name: str
+    tickers: List[str]
+    start: pd.Timestamp
+    end: pd.Timestamp      # exklusiv, wie PriceStore.get_many
+
+
+def _daily(health: TickerHealth) -> Strategy:
+    import daily_global_screener as m
+    return Strategy("daily", m.load_universe(health), pd.Timestamp(m.HISTORY_START), pd.Timestamp(m.END))
+
+
+def _trend(health: TickerHealth) -> Strategy:
+    import trendscreener as m
+    return Strategy("trend", m.load_universe(health), pd.Timestamp(m.BACKTEST_START), pd.Timestamp(m.TODAY + pd.Timedelta(days=1)))
+
+
+def _backtest(health: TickerHealth) -> Strategy:
+    import backtest_week_to_day as m
+    return Strategy("backtest", m.load_tickers(health), m.HISTORY_START, m.EXIT_DATE)
+
+
+REGISTRY: Dict[str, Callable[[TickerHealth], Strategy]] = {
+    "daily": _daily,
+    "trend": _trend,
+    "backtest": _backtest,
+}
+
+
+# ============================================
+# Zeitausschnitt einer Strategie (wie get_many auf dem gemeinsamen Bestand)
+# ============================================
+def window(prices: Dict[str, FetchResult], strategy: Strategy) -> Dict[str, FetchResult]:
+    # Benchmark zusätzlich, für ranking.load_benchmark(prices, ...)
+    out = {}
+    for t in dict.fromkeys(list(strategy.tickers) + [BENCHMARK]):
+        res = prices[t]
+        data = PriceStore._slice(res.data, strategy.start, strategy.end)
+        out[t] = FetchResult(t, res.status, data=data, error=res.error, attempts=res.attempts)
+    return out
+
+
+def latest_quotes(prices: Dict[str, FetchResult], tickers: List[str]) -> Dict[str, float]:
+    # Letzter verfügbarer Schlusskurs (inkl. heute) für die Forced-Exit-Bewertung
+    return {t: float(prices[t].data["Close"].iloc[-1]) for t in tickers if not prices[t].data.empty}
+
+
+# ============================================
+# Worker
+# ============================================
+_SHARED: Dict[str, object] = {}
+
+
+def _init(prices: Dict[str, FetchResult], strategies: Dict[str, Strategy]) -> None:
+    _SHARED.update({"prices": prices, "strategies": strategies})
+
+
+def _run_strategy(name: str) -> dict:
+    prices = _SHARED["prices"]
+    strategy = _SHARED["strategies"][name]
+    data = window(prices, strategy)
+
+    t0 = time.perf_counter()
+    try:
+        if name == "daily":
+            import daily_global_screener as m
+            m.main(strategy.tickers, data)
+        elif name == "trend":
+            import trendscreener as m
+            m.run_trendscreener(strategy.tickers, data)
+        elif name == "backtest":
+            import backtest_week_to_day as m
+            m.main(strategy.tickers, data, quotes=latest_quotes(prices, strategy.tickers))
+        return {"name": name, "ok": True, "seconds": round(time.perf_counter() - t0, 3)}
+    except Exception:
+        return {"name": name, "ok": False, "seconds": round(time.perf_counter() - t0, 3), "error": traceback.format_exc()}
+
+
+# ============================================
+# Lauf
+# ============================================
+def run(names: List[str], workers: Optional[int] = None, store: Optional[PriceStore] = None) -> List[dict]:
+    report = start_run("runner")
+    store = store or default_store()
+    health = TickerHealth()
+    health.reprobe(store.fetcher)
+
+    with report.stage("universe") as st:
+        strategies = {name: REGISTRY[name](health) for name in names}
+        union = list(dict.fromkeys([t for s in strategies.values() for t in s.tickers] + [BENCHMARK]))
+        st.rows = len(union)
+
+    start = min(s.start for s in strategies.values())
+    end = max(s.end for s in strategies.values())
+    print(f"Gemeinsamer Abruf: {len(union)} Ticker, {start.date()} bis {end.date()} ({', '.join(names)})")
+
+    with report.stage("download") as st:
+        prices = store.get_many(union, start, end)
+        st.rows = sum(len(r.data) for r in prices.values())
+    health.record(prices)
+
+    # Probe-Thread vor dem Fork beenden
+    health.finish()
+    report.info["ticker_health"] = health.summary()
+
+    results = []
+    with report.stage("strategies", rows=len(strategies)):
+        if workers == 0:
+            # Ohne Prozesse (Debugging)
+            _init(prices, strategies)
+            results = [_run_strategy(name) for name in strategies]
+        else:
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+            with ProcessPoolExecutor(
+                max_workers=max(1, min(workers or len(strategies), len(strategies))),
+                mp_context=ctx,
+                initializer=_init,
+                initargs=(prices, strategies),
+            ) as pool:
+                futures = [pool.submit(_run_strategy, name) for name in strategies]
+                results = [f.result() for f in futures]
+
+    print("\n===== RUNNER =====")
+    for r in results:
+        status = "OK" if r["ok"] else "FEHLER"
+        print(f"{r['name']:10s} {status:7s} {r['seconds']:8.2f}s")
+        if not r["ok"]:
+            print(r["error"])
+        report.record(f"strategy_{r['name']}", r["seconds"])
+        report.count("strategy_failed", 0 if r["ok"] else 1)
+
+    print(report.summary())
+    print("Run-Report:", report.write())
+    return results
+
+
+# ============================================
+# CLI
+# ============================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alle Screener mit einem gemeinsamen Datenabruf")
+    parser.add_argument("--only", default=",".join(REGISTRY), help="Auswahl, z.B. daily,trend")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Prozesse (0 = ohne Prozesse)")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.only.split(",") if n.strip()]
+    unknown = [n for n in names if n not in REGISTRY]
+    if unknown:
+        parser.error(f"Unbekannte Strategie: {', '.join(unknown)} (verfügbar: {', '.join(REGISTRY)})")
+
+    results = run(names, args.workers)
+    if not all(r["ok"] for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+# signal_db.py
+#
+# Signal-Historie als eingebettete SQLite-Datenbank
+# - Eine Tabelle für alle Strategien, Schlüssel (date, ticker, strategy, signal)
+# - Indizes für die Sichten: (strategy, date) für gestern / 12 Monate / letzte N,
+#   (strategy, ticker, date) für den letzten gespeicherten Tag pro Ticker und Ticker-Historien
+# - insert(): nur Signale nach dem letzten gespeicherten Tag des Tickers (inkrementelle Screener)
+# - Auswertungsstand pro Ticker (signal_state): letzter ausgewerteter Bar, dessen Schlusskurs und
+#   Konfigurations-Hash -> nächster Lauf wertet nur neue Bars aus
+# - replace(): nur bei geänderten Regeln / Konfiguration oder neu adjustierten Kursen ersetzt das
+#   neu berechnete Fenster die gespeicherten Signale ab Fensterbeginn
+# - Zusatzfelder einer Strategie (z.B. ret_3m) als JSON in "extra", abfragbar per json_extract
+# - Ad-hoc-Abfragen ohne Neulauf: SignalDB().query("SELECT ...")
+#
+# Beispiel:
+#   python signal_db.py "SELECT ticker, COUNT(*) n FROM signals WHERE strategy = 'trend' GROUP BY ticker ORDER BY n DESC"
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================
+# Konfiguration
+# ============================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SIGNAL_DB = os.getenv("SIGNAL_DB", os.path.join(BASE_DIR, "signals.db"))
+
+BASE_COLUMNS = ["date", "ticker", "strategy", "signal", "close"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    date     TEXT NOT NULL,
+    ticker   TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    signal   TEXT NOT NULL DEFAULT '',
+    close    REAL,
+    extra    TEXT,
+    PRIMARY KEY (date, ticker, strategy, signal)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_signals_strategy_date ON signals (strategy, date);
+CREATE INDEX IF NOT EXISTS idx_signals_strategy_ticker ON signals (strategy, ticker, date);
+CREATE TABLE IF NOT EXISTS signal_state (
+    strategy TEXT NOT NULL,
+    ticker   TEXT NOT NULL,
+    through  TEXT NOT NULL,
+    close    REAL,
+    config   TEXT,
+    PRIMARY KEY (strategy, ticker)
+) WITHOUT ROWID;
+"""
+
+
+def config_key(*parts) -> str:
+    # Hash über alles, was gespeicherte Signale ungültig macht (Regeln, Startdatum, ...)
+    text = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _day(x) -> str:
+    return pd.Timestamp(x).strftime("%Y-%m-%d")
+
+
+def _json_value(v):
+    if isinstance(v, (np.floating, float)):
+        return None if np.isnan(v) else float(v)
+    if isinstance(v, np.integer):
+        return int(v)
+    if isinstance(v, pd.Timestamp):
+        return v.isoformat()
+    return v
+
+
+# ============================================
+# Datenbank
+# ============================================
+class SignalDB:
+
+    def __init__(self, path: str = SIGNAL_DB, timeout: float = 30.0):
+        self.path = path
+        # timeout: runner.py schreibt aus mehreren Prozessen in dieselbe Datei
+        self.conn = sqlite3.connect(path, timeout=timeout)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "SignalDB":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ----------------------------
+    # Schreiben
+    # ----------------------------
+    def last_dates(self, strategy: str, tickers: Optional[Iterable[str]] = None) -> dict:
+        # Letzter gespeicherter Signaltag pro Ticker (Index strategy, ticker, date)
+        rows = self.conn.execute(
+            "SELECT ticker, MAX(date) FROM signals WHERE strategy = ? GROUP BY ticker", (strategy,)
+        ).fetchall()
+        last = dict(rows)
+        if tickers is not None:
+            wanted = set(tickers)
+            last = {t: d for t, d in last.items() if t in wanted}
+        return last
+
+    def insert(self, signals: pd.DataFrame, strategy: str, signal: str = "") -> int:
+        # Erwartet Spalten date, ticker (+ optional signal, close, weitere -> extra);
+        # nur Signale nach dem letzten gespeicherten Tag des jeweiligen Tickers
+        df = self._prepare(signals)
+        if df.empty:
+            return 0
+
+        last = self.last_dates(strategy, df["ticker"].unique())
+        if last:
+            df = df[df["date"] > df["ticker"].map(last).fillna("")]
+        if df.empty:
+            return 0
+
+        with self.conn:
+            return self._insert(df, strategy, signal)
+
+    def replace(
+        self,
+        signals: pd.DataFrame,
+        strategy: str,
+        start,
+        tickers: Optional[Iterable[str]] = None,
+        signal: str = "",
+    ) -> int:
+        # Signale ab start für die neu berechneten Ticker (None = alle) ersetzen, in einer
+        # Transaktion; Rückgabe: Zahl der Signale, die vorher nicht gespeichert waren
+        start = _day(start)
+        df = self._prepare(signals)
+        if not df.empty:
+            df = df[df["date"] >= start]
+
+        where, params = "strategy = ? AND date >= ?", (strategy, start)
+        with self.conn:
+            if tickers is None:
+                before = set(self.conn.execute(f"SELECT date, ticker, signal FROM signals WHERE {where}", params))
+                self.conn.execute(f"DELETE FROM signals WHERE {where}", params)
+            else:
+                before = set()
+                for t in tickers:
+                    args = params + (str(t),)
+                    before.update(self.conn.execute(f"SELECT date, ticker, signal FROM signals WHERE {where} AND ticker = ?", args))
+                    self.conn.execute(f"DELETE FROM signals WHERE {where} AND ticker = ?", args)
+            records = self._records(df, strategy, signal) if not df.empty else []
+            self._execute_insert(records)
+        return len({(r[0], r[1], r[3]) for r in records} - before)
+
+    @staticmethod
+    def _prepare(signals: Optional[pd.DataFrame]) -> pd.DataFrame:
+        if signals is None or signals.empty:
+            return pd.DataFrame()
+        df = signals.copy()
+        df["date"] = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
+        return df
+
+    def _insert(self, df: pd.DataFrame, strategy: str, signal: str) -> int:
+        # Schreibt ohne eigene Transaktion (Aufrufer: with self.conn)
+        return self._execute_insert(self._records(df, strategy, signal))
+
+    @staticmethod
+    def _records(df: pd.DataFrame, strategy: str, signal: str) -> list:
+        extra_cols = [c for c in df.columns if c not in BASE_COLUMNS]
+        signal_col = df["signal"].astype(str) if "signal" in df.columns else pd.Series(signal, index=df.index)
+        close_col = df["close"].astype(float) if "close" in df.columns else pd.Series(np.nan, index=df.index)
+        extras = (
+            [json.dumps({c: _json_value(v) for c, v in zip(extra_cols, row)}) for row in df[extra_cols].itertuples(index=False)]
+            if extra_cols else [None] * len(df)
+        )
+
+        return list(zip(
+            df["date"], df["ticker"].astype(str), [strategy] * len(df), signal_col,
+            [None if np.isnan(c) else float(c) for c in close_col], extras,
+        ))
+
+    def _execute_insert(self, records: list) -> int:
+        if not records:
+            return 0
+        cur = self.conn.executemany(
+            "INSERT OR IGNORE INTO signals (date, ticker, strategy, signal, close, extra) VALUES (?, ?, ?, ?, ?, ?)",
+            records,
+        )
+        return cur.rowcount
+
+    # ----------------------------
+    # Auswertungsstand pro Ticker
+    # ----------------------------
+    def state(self, strategy: str, tickers: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+        rows = self.conn.execute(
+            "SELECT ticker, through, close, config FROM signal_state WHERE strategy = ?", (strategy,)
+        ).fetchall()
+        state = {t: {"through": pd.Timestamp(d), "close": c, "config": k} for t, d, c, k in rows}
+        if tickers is not None:
+            wanted = set(tickers)
+            state = {t: v for t, v in state.items() if t in wanted}
+        return state
+
+    def set_state(self, strategy: str, through: Dict[str, tuple], config: str) -> None:
+        # through: {ticker: (Datum des letzten ausgewerteten Bars, Schlusskurs)}
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO signal_state (strategy, ticker, through, close, config) VALUES (?, ?, ?, ?, ?)",
+                [(strategy, str(t), _day(d), float(c), config) for t, (d, c) in through.items()],
+            )
+
+    # ----------------------------
+    # Sichten (Index strategy, date)
+    # ----------------------------
+    def query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def _select(
+        self,
+        where: str,
+        params: tuple,
+        tickers: Optional[Iterable[str]] = None,
+        order: str = "date, ticker",
+        limit: Optional[int] = None,
+    ) -> pd.DataFrame:
+
+        if tickers is not None:
+            tickers = list(tickers)
+            where += f" AND ticker IN ({', '.join('?' * len(tickers))})" if tickers else " AND 0"
+            params = tuple(params) + tuple(tickers)
+        sql = f"SELECT date, ticker, strategy, signal, close, extra FROM signals WHERE {where} ORDER BY {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self.frame(self.query(sql, params))
+
+    def on(self, strategy: str, day, tickers: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        return self._select("strategy = ? AND date = ?", (strategy, _day(day)), tickers)
+
+    def since(self, strategy: str, start, tickers: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        return self._select("strategy = ? AND date >= ?", (strategy, _day(start)), tickers)
+
+    def latest(self, strategy: str, n: int = 30, tickers: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        # Die letzten n Signale, chronologisch aufsteigend (wie sort_values("date").tail(n))
+        rows = self._select("strategy = ?", (strategy,), tickers, order="date DESC, ticker DESC", limit=n)
+        return rows.iloc[::-1].reset_index(drop=True)
+
+    def ticker_history(self, ticker: str, strategy: Optional[str] = None) -> pd.DataFrame:
+        if strategy is None:
+            return self._select("ticker = ?", (ticker,))
+        return self._select("strategy = ? AND ticker = ?", (strategy, ticker))
+
+    @staticmethod
+    def frame(rows: pd.DataFrame) -> pd.DataFrame:
+        # date -> Timestamp, extra-JSON -> eigene Spalten
+        if rows.empty:
+            return rows.drop(columns=["extra"], errors="ignore")
+        rows["date"] = pd.to_datetime(rows["date"])
+        extra = rows.pop("extra")
+        if extra.notna().any():
+            parsed = pd.DataFrame([json.loads(x) if x else {} for x in extra], index=rows.index)
+            rows = pd.concat([rows, parsed], axis=1)
+        return rows
+
+    def count(self, strategy: Optional[str] = None) -> int:
+        if strategy is None:
+            return self.conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM signals WHERE strategy = ?", (strategy,)).fetchone()[0]
+
+
+# ============================================
+# CLI: Ad-hoc-Abfrage
+# ============================================
+def main(argv: Optional[List[str]] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    with SignalDB() as db:
+        if not argv:
+            print(db.query("SELECT strategy, COUNT(*) AS signals, MIN(date) AS first, MAX(date) AS last FROM signals GROUP BY strategy").to_string(index=False))
+            return
+        print(db.query(" ".join(argv)).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# strategy_engine.py
+#
+# Array-basierter Kern der Week→Day-Strategie
+# - Entry-Maske als Regel (rules.py) über die vorberechneten Arrays
+# - Exit (Haltedauer-abhängiger EMA-Stop + Cooldown) in einem Durchlauf über NumPy-Arrays
+# - Mit numba kompiliert, falls installiert – sonst reine NumPy-Variante;
+#   numba wird erst beim ersten Aufruf importiert und kompiliert
+# - Parität mit der bisherigen Bar-für-Bar-Schleife: tests/test_strategy_engine.py
+
+import os
+from importlib.util import find_spec
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from rules import ENTRY_RULES, ArraySource, load_ruleset
+
+
+# ============================================
+# Parameter (wie bisher in run_strategy)
+# ============================================
+ADX_MIN = 20
+COOLDOWN_BARS = 15
+TIER1_DAYS = 50          # bis hier: EMA200 als Stop
+TIER2_DAYS = 100         # bis hier: EMA100, danach EMA50
+EMA_SPREAD_MIN = 0.01
+ATR_MIN = 0.005
+
+HAS_NUMBA = find_spec("numba") is not None
+USE_NUMBA = HAS_NUMBA and os.getenv("STRATEGY_NUMBA", "1") != "0"
+
+ENTRY_RULES_FILE = os.getenv("ENTRY_RULES_FILE")
+ENTRY_PARAMS = ("adx_min", "ema_spread_min", "atr_min")
+
+
+# ============================================
+# DataFrame -> zusammenhängende float64-Arrays
+# ============================================
+def _col(df: pd.DataFrame, name: str) -> np.ndarray:
+    x = df[name]
+    if isinstance(x, pd.DataFrame):
+        x = x.iloc[:, 0]
+    return np.ascontiguousarray(x.to_numpy(dtype=np.float64)).reshape(-1)
+
+
+def strategy_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    arrays = {
+        "close": _col(df, "Close"),
+        "sma20": _col(df, "sma20"),
+        "sma50": _col(df, "sma50"),
+        "sma200": _col(df, "sma200"),
+        "ema50": _col(df, "ema50"),
+        "ema100": _col(df, "ema100"),
+        "ema200": _col(df, "ema200"),
+        "adx": _col(df, "adx"),
+        "atr": _col(df, "atr"),
+        "slope": _col(df, "slope"),
+    }
+    # Optional: Filter aus höherem Zeitrahmen (backtest_week_to_day.WEEKLY_FILTER)
+    if "weekly_ok" in df.columns:
+        arrays["weekly_ok"] = _col(df, "weekly_ok")
+    # Kalendertage als Ganzzahl für die Haltedauer
+    arrays["days"] = pd.DatetimeIndex(df.index).values.astype("datetime64[D]").astype(np.int64)
+    return arrays
+
+
+# ============================================
+# ENTRY-Maske (vektorisiert)
+# ============================================
+def entry_mask(
+    a: Dict[str, np.ndarray],
+    start_idx: int = 0,
+    adx_min: float = ADX_MIN,
+    ema_spread_min: float = EMA_SPREAD_MIN,
+    atr_min: float = ATR_MIN,
+) -> np.ndarray:
+
+    # Regel "entry" aus rules.ENTRY_RULES (ENTRY_RULES_FILE überschreibt);
+    # die Arrays enthalten nur die vorberechneten Indikatoren aus strategy_arrays()
+    rules = load_ruleset(ENTRY_RULES_FILE, ENTRY_RULES, ENTRY_PARAMS)
+    params = {"adx_min": adx_min, "ema_spread_min": ema_spread_min, "atr_min": atr_min}
+    mask = rules.evaluate(ArraySource(a), ["entry"], params)["entry"]
+    if "weekly_ok" in a:
+        mask &= a["weekly_ok"] > 0
+    mask[:start_idx] = False
+    return mask
+
+
+# ============================================
+# EXIT-Auflösung – Variante 1: Schleife (numba)
+# ============================================
+def _resolve_loop(close, ema50, ema100, ema200, days, entry, start_idx, cooldown, tier1, tier2, out_entry, out_exit):
+    n = close.shape[0]
+    count = 0
+    position = False
+    entry_day = 0
+    cooldown_until = -1
+
+    for i in range(start_idx, n):
+        if position:
+            held = days[i] - entry_day
+            if held <= tier1:
+                crit = ema200[i]
+            elif held <= tier2:
+                crit = ema100[i]
+            else:
+                crit = ema50[i]
+
+            if close[i] < crit:
+                out_exit[count] = i
+                count += 1
+                position = False
+                cooldown_until = i + cooldown
+                continue
+
+        if not position and i > cooldown_until and entry[i]:
+            position = True
+            entry_day = days[i]
+            out_entry[count] = i
+            out_exit[count] = -1
+            continue
+
+    if position:
+        count += 1
+
+    return count
+
+
+_resolve_loop_jit = None
+
+
+def _jit():
+    global _resolve_loop_jit
+    if _resolve_loop_jit is None and HAS_NUMBA:
+        from numba import njit
+        _resolve_loop_jit = njit(cache=True, nogil=True)(_resolve_loop)
+    return _resolve_loop_jit
+
+
+# ============================================
+# EXIT-Auflösung – Variante 2: reines NumPy (Sprung von Trade zu Trade)
+# ============================================
+def scan_first(predicate, lo: int, n: int, width: int = 64) -> int:
+    # Erstes i in [lo, n) mit predicate(lo, hi)[i - lo] == True,
+    # in wachsenden Fenstern gesucht statt den ganzen Rest auszuwerten
+    while lo < n:
+        hi = min(n, lo + width)
+        hit = np.flatnonzero(predicate(lo, hi))
+        if hit.size:
+            return lo + int(hit[0])
+        lo = hi
+        width *= 2
+    return -1
+
+
+def _first_exit(close, ema50, ema100, ema200, days, e, tier1, tier2) -> int:
+    def stop_hit(lo, hi):
+        held = days[lo:hi] - days[e]
+        crit = np.where(held <= tier1, ema200[lo:hi], np.where(held <= tier2, ema100[lo:hi], ema50[lo:hi]))
+        return close[lo:hi] < crit
+
+    return scan_first(stop_hit, e + 1, close.shape[0])
+
+
+def _resolve_numpy(close, ema50, ema100, ema200, days, entry, start_idx, cooldown, tier1, tier2):
+    candidates = np.flatnonzero(entry)
+    candidates = candidates[candidates >= start_idx]
+
+    entries: List[int] = []
+    exits: List[int] = []
+    earliest = start_idx
+
+    with np.errstate(invalid="ignore"):
+        while True:
+            k = np.searchsorted(candidates, earliest)
+            if k >= candidates.size:
+                break
+
+            e = int(candidates[k])
+            x = _first_exit(close, ema50, ema100, ema200, days, e, tier1, tier2)
+            entries.append(e)
+            exits.append(x)
+
+            if x < 0:
+                break
+            earliest = x + cooldown + 1
+
+    return np.asarray(entries, dtype=np.int64), np.asarray(exits, dtype=np.int64)
+
+
+# ============================================
+# Trades auflösen
+# ============================================
+def resolve_trades(
+    a: Dict[str, np.ndarray],
+    entry: np.ndarray,
+    start_idx: int = 0,
+    cooldown: int = COOLDOWN_BARS,
+    tier1: int = TIER1_DAYS,
+    tier2: int = TIER2_DAYS,
+    use_numba: bool = USE_NUMBA,
+) -> Tuple[np.ndarray, np.ndarray]:
+
+    args = (a["close"], a["ema50"], a["ema100"], a["ema200"], a["days"], entry, start_idx, cooldown, tier1, tier2)
+
+    if use_numba and HAS_NUMBA:
+        n = a["close"].shape[0]
+        out_entry = np.empty(n + 1, dtype=np.int64)
+        out_exit = np.empty(n + 1, dtype=np.int64)
+        count = _jit()(*args, out_entry, out_exit)
+        return out_entry[:count].copy(), out_exit[:count].copy()
+
+    return _resolve_numpy(*args)
+
+
+def trade_indices(df: pd.DataFrame, start=None, **params) -> Tuple[np.ndarray, np.ndarray]:
+    a = strategy_arrays(df)
+    start_idx = 0 if start is None else int(np.searchsorted(df.index.values, np.datetime64(pd.Timestamp(start))))
+
+    entry_params = {k: params.pop(k) for k in ("adx_min", "ema_spread_min", "atr_min") if k in params}
+    entry = entry_mask(a, start_idx, **entry_params)
+    return resolve_trades(a, entry, start_idx, **params)
+
+
+# ============================================
+# Trade-Indizes -> ENTRY/EXIT-Zeilen
+# ============================================
+def trade_rows(ticker: str, index: pd.Index, close: np.ndarray, entries: np.ndarray, exits: np.ndarray) -> list:
+    rows = []
+    for e, x in zip(entries, exits):
+        entry_price = close[e]
+        rows.append([ticker, "ENTRY", index[e], entry_price, ""])
+        if x >= 0:
+            exit_price = close[x]
+            ret = (exit_price / entry_price - 1) * 100
+            rows.append([ticker, "EXIT", index[x], exit_price, ret])
+    return rows
@@ -0,0 +1,288 @@
+# sweep.py
+#
+# Parameter-Sweep / Grid-Search für den Week→Day-Backtest
+# - Kurse + Indikatoren einmal laden und berechnen
+# - Arrays per Shared Memory ohne Kopie an die Worker-Prozesse
+# - Entry-Masken einmal pro Entry-Parametersatz, Exit-Varianten wiederverwenden
+# - Aufgaben = Entry-Parametersatz × Ticker-Block: auch reine Exit-Sweeps nutzen alle Worker
+# - Ergebnis: nach Kennzahl sortierte Tabelle
+#
+# Beispiel:
+#   python sweep.py --adx-min 15,20,25 --cooldown 10,15 --tier1 30,50 --tier2 100,150
+
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from strategy_engine import (
+    ADX_MIN,
+    ATR_MIN,
+    COOLDOWN_BARS,
+    EMA_SPREAD_MIN,
+    TIER1_DAYS,
+    TIER2_DAYS,
+    entry_mask,
+    resolve_trades,
+    strategy_arrays,
+)
+
+
+# ============================================
+# Parameter
+# ============================================
+ENTRY_PARAMS = ("adx_min", "ema_spread_min", "atr_min")
+EXIT_PARAMS = ("cooldown", "tier1", "tier2")
+
+DEFAULTS = {
+    "adx_min": ADX_MIN,
+    "ema_spread_min": EMA_SPREAD_MIN,
+    "atr_min": ATR_MIN,
+    "cooldown": COOLDOWN_BARS,
+    "tier1": TIER1_DAYS,
+    "tier2": TIER2_DAYS,
+}
+
+ARRAY_FIELDS = ("close", "sma20", "sma50", "sma200", "ema50", "ema100", "ema200", "adx", "atr", "slope", "days")
+# Nur mitgepackt, wenn alle Ticker sie haben (z.B. Wochenfilter aus timeframes.py)
+OPTIONAL_FIELDS = ("weekly_ok",)
+
+TASKS_PER_WORKER = 4      # Aufgaben pro Worker (Lastausgleich bei ungleich langen Historien)
+
+timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+OUTPUT_FILE = f"sweep_results_{timestamp}"    # ohne Endung, Format über output.py
+
+
+# ============================================
+# Arrays aller Ticker in einen Shared-Memory-Block packen
+# ============================================
+def pack_arrays(arrays: Dict[str, Dict[str, np.ndarray]]):
+    tickers = list(arrays)
+    lengths = [arrays[t]["close"].shape[0] for t in tickers]
+    offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+    total = int(offsets[-1])
+    fields = ARRAY_FIELDS + tuple(f for f in OPTIONAL_FIELDS if tickers and all(f in arrays[t] for t in tickers))
+
+    shape = (len(fields), max(total, 1))
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+    block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+    for j, t in enumerate(tickers):
+        lo, hi = offsets[j], offsets[j + 1]
+        for k, f in enumerate(fields):
+            block[k, lo:hi] = arrays[t][f]
+
+    layout = {"tickers": tickers, "offsets": offsets.tolist(), "shape": shape, "fields": fields}
+    return shm, layout
+
+
+# ============================================
+# Worker: Block einmal pro Prozess anhängen (keine Kopie)
+# ============================================
+_WORKER = {}
+
+
+def attach_views(shm_name: str, layout: dict):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    block = np.ndarray(tuple(layout["shape"]), dtype=np.float64, buffer=shm.buf)
+
+    views = {}
+    offsets = layout["offsets"]
+    fields = layout.get("fields", ARRAY_FIELDS)
+    for j, t in enumerate(layout["tickers"]):
+        lo, hi = offsets[j], offsets[j + 1]
+        a = {f: block[k, lo:hi] for k, f in enumerate(fields)}
+        a["days"] = a["days"].astype(np.int64)
+        views[t] = a
+    return shm, views
+
+
+def _attach(shm_name: str, layout: dict, starts: Dict[str, int]) -> None:
+    shm, views = attach_views(shm_name, layout)
+    _WORKER.update({"shm": shm, "views": views, "starts": starts})
+
+
+def _evaluate_task(entry_params: dict, exit_grid: List[dict], tickers: List[str]) -> List[tuple]:
+    # Ein Entry-Parametersatz × alle Exit-Varianten auf einem Teil der Ticker;
+    # Rohdaten (Renditen, Haltedauern, offene Trades) pro Exit-Variante, Kennzahlen im Hauptprozess
+    views = _WORKER["views"]
+    starts = _WORKER["starts"]
+
+    # Entry-Masken hängen nur von den Entry-Parametern ab -> einmal pro Ticker und Aufgabe
+    masks = {t: entry_mask(views[t], starts[t], **entry_params) for t in tickers}
+
+    results = []
+    for exit_params in exit_grid:
+        returns = []
+        holds = []
+        open_trades = 0
+
+        for t in tickers:
+            a = views[t]
+            entries, exits = resolve_trades(a, masks[t], starts[t], **exit_params)
+            closed = exits >= 0
+            open_trades += int((~closed).sum())
+            if closed.any():
+                e, x = entries[closed], exits[closed]
+                returns.append((a["close"][x] / a["close"][e] - 1) * 100)
+                holds.append(a["days"][x] - a["days"][e])
+
+        results.append((
+            np.concatenate(returns) if returns else np.empty(0),
+            np.concatenate(holds) if holds else np.empty(0),
+            open_trades,
+        ))
+    return results
+
+
+# ============================================
+# Kennzahlen einer Kombination
+# ============================================
+def trade_metrics(returns: np.ndarray, holds: np.ndarray, open_trades: int, params: dict) -> dict:
+    row = dict(params)
+    n = returns.shape[0]
+    gains = returns[returns > 0].sum()
+    losses = -returns[returns < 0].sum()
+
+    row.update({
+        "trades": n,
+        "open": open_trades,
+        "win_rate_%": float((returns > 0).mean() * 100) if n else np.nan,
+        "avg_return_%": float(returns.mean()) if n else np.nan,
+        "median_return_%": float(np.median(returns)) if n else np.nan,
+        "sum_return_%": float(returns.sum()),
+        "profit_factor": float(gains / losses) if losses > 0 else np.nan,
+        "avg_hold_days": float(holds.mean()) if n else np.nan,
+    })
+    return row
+
+
+# ============================================
+# Sweep
+# ============================================
+def expand_grid(grid: Dict[str, List]) -> List[Tuple[dict, List[dict]]]:
+    grid = {k: list(grid.get(k, [DEFAULTS[k]])) for k in DEFAULTS}
+
+    entry_combos = [dict(zip(ENTRY_PARAMS, v)) for v in itertools.product(*(grid[k] for k in ENTRY_PARAMS))]
+    exit_combos = [dict(zip(EXIT_PARAMS, v)) for v in itertools.product(*(grid[k] for k in EXIT_PARAMS))]
+    return [(e, exit_combos) for e in entry_combos]
+
+
+def split_tickers(tickers: List[str], n_groups: int, workers: int) -> List[List[str]]:
+    # Genug Aufgaben für alle Worker, auch wenn nur Exit-Parameter variieren
+    # (eine Entry-Gruppe); verschränkt, damit lange und kurze Historien sich mischen
+    n = max(1, min(len(tickers), -(-max(1, workers) * TASKS_PER_WORKER // max(1, n_groups))))
+    return [tickers[i::n] for i in range(n)]
+
+
+def run_sweep(
+    arrays: Dict[str, Dict[str, np.ndarray]],
+    starts: Dict[str, int],
+    grid: Dict[str, List],
+    workers: int = os.cpu_count() or 1,
+    rank_by: str = "sum_return_%",
+) -> pd.DataFrame:
+
+    groups = expand_grid(grid)
+    chunks = split_tickers(list(arrays), len(groups), workers)
+    tasks = [(g, c) for g in range(len(groups)) for c in chunks]
+    shm, layout = pack_arrays(arrays)
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(workers, len(tasks))),
+            initializer=_attach,
+            initargs=(shm.name, layout, starts),
+        ) as pool:
+            futures = [pool.submit(_evaluate_task, *groups[g], c) for g, c in tasks]
+            parts = [fut.result() for fut in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # Teilergebnisse der Ticker-Blöcke pro Kombination zusammenführen
+    rows = []
+    for g, (entry_params, exit_grid) in enumerate(groups):
+        mine = [p for (tg, _), p in zip(tasks, parts) if tg == g]
+        for k, exit_params in enumerate(exit_grid):
+            returns, holds, open_trades = zip(*(p[k] for p in mine))
+            rows.append(trade_metrics(
+                np.concatenate(returns), np.concatenate(holds), sum(open_trades),
+                {**entry_params, **exit_params},
+            ))
+
+    table = pd.DataFrame(rows)
+    table = table.sort_values(rank_by, ascending=False, na_position="last").reset_index(drop=True)
+    table.insert(0, "rank", np.arange(1, len(table) + 1))
+    return table
+
+
+def load_arrays(tickers: List[str], start, history_start, end):
+    from backtest_week_to_day import add_indicators
+    from price_store import default_store
+
+    store = default_store()
+    prices = store.get_many(tickers, history_start, end)
+
+    arrays, starts = {}, {}
+    for t in tickers:
+        df = prices[t].data
+        if df.empty:
+            continue
+        df = add_indicators(df, t)
+        arrays[t] = strategy_arrays(df)
+        starts[t] = int(np.searchsorted(df.index.values, np.datetime64(pd.Timestamp(start))))
+    return arrays, starts
+
+
+# ============================================
+# CLI
+# ============================================
+def _values(text: str, cast):
+    return [cast(x) for x in text.split(",") if x.strip()]
+
+
+def main(argv=None):
+    from backtest_week_to_day import BACKTEST_START, EXIT_DATE, HISTORY_START, load_tickers
+    from output import write_table
+
+    parser = argparse.ArgumentParser(description="Parameter-Sweep Week→Day")
+    parser.add_argument("--adx-min", type=lambda s: _values(s, float), default=[ADX_MIN])
+    parser.add_argument("--ema-spread-min", type=lambda s: _values(s, float), default=[EMA_SPREAD_MIN])
+    parser.add_argument("--atr-min", type=lambda s: _values(s, float), default=[ATR_MIN])
+    parser.add_argument("--cooldown", type=lambda s: _values(s, int), default=[COOLDOWN_BARS])
+    parser.add_argument("--tier1", type=lambda s: _values(s, int), default=[TIER1_DAYS])
+    parser.add_argument("--tier2", type=lambda s: _values(s, int), default=[TIER2_DAYS])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--rank-by", default="sum_return_%")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args(argv)
+
+    grid = {
+        "adx_min": args.adx_min,
+        "ema_spread_min": args.ema_spread_min,
+        "atr_min": args.atr_min,
+        "cooldown": args.cooldown,
+        "tier1": args.tier1,
+        "tier2": args.tier2,
+    }
+
+    arrays, starts = load_arrays(load_tickers(), BACKTEST_START, HISTORY_START, EXIT_DATE)
+    n_combos = int(np.prod([len(v) for v in grid.values()]))
+    print(f"Sweep: {n_combos} Kombinationen × {len(arrays)} Ticker")
+
+    table = run_sweep(arrays, starts, grid, workers=args.workers, rank_by=args.rank_by)
+    path = write_table(table, args.output)
+
+    print(table.head(20).to_string(index=False))
+    print(f"\nErgebnisse gespeichert in: {path}")
+
+
+if __name__ == "__main__":
+    main()
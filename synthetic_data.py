@@ -0,0 +1,63 @@
+# synthetic_data.py
+#
+# Deterministische Fake-Kursdaten (kein Netz)
+# - Geometrische Irrfahrt mit Trendphasen, reproduzierbar pro Ticker
+# - Als Batch-Fetcher für PriceStore / fetch_universe verwendbar
+
+import zlib
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_access import FIELDS
+
+
+# ============================================
+# Einzelner Ticker
+# ============================================
+def ticker_seed(ticker: str, seed: int = 0) -> int:
+    return (zlib.crc32(ticker.encode("utf-8")) + seed) % (2 ** 32)
+
+
+def synthetic_ohlcv(ticker: str, start="2016-01-01", end="2026-01-01", seed: int = 0) -> pd.DataFrame:
+    # Kalender unabhängig vom angefragten Fenster -> identische Kurse bei Teilabfragen
+    full = pd.bdate_range("2000-01-03", end, inclusive="left", name="Date")
+    rng = np.random.default_rng(ticker_seed(ticker, seed))
+    n = len(full)
+
+    # Trendphasen: Drift wechselt alle ~120 Tage
+    regime = np.repeat(rng.normal(0.0004, 0.0015, n // 120 + 1), 120)[:n]
+    rets = regime + rng.normal(0.0, 0.018, n)
+
+    close = 20.0 * np.exp(np.cumsum(rets))
+    spread = np.abs(rng.normal(0.0, 0.012, n))
+    high = close * (1 + spread)
+    low = close * (1 - spread)
+    open_ = np.concatenate(([close[0]], close[:-1])) * (1 + rng.normal(0.0, 0.004, n))
+    open_ = np.clip(open_, low, high)
+    volume = rng.lognormal(13.5, 0.4, n).round()
+
+    df = pd.DataFrame(
+        np.column_stack([open_, high, low, close, volume]),
+        index=full,
+        columns=FIELDS,
+    )
+    return df[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+
+
+# ============================================
+# Batch-Fetcher
+# ============================================
+def synthetic_batch_fetch(tickers: List[str], start: pd.Timestamp, end: pd.Timestamp) -> Dict[str, pd.DataFrame]:
+    return {t: synthetic_ohlcv(t, start, end) for t in tickers}
+
+
+# ============================================
+# Universum (lazy, ein Ticker nach dem anderen)
+# ============================================
+def synthetic_universe(n_tickers: int, years: float, end="2026-01-01", seed: int = 0) -> Iterator[Tuple[str, pd.DataFrame]]:
+    start = pd.Timestamp(end) - pd.DateOffset(days=int(round(years * 365.25)))
+    for i in range(n_tickers):
+        ticker = f"SYN{i:05d}"
+        yield ticker, synthetic_ohlcv(ticker, start, end, seed=seed)
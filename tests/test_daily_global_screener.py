@@ -0,0 +1,23 @@
+# Daily-Screener: relative Stärke nachgeholter Signale am eigenen Signaltag
+
+import numpy as np
+import pandas as pd
+
+from daily_global_screener import relative_strength
+from data_access import FetchResult
+from ranking import rank_universe
+from synthetic_data import synthetic_ohlcv
+
+
+def test_relative_strength_covers_catch_up_signals():
+    tickers = [f"T{i}" for i in range(6)]
+    prices = {t: FetchResult(t, "ok", data=synthetic_ohlcv(t, "2023-01-01", "2025-01-01")) for t in tickers}
+    close = pd.DataFrame({t: prices[t].data["Close"] for t in tickers})
+    dates = close.index[[-4, -1]]
+
+    ranking = relative_strength(tickers, prices, None, dates[0])
+    got = ranking.lookup(dates, ["T1", "T2"])
+
+    full = rank_universe(close)
+    np.testing.assert_allclose(got, full.lookup(dates, ["T1", "T2"]))
+    assert not np.isnan(got).any()
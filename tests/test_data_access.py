@@ -0,0 +1,135 @@
+# fetch_batch / fetch_universe mit austauschbarem Fetcher (ohne Netz)
+
+import sys
+import threading
+import time
+import types
+
+import pandas as pd
+
+from data_access import (
+    STATUS_EMPTY, STATUS_ERROR, STATUS_OK, FetchError, empty_ohlcv, fetch_batch, fetch_universe,
+    yf_batch_fetch,
+)
+from synthetic_data import synthetic_ohlcv
+
+
+START = pd.Timestamp("2024-01-01")
+END = pd.Timestamp("2024-03-01")
+
+
+class FlakyFetcher:
+    # Erster Aufruf: ganzer Batch schlägt fehl, zweiter: nur "BBB", danach alles ok
+
+    def __init__(self, empty=()):
+        self.calls = []
+        self.empty = set(empty)
+
+    def __call__(self, tickers, start, end):
+        self.calls.append(list(tickers))
+        if len(self.calls) == 1:
+            raise ConnectionError("Verbindung abgebrochen")
+        out = {}
+        for t in tickers:
+            if t in self.empty:
+                out[t] = empty_ohlcv()
+            elif t == "BBB" and len(self.calls) == 2:
+                out[t] = FetchError("Too Many Requests")
+            else:
+                out[t] = synthetic_ohlcv(t, start, end)
+        return out
+
+
+def test_retries_until_success():
+    fetcher = FlakyFetcher(empty=["DEAD"])
+    delays = []
+    results = fetch_batch(["AAA", "BBB", "DEAD"], START, END, fetcher, retries=3, backoff=0.5, sleep=delays.append)
+
+    assert fetcher.calls == [["AAA", "BBB", "DEAD"], ["AAA", "BBB", "DEAD"], ["BBB"]]
+    assert delays == [0.5, 1.0]
+    assert {t: r.status for t, r in results.items()} == {"AAA": STATUS_OK, "BBB": STATUS_OK, "DEAD": STATUS_EMPTY}
+    assert results["AAA"].attempts == 2
+    assert results["BBB"].attempts == 3
+    assert not results["BBB"].data.empty
+
+
+def test_gives_up_after_retries():
+    fetcher = FlakyFetcher()
+    results = fetch_batch(["BBB"], START, END, fetcher, retries=2, sleep=lambda _: None)
+
+    assert results["BBB"].status == STATUS_ERROR
+    assert "Too Many Requests" in results["BBB"].error
+    assert results["BBB"].attempts == 2
+
+
+def test_fetch_universe_keeps_order_and_dedups():
+    calls = []
+
+    def fetcher(tickers, start, end):
+        calls.append(list(tickers))
+        return {t: synthetic_ohlcv(t, start, end) for t in tickers}
+
+    tickers = ["CCC", "AAA", "CCC", "BBB", "DDD"]
+    results = fetch_universe(tickers, START, END, fetcher, batch_size=2, max_workers=2)
+
+    assert list(results) == ["CCC", "AAA", "BBB", "DDD"]
+    assert sorted(calls) == [["BBB", "DDD"], ["CCC", "AAA"]]
+    assert all(r.ok for r in results.values())
+
+
+def test_yf_batch_errors_are_retryable(monkeypatch):
+    # yfinance meldet Fehler einzelner Ticker nur in shared._ERRORS, die Spalten fehlen dann
+    frame = synthetic_ohlcv("AAA", START, END)
+    raw = pd.concat({"AAA": frame}, axis=1)
+    errors = {
+        "BBB": "YFRateLimitError('Too Many Requests. Rate limited. Try after a while.')",
+        "DEAD": "YFPricesMissingError('$DEAD: possibly delisted; no price data found')",
+    }
+    fake = types.SimpleNamespace(download=lambda *a, **k: raw, shared=types.SimpleNamespace(_ERRORS=errors))
+    monkeypatch.setitem(sys.modules, "yfinance", fake)
+
+    out = yf_batch_fetch(["AAA", "BBB", "DEAD"], START, END)
+
+    assert len(out["AAA"]) == len(frame)
+    assert isinstance(out["BBB"], FetchError)
+    assert out["DEAD"].empty
+
+
+class RacyYfinance:
+    # Wie yfinance: download() setzt Modul-Globals zurück und füllt sie Ticker für Ticker
+
+    def __init__(self):
+        self.shared = types.SimpleNamespace(_DFS={}, _ERRORS={})
+        self.active = 0
+        self.overlap = False
+        self._count = threading.Lock()
+
+    def download(self, tickers, start, end, **kwargs):
+        with self._count:
+            self.active += 1
+            self.overlap |= self.active > 1
+        self.shared._DFS = {}
+        self.shared._ERRORS = {}
+        for t in tickers:
+            time.sleep(0.002)
+            if t.startswith("ERR"):
+                self.shared._ERRORS[t] = "Timeout('read timed out')"
+            else:
+                self.shared._DFS[t] = synthetic_ohlcv(t, start, end)
+        raw = pd.concat(self.shared._DFS, axis=1) if self.shared._DFS else pd.DataFrame()
+        with self._count:
+            self.active -= 1
+        return raw
+
+
+def test_concurrent_yf_batches_do_not_overwrite_each_other(monkeypatch):
+    fake = RacyYfinance()
+    monkeypatch.setitem(sys.modules, "yfinance", fake)
+    tickers = [f"T{i:02d}" for i in range(40)] + ["ERR1", "ERR2"]
+
+    results = fetch_universe(tickers, START, END, yf_batch_fetch, batch_size=5, max_workers=4, retries=1)
+
+    assert not fake.overlap
+    assert all(results[t].ok for t in tickers if t.startswith("T"))
+    assert results["ERR1"].status == STATUS_ERROR
+    assert results["ERR2"].status == STATUS_ERROR
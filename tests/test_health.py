@@ -0,0 +1,38 @@
+# Ticker-Health: Probe im Hintergrund neben dem eigentlichen Abruf
+
+import datetime
+import sys
+
+import pandas as pd
+
+from data_access import fetch_universe, yf_batch_fetch
+from health import TickerHealth
+from test_data_access import RacyYfinance
+
+
+NOW = datetime.datetime(2024, 3, 1, 12, 0)
+
+
+def test_probe_during_main_fetch_does_not_park_live_tickers(monkeypatch, tmp_path):
+    fake = RacyYfinance()
+    monkeypatch.setitem(sys.modules, "yfinance", fake)
+
+    health = TickerHealth(str(tmp_path / "health.json"), enabled=True)
+    dead = [f"D{i:02d}" for i in range(10)]
+    past = (NOW - datetime.timedelta(days=30)).isoformat()
+    health.entries = {
+        t: {"status": "empty", "dead": True, "failures": 1, "errors": 0, "first_failure": past, "last_checked": past, "skip_until": past}
+        for t in dead
+    }
+
+    probe = health.reprobe(yf_batch_fetch, now=NOW)
+    tickers = [f"T{i:02d}" for i in range(30)]
+    results = fetch_universe(tickers, pd.Timestamp("2024-01-01"), pd.Timestamp("2024-03-01"), yf_batch_fetch, batch_size=5, max_workers=4, retries=1)
+    probe.result(30)
+    health.record(results, NOW)
+    health.finish()
+
+    assert not fake.overlap
+    assert all(r.ok for r in results.values())
+    # die Probe-Ticker liefern wieder Daten -> nicht mehr pausiert; keiner der Live-Ticker wird pausiert
+    assert health.entries == {}
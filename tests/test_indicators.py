@@ -0,0 +1,36 @@
+# Indikator-Cache: Schlüssel hängt von allen Eingabespalten ab
+
+import numpy as np
+
+from indicators import IndicatorCache, Indicators
+from synthetic_data import synthetic_ohlcv
+
+
+def test_cache_hit_for_same_data():
+    cache = IndicatorCache()
+    df = synthetic_ohlcv("AAA", "2023-01-01", "2024-01-01")
+
+    first = Indicators(df, "AAA", cache).atr(14)
+    second = Indicators(df.copy(), "AAA", cache).atr(14)
+
+    assert second is first
+    assert cache.hits == 1
+
+
+def test_high_low_volume_changes_invalidate():
+    cache = IndicatorCache()
+    df = synthetic_ohlcv("AAA", "2023-01-01", "2024-01-01")
+    atr = Indicators(df, "AAA", cache).atr(14)
+    adx = Indicators(df, "AAA", cache).adx(14)
+    vol = Indicators(df, "AAA", cache).volume_sma(50)
+
+    changed = df.copy()
+    changed.iloc[100, changed.columns.get_loc("High")] *= 1.5
+    changed.iloc[150, changed.columns.get_loc("Low")] *= 0.5
+    changed.iloc[-1, changed.columns.get_loc("Volume")] *= 3
+    ind = Indicators(changed, "AAA", cache)
+
+    assert not np.allclose(ind.atr(14), atr, equal_nan=True)
+    assert not np.allclose(ind.adx(14), adx, equal_nan=True)
+    assert not np.allclose(ind.volume_sma(50), vol, equal_nan=True)
+    np.testing.assert_allclose(ind.atr(14), Indicators(changed).atr(14))
@@ -0,0 +1,114 @@
+# TelegramNotifier gegen einen lokalen aiohttp-Stub (TELEGRAM_API_URL)
+
+import asyncio
+import threading
+
+import pytest
+
+web = pytest.importorskip("aiohttp.web")
+
+from notifier import MAX_MESSAGE_LEN, DeliveryError, TelegramNotifier
+
+
+OK = (200, {"ok": True, "result": {}})
+
+
+class StubServer:
+    # Telegram-Bot-API im eigenen Thread; Antworten der Reihe nach aus self.responses
+
+    def __init__(self):
+        self.responses = []
+        self.received = []
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    async def handle(self, request):
+        data = await request.post()
+        self.received.append(dict(data))
+        status, body = self.responses.pop(0) if self.responses else OK
+        return web.json_response(body, status=status)
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_post("/bot{token}/sendMessage", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        return self.runner.addresses[0][1]
+
+    def start(self) -> str:
+        self.thread.start()
+        port = asyncio.run_coroutine_threadsafe(self._start(), self.loop).result(5)
+        return f"http://127.0.0.1:{port}"
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    server.url = server.start()
+    yield server
+    server.stop()
+
+
+def notifier(stub, **kwargs) -> TelegramNotifier:
+    return TelegramNotifier("TOKEN", "42", api_url=stub.url, backoff=0.01, **kwargs)
+
+
+def test_long_message_is_split_in_order(stub):
+    lines = [f"Zeile {i:05d} " + "x" * 90 for i in range(100)]
+    text = "\n".join(lines)
+
+    with notifier(stub) as n:
+        n.push(text)
+
+    texts = [r["text"] for r in stub.received]
+    assert len(texts) == 3
+    assert all(len(t) <= MAX_MESSAGE_LEN for t in texts)
+    assert "\n".join(texts) == text
+    assert all(r["chat_id"] == "42" for r in stub.received)
+    assert (n.sent, n.failed) == (3, 0)
+
+
+def test_retry_on_429_and_5xx(stub):
+    stub.responses = [
+        (429, {"ok": False, "description": "Too Many Requests", "parameters": {"retry_after": 0}}),
+        (502, {"ok": False, "description": "Bad Gateway"}),
+        OK,
+    ]
+
+    with notifier(stub) as n:
+        n.push("Hallo").result(5)
+
+    assert len(stub.received) == 3
+    assert (n.sent, n.failed) == (1, 0)
+
+
+def test_gives_up_after_retries(stub):
+    stub.responses = [(503, {"ok": False, "description": "Unavailable"})] * 3
+
+    with notifier(stub, retries=2) as n:
+        fut = n.push("Hallo")
+        with pytest.raises(DeliveryError):
+            fut.result(5)
+
+    assert len(stub.received) == 3
+    assert (n.sent, n.failed) == (0, 1)
+
+
+def test_client_error_is_final(stub):
+    stub.responses = [(400, {"ok": False, "description": "Bad Request: chat not found"})]
+
+    with notifier(stub) as n:
+        n.push("Hallo")
+        n.push("Zweite")
+
+    # kein Retry nach 400, die nächste Nachricht geht trotzdem raus
+    assert [r["text"] for r in stub.received] == ["Hallo", "Zweite"]
+    assert (n.sent, n.failed) == (1, 1)
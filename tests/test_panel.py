@@ -0,0 +1,80 @@
+# Panel (Datum × Ticker) gegen Einzelberechnung pro Ticker, auch bei Kalenderlücken
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from panel import Panel, trend_masks
+from rules import TREND_RULES, FrameSource, compile_rules
+from synthetic_data import synthetic_ohlcv
+
+
+def gappy_frames():
+    us = synthetic_ohlcv("AAA", "2022-01-01", "2025-01-01")
+    late = synthetic_ohlcv("BBB", "2023-03-01", "2025-01-01")
+    gaps = synthetic_ohlcv("CCC", "2022-01-01", "2025-01-01")
+    gaps = gaps.drop(gaps.index[[300, 301, 450]])
+    # anderer Börsenkalender: eigene Feiertage, die den US-Tickern fehlen
+    de = synthetic_ohlcv("DDD.DE", "2022-01-01", "2025-01-01")
+    de = de.drop(de.index[::37])
+    return {"AAA": us, "BBB": late, "CCC": gaps, "DDD.DE": de}
+
+
+@pytest.fixture(scope="module")
+def frames():
+    return gappy_frames()
+
+
+@pytest.fixture(scope="module")
+def panel(frames):
+    return Panel.from_frames(frames)
+
+
+def own_rows(x: pd.DataFrame, ticker: str, index: pd.Index) -> np.ndarray:
+    return x[ticker].reindex(index).to_numpy()
+
+
+@pytest.mark.parametrize("op", ["sma", "ema", "rolling_max", "pct_change"])
+def test_windows_match_per_ticker(frames, panel, op):
+    for t, df in frames.items():
+        close = df["Close"]
+        expected = {
+            "sma": close.rolling(200).mean(),
+            "ema": close.ewm(span=50).mean(),
+            "rolling_max": close.rolling(126).max(),
+            "pct_change": close / close.shift(126) - 1.0,
+        }[op]
+        arg = {"sma": 200, "ema": 50, "rolling_max": 126, "pct_change": 126}[op]
+        got = own_rows(getattr(panel, op)(arg), t, df.index)
+        np.testing.assert_allclose(got, expected.to_numpy(), rtol=1e-12, equal_nan=True)
+
+
+def test_gaps_do_not_blank_sma200(frames, panel):
+    for t, df in frames.items():
+        valid = panel.sma(200)[t].notna().sum()
+        assert valid == len(df) - 199
+
+
+def test_calendar_groups(panel):
+    # AAA und BBB (späterer Start) teilen den Kalender, CCC und DDD.DE haben eigene Lücken
+    groups = [sorted(panel.tickers[j] for j in cols) for _, cols in panel.calendar_groups()]
+    assert sorted(groups) == [["AAA", "BBB"], ["CCC"], ["DDD.DE"]]
+
+
+def test_trend_masks_match_per_ticker(frames, panel):
+    masks = trend_masks(panel, TREND_RULES)
+    rules = compile_rules(TREND_RULES)
+    for t, df in frames.items():
+        expected = rules.evaluate(FrameSource(df))
+        for name, mask in expected.items():
+            got = masks[name][t].reindex(df.index).to_numpy()
+            np.testing.assert_array_equal(got, mask, err_msg=f"{t}: {name}")
+            # außerhalb der eigenen Bars keine Treffer
+            assert not masks[name][t].drop(df.index).any()
+
+
+def test_shift_counts_own_bars(frames, panel):
+    shifted = panel.shift(panel.close, 20)
+    for t, df in frames.items():
+        got = own_rows(shifted, t, df.index)
+        np.testing.assert_allclose(got, df["Close"].shift(20).to_numpy(), equal_nan=True)
@@ -0,0 +1,26 @@
+# Portfolio-Simulation: Kennzahlen nur über den Backtest-Zeitraum
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio import PortfolioConfig, TickerData, simulate
+
+
+def test_summary_starts_at_backtest_start():
+    # Historie ab 2020 für die Indikatoren, Backtest ab 2021; Kurs verdoppelt sich im Backtest
+    dates = pd.bdate_range("2020-01-01", "2022-01-03")
+    start = pd.Timestamp("2021-01-04")
+    first = int(dates.searchsorted(start))
+    close = np.full(len(dates), 100.0)
+    close[first:] = np.linspace(100.0, 200.0, len(dates) - first)
+
+    td = TickerData("AAA", dates.values, close, np.ones(len(dates)), np.array([first]), np.array([-1]))
+    cfg = PortfolioConfig(capital=10_000.0, max_positions=1, sizing="equal", max_weight=1.0)
+    result = simulate({"AAA": td}, cfg, start)
+
+    assert result.equity.index[0] == start
+    years = (dates[-1] - start).days / 365.25
+    assert result.summary["total_return_%"] == pytest.approx(100.0)
+    assert result.summary["cagr_%"] == pytest.approx((2.0 ** (1 / years) - 1) * 100, abs=0.01)
+    assert result.summary["avg_exposure_%"] == pytest.approx(100.0)
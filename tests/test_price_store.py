@@ -0,0 +1,76 @@
+# PriceStore: inkrementelles Nachladen und Neuladen nach geänderter Adjustierung
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_store import OVERLAP_BARS, PriceStore
+from synthetic_data import synthetic_ohlcv
+
+
+def prices(ticker, start, end) -> pd.DataFrame:
+    # Fester Kalender-Endpunkt -> gleiche Kurse unabhängig vom angefragten Fenster
+    df = synthetic_ohlcv(ticker, start)
+    return df[df.index < pd.Timestamp(end)]
+
+
+class AdjustingFetcher:
+    # Synthetische Kurse, rückwirkend mit self.factor adjustiert (wie auto_adjust nach einem Split)
+
+    def __init__(self):
+        self.factor = 1.0
+        self.calls = []
+
+    def __call__(self, tickers, start, end):
+        self.calls.append((list(tickers), start, end))
+        out = {}
+        for t in tickers:
+            df = prices(t, start, end)
+            df[["Open", "High", "Low", "Close"]] *= self.factor
+            out[t] = df
+        return out
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path), fetcher=AdjustingFetcher(), retries=1)
+
+
+def test_incremental_update_fetches_only_the_tail(store):
+    store.update("AAA", "2023-01-01", "2024-01-01")
+    store.fetcher.calls.clear()
+
+    df = store.update("AAA", "2023-01-01", "2024-02-01")
+
+    [(tickers, start, end)] = store.fetcher.calls
+    assert start == pd.bdate_range("2023-01-01", "2024-01-01", inclusive="left")[-OVERLAP_BARS]
+    expected = prices("AAA", "2023-01-01", "2024-02-01")
+    assert df.index.equals(expected.index)
+    np.testing.assert_allclose(df.to_numpy(), expected.to_numpy())
+
+
+def test_split_reloads_full_history(store):
+    store.update("AAA", "2023-01-01", "2024-01-01")
+    store.fetcher.factor = 0.5   # 2:1-Split, alle bisherigen Kurse halbiert
+
+    df = store.update("AAA", "2023-01-01", "2024-02-01")
+
+    expected = prices("AAA", "2023-01-01", "2024-02-01")
+    np.testing.assert_allclose(df["Close"].to_numpy(), 0.5 * expected["Close"].to_numpy())
+    assert df.index.equals(expected.index)
+    # keine gemischte Adjustierung: der erste Bar stammt aus dem Neuladen
+    _, start, _ = store.fetcher.calls[-1]
+    assert start == pd.Timestamp("2023-01-01")
+
+
+def test_small_difference_on_last_bar_is_not_a_readjustment(store):
+    store.update("AAA", "2023-01-01", "2024-01-01")
+    # letzter gespeicherter Bar war unvollständig -> anderer Close ist erlaubt
+    stored = store.load("AAA", mmap=False)
+    stored.iloc[-1, stored.columns.get_loc("Close")] *= 1.02
+    store.write("AAA", stored)
+    store.fetcher.calls.clear()
+
+    store.update("AAA", "2023-01-01", "2024-02-01")
+
+    assert len(store.fetcher.calls) == 1
@@ -0,0 +1,28 @@
+# Regeldateien: einmal lesen und kompilieren, neu nur bei geänderter Datei
+
+import json
+import os
+
+import rules
+from rules import TREND_RULES, load_ruleset
+
+
+def test_load_ruleset_cached_until_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"quality": "close >= 5.0"}))
+
+    reads = []
+    load_rules = rules.load_rules
+    monkeypatch.setattr(rules, "load_rules", lambda *a: reads.append(a) or load_rules(*a))
+
+    first = load_ruleset(str(path), TREND_RULES)
+    assert load_ruleset(str(path), TREND_RULES) is first
+    assert len(reads) == 1
+
+    path.write_text(json.dumps({"quality": "close >= 10.0"}))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    second = load_ruleset(str(path), TREND_RULES)
+    assert len(reads) == 2
+    assert second.rules["quality"] == "close >= 10.0"
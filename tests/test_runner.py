@@ -0,0 +1,20 @@
+# Runner: Zeitausschnitt pro Strategie aus dem gemeinsamen Abruf
+
+import pandas as pd
+
+from data_access import FetchResult
+from ranking import BENCHMARK, load_benchmark
+from runner import Strategy, window
+from synthetic_data import synthetic_ohlcv
+
+
+def test_window_passes_benchmark_through():
+    prices = {t: FetchResult(t, "ok", data=synthetic_ohlcv(t, "2022-01-01", "2025-01-01")) for t in ["AAA", "BBB", BENCHMARK]}
+    strategy = Strategy("trend", ["AAA"], pd.Timestamp("2024-01-01"), pd.Timestamp("2025-01-01"))
+
+    data = window(prices, strategy)
+
+    assert list(data) == ["AAA", BENCHMARK]
+    benchmark = load_benchmark(data)
+    assert benchmark.index[0] >= strategy.start
+    assert benchmark.equals(prices[BENCHMARK].data["Close"].loc["2024-01-01":"2024-12-31"])
@@ -0,0 +1,81 @@
+# SignalDB: Sichten und Ersetzen neu berechneter Fenster
+
+import pandas as pd
+import pytest
+
+from signal_db import SignalDB, config_key
+
+
+def signals(rows):
+    return pd.DataFrame(rows, columns=["date", "ticker", "close", "ret_3m"])
+
+
+@pytest.fixture
+def db():
+    with SignalDB(":memory:") as db:
+        yield db
+
+
+def test_latest_is_ascending(db):
+    db.insert(signals([
+        ("2025-01-02", "AAA", 10.0, 0.1),
+        ("2025-01-03", "BBB", 11.0, 0.2),
+        ("2025-01-03", "AAA", 12.0, 0.3),
+        ("2025-01-06", "CCC", 13.0, 0.4),
+    ]), "trend")
+
+    latest = db.latest("trend", 3)
+
+    # wie sort_values("date").tail(3)
+    assert list(zip(latest["date"].dt.strftime("%Y-%m-%d"), latest["ticker"])) == [
+        ("2025-01-03", "AAA"), ("2025-01-03", "BBB"), ("2025-01-06", "CCC"),
+    ]
+
+
+def test_insert_only_adds_new_days(db):
+    db.insert(signals([("2025-01-02", "AAA", 10.0, 0.1)]), "trend")
+    added = db.insert(signals([("2025-01-02", "AAA", 99.0, 0.9), ("2025-01-03", "AAA", 11.0, 0.2)]), "trend")
+
+    assert added == 1
+    assert db.on("trend", "2025-01-02")["close"].tolist() == [10.0]
+
+
+def test_replace_drops_stale_signals(db):
+    db.insert(signals([
+        ("2024-12-30", "AAA", 9.0, 0.0),
+        ("2025-01-02", "AAA", 10.0, 0.1),
+        ("2025-01-03", "AAA", 11.0, 0.2),
+        ("2025-01-03", "BBB", 20.0, 0.5),
+    ]), "trend")
+
+    # Neue Regeln: für AAA nur noch 2025-01-03 (mit anderem Wert) und 2025-01-06
+    added = db.replace(signals([
+        ("2025-01-03", "AAA", 11.5, 0.25),
+        ("2025-01-06", "AAA", 12.0, 0.3),
+    ]), "trend", "2025-01-01", ["AAA"])
+
+    rows = db.since("trend", "2024-01-01")
+    assert list(zip(rows["date"].dt.strftime("%Y-%m-%d"), rows["ticker"], rows["close"])) == [
+        ("2024-12-30", "AAA", 9.0),     # vor dem Fenster: bleibt
+        ("2025-01-03", "AAA", 11.5),
+        ("2025-01-03", "BBB", 20.0),    # nicht neu berechnet: bleibt
+        ("2025-01-06", "AAA", 12.0),
+    ]
+    # 2025-01-06 war vorher nicht gespeichert; 2025-01-03 nur mit neuem Wert
+    assert added == 1
+
+
+def test_state_roundtrip(db):
+    db.set_state("trend", {"AAA": (pd.Timestamp("2025-01-03"), 11.0), "BBB": ("2025-01-02", 20.0)}, "k1")
+    db.set_state("trend", {"AAA": ("2025-01-06", 12.0)}, "k2")
+
+    state = db.state("trend", ["AAA"])
+    assert list(state) == ["AAA"]
+    assert state["AAA"] == {"through": pd.Timestamp("2025-01-06"), "close": 12.0, "config": "k2"}
+    assert db.state("trend")["BBB"]["config"] == "k1"
+
+
+def test_config_key_changes_with_rules():
+    rules = {"entry": "close > sma(200)"}
+    assert config_key(rules, "2024-01-01") == config_key(dict(rules), "2024-01-01")
+    assert config_key(rules, "2024-01-01") != config_key({"entry": "close > sma(100)"}, "2024-01-01")
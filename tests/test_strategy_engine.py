@@ -0,0 +1,93 @@
+# strategy_engine gegen die bisherige Bar-für-Bar-Schleife aus run_strategy
+
+import pandas as pd
+import pytest
+
+from backtest_week_to_day import BACKTEST_START, HISTORY_START, add_indicators
+from strategy_engine import (
+    ADX_MIN, ATR_MIN, COOLDOWN_BARS, EMA_SPREAD_MIN, HAS_NUMBA, TIER1_DAYS, TIER2_DAYS,
+    _col, trade_indices, trade_rows,
+)
+from synthetic_data import synthetic_ohlcv
+
+
+TICKERS = [f"SYN{i:03d}" for i in range(20)]
+
+
+# ============================================
+# Referenz: bisherige Schleife (ohne Forced Exit)
+# ============================================
+def reference_rows(df: pd.DataFrame, ticker: str, start) -> list:
+    rows = []
+    position = False
+    entry_price = 0
+    entry_date = None
+    cooldown_until = -1
+
+    close = df["Close"].astype(float).values.reshape(-1,)
+
+    for i in range(len(df)):
+        date = df.index[i]
+
+        if date < start:
+            continue
+
+        if position:
+            days_open = (date - entry_date).days
+
+            if days_open <= TIER1_DAYS:
+                crit = df["ema200"].iloc[i]
+            elif days_open <= TIER2_DAYS:
+                crit = df["ema100"].iloc[i]
+            else:
+                crit = df["ema50"].iloc[i]
+
+            if close[i] < crit:
+                exit_price = close[i]
+                ret = (exit_price / entry_price - 1) * 100
+                rows.append([ticker, "EXIT", date, exit_price, ret])
+
+                position = False
+                cooldown_until = i + COOLDOWN_BARS
+                entry_price = 0
+                entry_date = None
+                continue
+
+        if not position and i > cooldown_until:
+
+            if (
+                close[i] > df["sma200"].iloc[i] and
+                df["sma20"].iloc[i] > df["sma50"].iloc[i] and
+                df["adx"].iloc[i] > ADX_MIN and
+                df["slope"].iloc[i] > 0 and
+                abs(df["ema50"].iloc[i] - df["ema200"].iloc[i]) / close[i] > EMA_SPREAD_MIN and
+                df["atr"].iloc[i] / close[i] > ATR_MIN
+            ):
+                position = True
+                entry_price = close[i]
+                entry_date = date
+                rows.append([ticker, "ENTRY", date, entry_price, ""])
+                continue
+
+    return rows
+
+
+@pytest.fixture(scope="module")
+def universe():
+    return {t: add_indicators(synthetic_ohlcv(t, HISTORY_START, "2025-01-01")) for t in TICKERS}
+
+
+@pytest.mark.parametrize("use_numba", [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(not HAS_NUMBA, reason="numba nicht installiert")),
+])
+def test_parity_with_loop(universe, use_numba):
+    total = 0
+    for t, df in universe.items():
+        expected = reference_rows(df, t, BACKTEST_START)
+        entries, exits = trade_indices(df, start=BACKTEST_START, use_numba=use_numba)
+        got = trade_rows(t, df.index, _col(df, "Close"), entries, exits)
+        assert got == expected, t
+        total += len(expected)
+    # synthetische Daten müssen tatsächlich Trades erzeugen
+    assert total > 0
@@ -0,0 +1,49 @@
+# Parameter-Sweep: Aufteilung auf Worker ändert keine Kennzahl
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest_week_to_day import BACKTEST_START, HISTORY_START, add_indicators
+from strategy_engine import strategy_arrays
+import sweep
+from sweep import expand_grid, run_sweep, split_tickers, trade_metrics
+from synthetic_data import synthetic_ohlcv
+
+
+@pytest.fixture(scope="module")
+def universe():
+    arrays, starts = {}, {}
+    for t in [f"SYN{i:03d}" for i in range(12)]:
+        df = add_indicators(synthetic_ohlcv(t, HISTORY_START, "2024-01-01"))
+        arrays[t] = strategy_arrays(df)
+        starts[t] = int(np.searchsorted(df.index.values, np.datetime64(BACKTEST_START)))
+    return arrays, starts
+
+
+def test_exit_only_grid_is_split_across_workers():
+    chunks = split_tickers([f"T{i}" for i in range(10)], n_groups=1, workers=2)
+    assert len(chunks) == 8
+    assert sorted(t for c in chunks for t in c) == sorted(f"T{i}" for i in range(10))
+
+
+def test_split_matches_unsplit(universe, monkeypatch):
+    arrays, starts = universe
+    grid = {"cooldown": [10, 15], "tier1": [30, 50]}
+
+    # Referenz: alle Ticker in einer Aufgabe, im Testprozess
+    monkeypatch.setattr(sweep, "_WORKER", {"views": arrays, "starts": starts})
+    [(entry_params, exit_grid)] = expand_grid(grid)
+    parts = sweep._evaluate_task(entry_params, exit_grid, list(arrays))
+    expected = pd.DataFrame([
+        trade_metrics(r, h, o, {**entry_params, **p}) for p, (r, h, o) in zip(exit_grid, parts)
+    ])
+
+    table = run_sweep(arrays, starts, grid, workers=3)
+
+    keys = ["cooldown", "tier1"]
+    table = table.drop(columns="rank").sort_values(keys).reset_index(drop=True)
+    expected = expected.sort_values(keys).reset_index(drop=True)
+    assert len(table) == 4
+    assert table["trades"].sum() > 0
+    pd.testing.assert_frame_equal(table[expected.columns], expected, check_exact=False, rtol=1e-12)
@@ -0,0 +1,51 @@
+# Inkrementelle Trend-Signale: nur neue Bars auswerten, gleiche Treffer wie die volle Auswertung
+
+import pandas as pd
+import pytest
+
+from panel import Panel, compute_signals_panel
+from rules import TREND_RULES, compile_rules
+from synthetic_data import synthetic_ohlcv
+from trendscreener import EXTRA_LOOKBACK, new_signals, plan_block, signal_frames
+
+CONFIG = "k1"
+
+
+@pytest.fixture(scope="module")
+def data():
+    return {t: synthetic_ohlcv(t, "2021-01-01", "2025-01-01")[["Close", "Volume"]] for t in ["AAA", "BBB", "CCC"]}
+
+
+def evaluate(data, plan):
+    lookback = max(compile_rules(TREND_RULES).lookback(), EXTRA_LOOKBACK)
+    panel = Panel.from_frames(signal_frames(data, plan, lookback), ["Close", "Volume"])
+    return new_signals(compute_signals_panel(panel), plan)
+
+
+def state(data, through):
+    return {t: {"through": through, "close": df["Close"][through], "config": CONFIG} for t, df in data.items()}
+
+
+def test_incremental_matches_full(data):
+    through = data["AAA"].index[-150]
+    full = evaluate(data, {t: None for t in data})
+    assert not full.empty
+
+    plan = plan_block(data, state(data, through), CONFIG)
+    assert set(plan.values()) == {through}
+    inc = evaluate(data, plan)
+
+    expected = full[full["date"] > through].reset_index(drop=True)
+    assert 0 < len(inc) < len(full)
+    pd.testing.assert_frame_equal(inc, expected)
+
+
+def test_plan_rebuilds_on_config_or_adjustment(data):
+    through = data["AAA"].index[-150]
+    st = state(data, through)
+    st["BBB"]["close"] *= 0.5                 # Split/Dividende: Kurse neu adjustiert
+    st.pop("CCC")                             # noch nie ausgewertet
+
+    plan = plan_block(data, st, CONFIG)
+    assert plan == {"AAA": through, "BBB": None, "CCC": None}
+    assert set(plan_block(data, st, "k2").values()) == {None}
@@ -0,0 +1,231 @@
+# timeframes.py
+#
+# Wochen- und Monats-Bars aus den gespeicherten Tageskursen (kein zusätzlicher Download)
+# - OHLCV je Periode: Open erster Tag, High Max, Low Min, Close letzter Tag, Volume Summe
+# - Index einer Periode = letzter Handelstag der Periode (dann ist der Bar fertig)
+# - Cache pro Ticker und Zeitrahmen; neue Tagesbars rechnen nur die letzte Periode neu,
+#   rückwirkend geänderte Kurse die ganze Reihe
+# - Indikatoren pro Zeitrahmen über indicators.Indicators (Cache-Schlüssel "TICKER@W")
+# - Rückabbildung auf Tagesbars ohne Look-Ahead: ein Tag sieht nur abgeschlossene Perioden,
+#   die laufende Woche / der laufende Monat zählt erst ab ihrem letzten Handelstag
+# - Filter als Regel-Ausdruck (rules.py) auf den Wochenbars, z.B. "close > sma(30)"
+#
+# Beispiel:
+#   tf = Timeframes(df, "AAPL")
+#   weekly_up = tf.mask("W", "close > sma(30) and sma(10) > sma(30)")
+#   sma30_w = tf.align("W", tf.indicators("W").sma(30))
+
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+from indicators import Indicators, to_1d
+from rules import FrameSource, compile_rules
+
+
+# ============================================
+# Konfiguration
+# ============================================
+# Wochen enden freitags, Monate am Kalenderende (Perioden-Frequenzen von pandas)
+TIMEFRAMES = {"W": "W-FRI", "M": "M"}
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+
+# ============================================
+# Resampling (vektorisiert über Periodengrenzen)
+# ============================================
+@dataclass
+class Resampled:
+    bars: pd.DataFrame      # Index = letzter Handelstag der Periode
+    first: pd.Timestamp     # erster Tag der letzten Periode (Start für inkrementelles Update)
+    complete: bool          # letzte Periode abgeschlossen?
+
+
+def _freq(tf: str) -> str:
+    if tf not in TIMEFRAMES:
+        raise ValueError(f"Unbekannter Zeitrahmen: {tf} (erlaubt: {', '.join(TIMEFRAMES)})")
+    return TIMEFRAMES[tf]
+
+
+def _column(df: pd.DataFrame, name: str) -> np.ndarray:
+    if name not in df.columns:
+        return np.full(len(df), np.nan)
+    return to_1d(df[name]).to_numpy(dtype=np.float64)
+
+
+def _period_complete(last_day: pd.Timestamp, period: pd.Period) -> bool:
+    # Abgeschlossen, wenn der letzte Tag der letzte Werktag der Periode ist
+    # (Feiertage unbekannt -> konservativ: dann erst mit dem ersten Bar der Folgeperiode)
+    end = pd.offsets.BDay().rollback(period.end_time.normalize())
+    return last_day.normalize() >= end
+
+
+def resample(df: pd.DataFrame, tf: str) -> Resampled:
+    freq = _freq(tf)
+    if df.empty:
+        return Resampled(pd.DataFrame(columns=OHLCV, index=pd.DatetimeIndex([])), pd.NaT, True)
+
+    index = pd.DatetimeIndex(df.index)
+    periods = index.to_period(freq)
+    ids = periods.asi8
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(ids)] - 1
+
+    high = _column(df, "High")
+    low = _column(df, "Low")
+    volume = _column(df, "Volume")
+    bars = pd.DataFrame(
+        {
+            "Open": _column(df, "Open")[starts],
+            "High": np.fmax.reduceat(high, starts),
+            "Low": np.fmin.reduceat(low, starts),
+            "Close": _column(df, "Close")[ends],
+            "Volume": np.add.reduceat(np.nan_to_num(volume), starts),
+        },
+        index=index[ends],
+    )
+    return Resampled(bars, index[starts[-1]], _period_complete(index[-1], periods[-1]))
+
+
+# ============================================
+# Cache mit inkrementellem Update
+# ============================================
+@dataclass
+class _Entry:
+    first_day: pd.Timestamp
+    last_day: pd.Timestamp
+    rows: int
+    last_close: float
+    result: Resampled
+
+
+class ResampleCache:
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.updates = 0
+        self.misses = 0
+
+    def _appended(self, entry: _Entry, df: pd.DataFrame, close: np.ndarray) -> bool:
+        # Nur angehängte Tage? Sonst (neuer Zeitraum, angepasste Kurse) komplett neu
+        n = entry.rows
+        return (
+            len(df) >= n
+            and df.index[0] == entry.first_day
+            and df.index[n - 1] == entry.last_day
+            and close[n - 1] == entry.last_close
+        )
+
+    def get(self, key: Hashable, df: pd.DataFrame, tf: str) -> Resampled:
+        if df.empty:
+            return resample(df, tf)
+
+        close = _column(df, "Close")
+        entry = self._data.get(key)
+
+        if entry is not None and self._appended(entry, df, close):
+            self._data.move_to_end(key)
+            if len(df) == entry.rows:
+                self.hits += 1
+                return entry.result
+            # Letzte (evtl. offene) Periode aus den Tagesbars ab ihrem ersten Tag neu bilden
+            self.updates += 1
+            tail = resample(df.loc[entry.result.first:], tf)
+            bars = pd.concat([entry.result.bars.iloc[:-1], tail.bars])
+            result = Resampled(bars, tail.first, tail.complete)
+        else:
+            self.misses += 1
+            result = resample(df, tf)
+
+        self._data[key] = _Entry(df.index[0], df.index[-1], len(df), close[-1], result)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = 0
+        self.updates = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+CACHE = ResampleCache(int(os.getenv("RESAMPLE_CACHE_SIZE", "1024")))
+
+
+# ============================================
+# Rückabbildung auf Tagesbars (ohne Look-Ahead)
+# ============================================
+def align(result: Resampled, values, daily_index: pd.Index, delay: int = 0) -> np.ndarray:
+    # Wert der letzten abgeschlossenen Periode, deren letzter Handelstag <= Tag ist;
+    # delay > 0 verschiebt zusätzlich um Tagesbars (Umsetzung erst am Folgetag)
+    values = np.asarray(values, dtype=np.float64)
+    available = result.bars.index.values
+    if not result.complete:
+        available = available[:-1]
+
+    days = pd.DatetimeIndex(daily_index).values
+    pos = np.searchsorted(available, days, side="right") - 1
+    if delay:
+        pos = np.r_[np.full(min(delay, len(pos)), -1), pos[:-delay]]
+
+    out = np.full(len(days), np.nan)
+    ok = pos >= 0
+    out[ok] = values[pos[ok]]
+    return out
+
+
+# ============================================
+# Zeitrahmen eines Tickers
+# ============================================
+class Timeframes:
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        ticker: Optional[str] = None,
+        cache: Optional[ResampleCache] = CACHE,
+        delay: int = 0,
+    ):
+        self.df = df
+        self.ticker = ticker
+        self.cache = cache if ticker is not None else None
+        self.delay = delay
+        self._results: Dict[str, Resampled] = {}
+
+    def resampled(self, tf: str) -> Resampled:
+        if tf not in self._results:
+            if self.cache is None:
+                self._results[tf] = resample(self.df, tf)
+            else:
+                self._results[tf] = self.cache.get((self.ticker, tf), self.df, tf)
+        return self._results[tf]
+
+    def bars(self, tf: str) -> pd.DataFrame:
+        return self.resampled(tf).bars
+
+    def indicators(self, tf: str) -> Indicators:
+        # Eigener Cache-Schlüssel pro Zeitrahmen, Datenstand aus den Periodenbars
+        key = f"{self.ticker}@{tf}" if self.ticker is not None else None
+        return Indicators(self.bars(tf), key)
+
+    def align(self, tf: str, values) -> np.ndarray:
+        return align(self.resampled(tf), values, self.df.index, self.delay)
+
+    def mask(self, tf: str, rule: str) -> np.ndarray:
+        # Regel-Ausdruck auf den Periodenbars; vor der ersten abgeschlossenen Periode False
+        bars = self.bars(tf)
+        key = f"{self.ticker}@{tf}" if self.ticker is not None else None
+        values = compile_rules({"filter": rule}).evaluate(FrameSource(bars, key), ["filter"])["filter"]
+        aligned = self.align(tf, values.astype(np.float64))
+        return np.nan_to_num(aligned, nan=0.0) > 0
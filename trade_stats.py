@@ -0,0 +1,309 @@
+# trade_stats.py
+#
+# Trade-Statistik für die ENTRY/EXIT-Liste des Backtests
+# - ENTRY- und EXIT-Zeilen als Array-Operationen paaren (keine Schleife über Zeilen)
+# - Kennzahlen pro Ticker und gesamt: Trefferquote, Profit-Faktor, Ø Gewinn/Verlust, Haltedauer,
+#   CAGR, max. Drawdown, Exposure
+# - Equity pro Ticker: Trades nacheinander verzinst (ein Ticker hat nie zwei offene Positionen),
+#   Gesamt: Kapital gleich auf alle Ticker mit Trades verteilt, Drawdown auf Basis geschlossener Trades
+# - Bootstrap-Konfidenzintervalle: alle Stichproben eines Batches als eine (B × n)-Indexmatrix
+# - Ergebnis als kompakter JSON-Bericht
+#
+# Beispiel:
+#   python trade_stats.py daily_backtest_20250101_120000.parquet
+
+import argparse
+import glob
+import json
+import math
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================
+# Parameter
+# ============================================
+BOOTSTRAP_SAMPLES = int(os.getenv("STATS_BOOTSTRAP", "2000"))
+BOOTSTRAP_SEED = 42
+CONFIDENCE = 0.95
+BATCH_ELEMENTS = 5_000_000      # max. Einträge einer Resampling-Matrix
+
+
+# ============================================
+# ENTRY/EXIT paaren
+# ============================================
+def _dates(s: pd.Series) -> pd.Series:
+    # format_rows schreibt "dd.mm.yyyy"; bereits geparste Datumswerte bleiben unverändert
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    return pd.to_datetime(s, format="%d.%m.%Y", errors="coerce")
+
+
+def pair_trades(rows: pd.DataFrame) -> pd.DataFrame:
+    # Stabil nach Ticker sortieren: pro Ticker bleibt die Reihenfolge ENTRY, EXIT, ENTRY, ...
+    order = np.argsort(rows["Ticker"].to_numpy(dtype=object), kind="stable")
+    ticker = rows["Ticker"].to_numpy(dtype=object)[order]
+    kind = rows["Type"].astype(str).to_numpy()[order]
+    date = _dates(rows["Date"]).to_numpy()[order]
+    price = rows["Price"].to_numpy(dtype=np.float64)[order]
+
+    # Jeder EXIT schließt den direkt davor stehenden ENTRY desselben Tickers
+    x = np.flatnonzero(np.char.startswith(kind.astype(str), "EXIT"))
+    x = x[x > 0]
+    e = x - 1
+    valid = (kind[e] == "ENTRY") & (ticker[e] == ticker[x])
+    e, x = e[valid], x[valid]
+
+    trades = pd.DataFrame({
+        "Ticker": ticker[x],
+        "Entry_Date": date[e],
+        "Exit_Date": date[x],
+        "Entry_Price": price[e],
+        "Exit_Price": price[x],
+        "Forced": kind[x] != "EXIT",
+    })
+    trades["Return_%"] = (trades["Exit_Price"] / trades["Entry_Price"] - 1) * 100
+    trades["Hold_Days"] = (trades["Exit_Date"] - trades["Entry_Date"]).dt.days
+    return trades.sort_values(["Ticker", "Exit_Date"], kind="stable").reset_index(drop=True)
+
+
+# ============================================
+# Kennzahlen
+# ============================================
+def _years(start: pd.Timestamp, end: pd.Timestamp) -> float:
+    return max((end - start).days / 365.25, 1e-9)
+
+
+def _cagr(total_return, years: float):
+    return (np.power(1 + total_return, 1 / years) - 1) * 100
+
+
+def ticker_metrics(trades: pd.DataFrame, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    if trades.empty:
+        return pd.DataFrame()
+    start = start or trades["Entry_Date"].min()
+    end = end or trades["Exit_Date"].max()
+    period_days = max((end - start).days, 1)
+
+    r = trades["Return_%"].to_numpy() / 100
+    tmp = pd.DataFrame({
+        "Ticker": trades["Ticker"].to_numpy(),
+        "r": r,
+        "win": r > 0,
+        "gain": np.where(r > 0, r, 0.0),
+        "loss": np.where(r < 0, -r, 0.0),
+        "log": np.log1p(r),
+        "hold": trades["Hold_Days"].to_numpy(),
+    })
+
+    # Equity nach jedem Trade und Drawdown gegen das bisherige Hoch (Start = 1)
+    g = tmp.groupby("Ticker", sort=True)
+    equity = np.exp(g["log"].cumsum().to_numpy())
+    peak = np.maximum(pd.Series(equity).groupby(tmp["Ticker"].to_numpy()).cummax().to_numpy(), 1.0)
+    tmp["drawdown"] = equity / peak - 1
+
+    out = g.agg(
+        trades=("r", "size"),
+        win_rate=("win", "mean"),
+        avg_return=("r", "mean"),
+        median_return=("r", "median"),
+        gains=("gain", "sum"),
+        losses=("loss", "sum"),
+        wins=("win", "sum"),
+        log_sum=("log", "sum"),
+        avg_hold_days=("hold", "mean"),
+        hold_sum=("hold", "sum"),
+        max_drawdown=("drawdown", "min"),
+    )
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = np.exp(out["log_sum"]) - 1
+        losers = out["trades"] - out["wins"]
+        return pd.DataFrame({
+            "trades": out["trades"],
+            "win_rate_%": out["win_rate"] * 100,
+            "avg_return_%": out["avg_return"] * 100,
+            "median_return_%": out["median_return"] * 100,
+            "avg_win_%": np.where(out["wins"] > 0, out["gains"] / out["wins"] * 100, np.nan),
+            "avg_loss_%": np.where(losers > 0, -out["losses"] / losers * 100, np.nan),
+            "profit_factor": np.where(out["losses"] > 0, out["gains"] / out["losses"], np.nan),
+            "total_return_%": total * 100,
+            "cagr_%": _cagr(total, _years(start, end)),
+            "max_drawdown_%": out["max_drawdown"] * 100,
+            "exposure_%": out["hold_sum"] / period_days * 100,
+            "avg_hold_days": out["avg_hold_days"],
+        }, index=out.index)
+
+
+def equity_curve(trades: pd.DataFrame) -> pd.Series:
+    # Gleichgewichtet: jeder Ticker mit Trades bekommt 1/N des Kapitals, flach = Cash
+    log_eq = trades["Return_%"].div(100).pipe(np.log1p).groupby(trades["Ticker"]).cumsum()
+    wide = pd.DataFrame({
+        "Exit_Date": trades["Exit_Date"],
+        "Ticker": trades["Ticker"],
+        "equity": np.exp(log_eq),
+    }).pivot_table(index="Exit_Date", columns="Ticker", values="equity", aggfunc="last")
+
+    curve = wide.ffill().fillna(1.0).mean(axis=1)
+    start = trades["Entry_Date"].min()
+    return pd.concat([pd.Series([1.0], index=[start]), curve])
+
+
+def aggregate_metrics(trades: pd.DataFrame, per_ticker: pd.DataFrame) -> Dict[str, float]:
+    if trades.empty:
+        return {"trades": 0}
+    start, end = trades["Entry_Date"].min(), trades["Exit_Date"].max()
+
+    r = trades["Return_%"].to_numpy()
+    gains, losses = r[r > 0].sum(), -r[r < 0].sum()
+    curve = equity_curve(trades)
+    drawdown = curve / curve.cummax() - 1
+    total = float(curve.iloc[-1] - 1)
+
+    return {
+        "start": start.date().isoformat(),
+        "end": end.date().isoformat(),
+        "tickers": int(len(per_ticker)),
+        "trades": int(r.size),
+        "forced_exits": int(trades["Forced"].sum()),
+        "win_rate_%": float((r > 0).mean() * 100),
+        "avg_return_%": float(r.mean()),
+        "median_return_%": float(np.median(r)),
+        "avg_win_%": float(r[r > 0].mean()) if (r > 0).any() else np.nan,
+        "avg_loss_%": float(r[r < 0].mean()) if (r < 0).any() else np.nan,
+        "profit_factor": float(gains / losses) if losses > 0 else np.nan,
+        "avg_hold_days": float(trades["Hold_Days"].mean()),
+        "total_return_%": total * 100,
+        "cagr_%": float(_cagr(total, _years(start, end))),
+        "max_drawdown_%": float(drawdown.min() * 100),
+        "exposure_%": float(per_ticker["exposure_%"].mean()),
+    }
+
+
+# ============================================
+# Bootstrap (gebündeltes Resampling)
+# ============================================
+def _sample_stats(samples: np.ndarray) -> Dict[str, np.ndarray]:
+    gains = np.where(samples > 0, samples, 0.0).sum(axis=1)
+    losses = np.where(samples < 0, -samples, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pf = np.where(losses > 0, gains / losses, np.nan)
+    return {
+        "avg_return_%": samples.mean(axis=1),
+        "median_return_%": np.median(samples, axis=1),
+        "win_rate_%": (samples > 0).mean(axis=1) * 100,
+        "profit_factor": pf,
+    }
+
+
+def bootstrap_ci(
+    returns: np.ndarray,
+    samples: int = BOOTSTRAP_SAMPLES,
+    confidence: float = CONFIDENCE,
+    seed: int = BOOTSTRAP_SEED,
+) -> Dict[str, Dict[str, float]]:
+
+    returns = np.asarray(returns, dtype=np.float64)
+    n = returns.size
+    if n < 2 or samples <= 0:
+        return {}
+
+    rng = np.random.default_rng(seed)
+    batch = max(1, BATCH_ELEMENTS // n)
+
+    parts = []
+    for lo in range(0, samples, batch):
+        idx = rng.integers(0, n, size=(min(batch, samples - lo), n))
+        parts.append(_sample_stats(returns[idx]))
+
+    point = {k: float(v[0]) for k, v in _sample_stats(returns[None, :]).items()}
+    alpha = (1 - confidence) / 2 * 100
+
+    out = {}
+    for k in point:
+        dist = np.concatenate([p[k] for p in parts])
+        out[k] = {
+            "value": point[k],
+            "low": float(np.nanpercentile(dist, alpha)),
+            "high": float(np.nanpercentile(dist, 100 - alpha)),
+        }
+    return out
+
+
+# ============================================
+# Bericht
+# ============================================
+def _clean(x):
+    # JSON ohne NaN/Inf, Zahlen gerundet
+    if isinstance(x, dict):
+        return {k: _clean(v) for k, v in x.items()}
+    if isinstance(x, list):
+        return [_clean(v) for v in x]
+    if isinstance(x, (float, np.floating)):
+        return None if not math.isfinite(x) else round(float(x), 4)
+    if isinstance(x, np.integer):
+        return int(x)
+    return x
+
+
+def build_report(rows: pd.DataFrame, source: str = "", samples: int = BOOTSTRAP_SAMPLES) -> dict:
+    trades = pair_trades(rows)
+    per_ticker = ticker_metrics(trades)
+
+    report = {
+        "source": os.path.basename(source),
+        "aggregate": aggregate_metrics(trades, per_ticker),
+        "bootstrap": {"samples": samples, "confidence": CONFIDENCE, **bootstrap_ci(trades["Return_%"].to_numpy(), samples)},
+        "per_ticker": per_ticker.reset_index().to_dict(orient="records") if not per_ticker.empty else [],
+    }
+    return _clean(report)
+
+
+def write_report(report: dict, path: str) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1, ensure_ascii=False)
+    return path
+
+
+def summary(report: dict) -> str:
+    lines = ["===== TRADE-STATISTIK ====="]
+    for k, v in report["aggregate"].items():
+        lines.append(f"{k:18s} {v}")
+    for k, ci in report["bootstrap"].items():
+        if isinstance(ci, dict):
+            lines.append(f"{k:18s} {ci['value']}  [{ci['low']} .. {ci['high']}]")
+    return "\n".join(lines)
+
+
+# ============================================
+# CLI
+# ============================================
+def latest_backtest() -> Optional[str]:
+    files = glob.glob("daily_backtest_*.parquet") + glob.glob("daily_backtest_*.csv")
+    return max(files, key=os.path.getmtime) if files else None
+
+
+def main(argv=None):
+    from output import read_table
+
+    parser = argparse.ArgumentParser(description="Trade-Statistik für die Backtest-Ausgabe")
+    parser.add_argument("path", nargs="?", default=None, help="Standard: neueste daily_backtest_*-Datei")
+    parser.add_argument("--bootstrap", type=int, default=BOOTSTRAP_SAMPLES)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    path = args.path or latest_backtest()
+    if not path:
+        parser.error("Keine Backtest-Datei gefunden")
+
+    report = build_report(read_table(path), path, args.bootstrap)
+    out = args.output or f"trade_stats_{os.path.splitext(os.path.basename(path))[0]}.json"
+    print(summary(report))
+    print(f"\nBericht gespeichert in: {write_report(report, out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,28 +2,48 @@
 #
 # FINALER Trend-Screener für GitHub Actions
 # - Start ab 2024-01-01 (schnell)
-# - Immer stabile XLSX-Ausgabe
+# - Historie als Parquet/CSV, XLSX nur für heute + letzte 30
+# - Signale in SQLite (signal_db.py), inkrementell: pro Ticker nur Bars nach dem zuletzt
+#   ausgewerteten Tag (plus Vorlauf für die Fenster); komplett neu nur bei geänderten Regeln /
+#   Startdatum oder neu adjustierten Kursen; gestern / 12 Monate / letzte 30 sind indizierte Abfragen
 # - flatten_columns() behebt MultiIndex
 # - normalize_columns() behebt Spalten-Namenskonflikte
 # - Signale von gestern
 # - Signale der letzten 12 Monate
 # - Letzte 30 Signale
 # - Fehlerresistent gegen YFinance & Pandas
+# - Streaming: Universum blockweise laden, Signale sofort schreiben (pipeline.py)
+# - Signalregeln deklarativ (rules.py), eigene Screens per TREND_RULES_FILE
+# - Relative Stärke gegen ^NDX (ranking.py): rs_score an jedem Signal, Top-k pro Tag
+#   als Strategie "rs_top" in der Datenbank, Sicht der aktuellen Top-k
 
 import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 import os
+import numpy as np
 import pandas as pd
-import yfinance as yf
+
+from instrumentation import start_run, timed
+from panel import TREND_RULES_FILE, Panel, compute_signals_panel
+from output import write_table, write_view
+from pipeline import STREAM_CHUNK, chunked, stream_prices
+from price_store import ADJUST_TOLERANCE, default_store
+from ranking import RANK_FILL_DAYS, RANK_TOP_K, load_benchmark, rank_universe
+from rules import TREND_RULES, FrameSource, load_ruleset
+from health import TickerHealth
+from signal_db import SignalDB, config_key
+from universe import load_universe as load_named_universe
 
 
 # ============================================
 # Speicherpfade
 # ============================================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-OUTPUT_HISTORY = os.path.join(BASE_DIR, "signals_history_12m.xlsx")
-OUTPUT_TODAY = os.path.join(BASE_DIR, "signals_today.xlsx")
-OUTPUT_LATEST30 = os.path.join(BASE_DIR, "signals_latest30.xlsx")
+# Ohne Endung – Format über OUTPUT_FORMAT (output.py), Excel nur für die kleinen Sichten
+OUTPUT_HISTORY = os.path.join(BASE_DIR, "signals_history_12m")
+OUTPUT_TODAY = os.path.join(BASE_DIR, "signals_today")
+OUTPUT_LATEST30 = os.path.join(BASE_DIR, "signals_latest30")
+OUTPUT_LEADERS = os.path.join(BASE_DIR, "rs_leaders")
 
 # Geschwindigkeit
 BACKTEST_START = "2024-01-01"
@@ -32,21 +52,22 @@ TODAY = datetime.date.today()
 YESTERDAY = TODAY - datetime.timedelta(days=1)
 HISTORY_12M = TODAY - datetime.timedelta(days=365)
 
+# Signal-Historie in signals.db (signal_db.py), Strategie-Schlüssel "trend"
+STRATEGY = "trend"
+SIGNAL_COLUMNS = ["close", "volume", "ticker", "date", "ret_3m", "ret_6m", "ret_12m", "rs_score"]
+# Vorlauf für ret_12m der Signalzeilen (compute_signals_panel), zusätzlich zu den Regeln
+EXTRA_LOOKBACK = 252
+
+# Top-k der relativen Stärke pro Tag, Strategie-Schlüssel "rs_top"
+RANK_STRATEGY = "rs_top"
+
 
 # ============================================
 # UNIVERSUM
 # ============================================
-def load_universe() -> List[str]:
-    return [
-        "AAPL","MSFT","NVDA","AMZN","META","GOOGL","GOOG","TSLA","AVGO","PEP",
-        "COST","ADBE","CSCO","NFLX","AMD","INTC","AMGN","QCOM","TXN","SBUX",
-        "HON","ADI","AMAT","BKNG","MDLZ","REGN","ISRG","LRCX","MU","GILD",
-        "PANW","VRTX","KLAC","ADP","MAR","ABNB","CRWD","MRVL","CHTR","IDXX",
-        "CDNS","MELI","KDP","SNPS","FTNT","AZN","ORLY","PCAR","MNST","ADSK",
-        "CTAS","PAYX","WDAY","NXPI","ROST","TEAM","ODFL","EXC","LULU","AEP",
-        "XEL","KHC","CSX","MRNA","BIIB","EA","DLTR","LCID","VRSK","ROKU",
-        "ZM","DDOG","ZS","OKTA","MDB","SNOW","HOOD","BE"
-    ]
+def load_universe(health: Optional[TickerHealth] = None) -> List[str]:
+    # universes/trend_watchlist.csv, UNIVERSES=... überschreibt
+    return load_named_universe("trend_watchlist", health)
 
 
 # ============================================
@@ -69,44 +90,29 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
 
 
 # ============================================
-# ensure_series – verhindert mehrdimensionale Masken
+# DATEN LADEN
 # ============================================
-def ensure_series(x, df):
-    if x is None:
-        return pd.Series(False, index=df.index)
+def download_data(tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    store = default_store()
+    results = store.get_many(tickers, BACKTEST_START, TODAY + datetime.timedelta(days=1))
+    return prepare_data(results)
 
-    if isinstance(x, pd.DataFrame):
-        if x.shape[1] != 1:  # mehrspaltige Maske = ungültig
-            return pd.Series(False, index=df.index)
-        x = x.iloc[:, 0]
 
-    return x.reindex(df.index).fillna(False).astype(bool)
+def prepare_data(results) -> Dict[str, pd.DataFrame]:
+    data = {}
+    for t, res in results.items():
+        if res.status == "error":
+            print(f"Fehler beim Laden von {t}: {res.error}")
+            continue
 
+        df = res.data
+        if df.empty:
+            print(f"Keine Daten für {t}")
+            continue
 
-# ============================================
-# DATEN LADEN
-# ============================================
-def download_data(tickers: List[str]) -> Dict[str, pd.DataFrame]:
-    data = {}
-    for t in tickers:
-        try:
-            df = yf.download(
-                t,
-                start=BACKTEST_START,
-                end=TODAY + datetime.timedelta(days=1),
-                auto_adjust=True,
-                progress=False,
-            )
-
-            if df.empty:
-                continue
-
-            df = df[["Close", "Volume"]].copy()
-            df.dropna(inplace=True)
-            data[t] = df
-
-        except Exception as e:
-            print(f"Fehler beim Laden von {t}: {e}")
+        df = df[["Close", "Volume"]].copy()
+        df.dropna(inplace=True)
+        data[t] = df
 
     return data
 
@@ -115,47 +121,12 @@ def download_data(tickers: List[str]) -> Dict[str, pd.DataFrame]:
 # SIGNALLOGIK
 # ============================================
 def compute_signals(ticker: str, df: pd.DataFrame) -> pd.DataFrame:
+    # Gleiche Regeln wie das Panel (rules.TREND_RULES), Indikatoren über den gemeinsamen Cache
 
     try:
-        close = df["Close"]
-        volume = df["Volume"]
-
-        sma50 = close.rolling(50).mean()
-        sma150 = close.rolling(150).mean()
-        sma200 = close.rolling(200).mean()
-
-        sma50_shift20 = sma50.shift(20)
-        sma200_shift20 = sma200.shift(20)
-
-        # Momentum
-        ret_3m = close.pct_change(63)
-        ret_6m = close.pct_change(126)
-        ret_12m = close.pct_change(252)
-
-        high_6m = close.rolling(126).max()
-        vol_sma50 = volume.rolling(50).mean()
-
-        momentum_cond = (ret_3m > 0.15) & (ret_6m > 0.30) & (ret_12m > 0.40)
-
-        trend_cond = (
-            (close > sma50) &
-            (sma50 > sma150) &
-            (sma150 > sma200) &
-            (sma50 > sma50_shift20) &
-            (sma200 > sma200_shift20)
-        )
-
-        breakout_cond = (close >= 0.98 * high_6m) & (volume >= 1.5 * vol_sma50)
-
-        quality_cond = (close >= 3.0) & (vol_sma50 >= 100_000)
-
-        # Masken normalisieren
-        momentum_cond = ensure_series(momentum_cond, df)
-        trend_cond = ensure_series(trend_cond, df)
-        breakout_cond = ensure_series(breakout_cond, df)
-        quality_cond = ensure_series(quality_cond, df)
-
-        signal_mask = momentum_cond & trend_cond & breakout_cond & quality_cond
+        source = FrameSource(df, ticker)
+        rules = load_ruleset(TREND_RULES_FILE, TREND_RULES)
+        signal_mask = rules.evaluate(source, ["signal"])["signal"]
 
         if not signal_mask.any():
             return pd.DataFrame()
@@ -165,9 +136,9 @@ def compute_signals(ticker: str, df: pd.DataFrame) -> pd.DataFrame:
         signals["ticker"] = ticker
         signals["date"] = signals.index
 
-        signals["ret_3m"] = ret_3m[signal_mask]
-        signals["ret_6m"] = ret_6m[signal_mask]
-        signals["ret_12m"] = ret_12m[signal_mask]
+        signals["ret_3m"] = source.indicator("ret", (63,), "close")[signal_mask]
+        signals["ret_6m"] = source.indicator("ret", (126,), "close")[signal_mask]
+        signals["ret_12m"] = source.indicator("ret", (252,), "close")[signal_mask]
 
         return signals.reset_index(drop=True)
 
@@ -177,49 +148,184 @@ def compute_signals(ticker: str, df: pd.DataFrame) -> pd.DataFrame:
 
 
 # ============================================
-# HAUPTPROGRAMM
+# INKREMENTELL: nur neue Bars auswerten
 # ============================================
-def run_trendscreener():
+def plan_block(data: Dict[str, pd.DataFrame], state: Dict[str, dict], config: str) -> Dict[str, Optional[pd.Timestamp]]:
+    # Pro Ticker der zuletzt ausgewertete Bar, oder None = ganzes Fenster neu berechnen
+    # (noch nie ausgewertet, andere Regeln / anderes Startdatum, Kurse neu adjustiert)
+    plan = {}
+    for t, df in data.items():
+        s = state.get(t)
+        through = None
+        if s is not None and s["config"] == config and s["close"]:
+            close = df["Close"].get(s["through"])
+            if close is not None and not np.isnan(close) and abs(close / s["close"] - 1.0) <= ADJUST_TOLERANCE:
+                through = s["through"]
+        plan[t] = through
+    return plan
+
+
+def signal_frames(data: Dict[str, pd.DataFrame], plan: Dict[str, Optional[pd.Timestamp]], lookback: Optional[int]) -> Dict[str, pd.DataFrame]:
+    # Inkrementelle Ticker nur ab `lookback` Bars vor dem ersten neuen Bar; ohne neue Bars gar nicht
+    out = {}
+    for t, df in data.items():
+        through = plan.get(t)
+        if through is None:
+            out[t] = df
+            continue
+        first_new = int(df.index.searchsorted(through, side="right"))
+        if first_new < len(df):
+            out[t] = df if lookback is None else df.iloc[max(0, first_new - lookback):]
+    return out
+
+
+def new_signals(signals: pd.DataFrame, plan: Dict[str, Optional[pd.Timestamp]]) -> pd.DataFrame:
+    # Bei inkrementellen Tickern nur Signale nach dem zuletzt ausgewerteten Bar
+    if signals.empty:
+        return signals
+    through = pd.to_datetime(signals["ticker"].map(plan))
+    keep = through.isna() | (signals["date"] > through)
+    return signals[keep].reset_index(drop=True)
 
-    tickers = load_universe()
-    data = download_data(tickers)
 
-    all_signals = []
-    for ticker, df in data.items():
-        sig = compute_signals(ticker, df)
-        if isinstance(sig, pd.DataFrame) and not sig.empty:
-            all_signals.append(sig)
-
-    # Komplettes Signal-Set
-    if all_signals:
-        history_df = pd.concat(all_signals, ignore_index=True)
+# ============================================
+# STREAMING: Block laden → Panel → Signale
+# ============================================
+def stream_signals(
+    tickers: List[str],
+    chunk_size: int = STREAM_CHUNK,
+    health: Optional[TickerHealth] = None,
+    prices=None,
+    state=None,
+    lookback: Optional[int] = None,
+):
+    # Signale hängen nur vom eigenen Ticker ab -> blockweise identisch zum Gesamt-Panel;
+    # state(data) -> plan_block(...) für inkrementelle Auswertung (None = alles neu);
+    # Schlusskurse des Blocks (volle Historie) gehen mit zurück für das Ranking über das
+    # ganze Universum; prices von außen (runner.py) ersetzen den Download
+    if prices is None:
+        end = TODAY + datetime.timedelta(days=1)
+        source = stream_prices(default_store(), tickers, BACKTEST_START, end, chunk_size)
     else:
-        history_df = pd.DataFrame(columns=["date", "ticker", "close"])
+        source = ({t: prices[t] for t in block} for block in chunked(tickers, chunk_size))
 
-    # ----------------------------
-    # Signale der letzten 12 Monate
-    # ----------------------------
-    history_12m = history_df[history_df["date"] >= pd.Timestamp(HISTORY_12M)]
-    history_12m = normalize_columns(flatten_columns(history_12m))
+    for results in source:
+        if health is not None:
+            health.record(results)
+        data = prepare_data(results)
+        del results
 
-    # ----------------------------
-    # Signale von gestern
-    # ----------------------------
-    signals_yesterday = history_df[history_df["date"] == pd.Timestamp(YESTERDAY)]
-    signals_yesterday = normalize_columns(flatten_columns(signals_yesterday))
+        plan = state(data) if state is not None else {t: None for t in data}
+        with timed("signals") as st:
+            frames = signal_frames(data, plan, lookback)
+            signals = pd.DataFrame()
+            if frames:
+                panel = Panel.from_frames(frames, ["Close", "Volume"])
+                signals = new_signals(compute_signals_panel(panel), plan)
+            st.rows = len(signals)
+        yield data, plan, signals, Panel.from_frames(data, ["Close"]).close
 
-    # ----------------------------
-    # Letzte 30 Signale
-    # ----------------------------
-    latest30 = history_12m.sort_values("date").tail(30)
-    latest30 = normalize_columns(flatten_columns(latest30))
+
+# ============================================
+# HAUPTPROGRAMM
+# ============================================
+def view(rows: pd.DataFrame, ranking=None) -> pd.DataFrame:
+    # Datenbankzeilen -> bisheriges Spaltenformat der Sichten, rs_score aus dem aktuellen Ranking
+    if rows.empty:
+        return pd.DataFrame(columns=SIGNAL_COLUMNS)
+    if ranking is not None:
+        rows = rows.assign(rs_score=ranking.lookup(rows["date"], rows["ticker"]))
+    return rows[[c for c in SIGNAL_COLUMNS if c in rows.columns]].reset_index(drop=True)
+
+
+def run_trendscreener(tickers: Optional[List[str]] = None, prices=None):
+    # tickers/prices von außen (runner.py): kein eigener Download, Ticker-Health pflegt der Aufrufer
+
+    report = start_run("trendscreener")
+
+    health = None
+    if prices is None:
+        health = TickerHealth()
+        health.reprobe(default_store().fetcher)
+    with report.stage("universe") as st:
+        if tickers is None:
+            tickers = load_universe(health)
+        st.rows = len(tickers)
+
+    loaded = 0
+    inserted = 0
+    closes = []
+
+    # Geänderte Regeln (TREND_RULES_FILE) oder ein anderes Startdatum machen alle gespeicherten
+    # Signale ungültig; Vorlauf = längstes Fenster der Regeln bzw. der Zusatzspalten
+    rules = load_ruleset(TREND_RULES_FILE, TREND_RULES)
+    config = config_key(rules.rules, BACKTEST_START)
+    lookback = rules.lookback()
+    if lookback is not None:
+        lookback = max(lookback, EXTRA_LOOKBACK)
+
+    # Signale blockweise: inkrementelle Ticker per insert(), komplett neu berechnete ersetzen
+    # ihr Fenster ab BACKTEST_START per replace()
+    with report.profiled("signals"), SignalDB() as db:
+        def state(data):
+            return plan_block(data, db.state(STRATEGY, data.keys()), config)
+
+        for data, plan, signals, close in stream_signals(tickers, health=health, prices=prices, state=state, lookback=lookback):
+            loaded += len(data)
+            closes.append(close)
+            if not signals.empty:
+                signals = normalize_columns(flatten_columns(signals))
+
+            full = [t for t, through in plan.items() if through is None]
+            with timed("db_insert", rows=len(signals)) as st:
+                if signals.empty:
+                    rebuilt, incremental = signals, signals
+                else:
+                    is_full = signals["ticker"].isin(full)
+                    rebuilt, incremental = signals[is_full], signals[~is_full]
+                added = db.replace(rebuilt, STRATEGY, BACKTEST_START, full) if full else 0
+                added += db.insert(incremental, STRATEGY)
+                db.set_state(STRATEGY, {t: (df.index[-1], df["Close"].iloc[-1]) for t, df in data.items()}, config)
+                st.rows = added
+            inserted += added
+
+            print(f"Block fertig: {loaded}/{len(tickers)} Ticker ({len(full)} neu berechnet), {added} neue Signale")
+
+        if health is not None:
+            health.finish()
+            report.info["ticker_health"] = health.summary()
+
+        # ----------------------------
+        # Relative Stärke: Ränge brauchen das ganze Universum pro Datum (nur Schlusskurse)
+        # ----------------------------
+        with report.stage("ranking") as st:
+            # Blöcke auf dem gemeinsamen Kalender; Feiertage einer Börse wie im Daily-Screener auffüllen
+            close = pd.concat(closes, axis=1).ffill(limit=RANK_FILL_DAYS) if closes else pd.DataFrame()
+            del closes
+            end = TODAY + datetime.timedelta(days=1)
+            ranking = rank_universe(close, load_benchmark(prices, BACKTEST_START, end))
+            leaders = ranking.leaders(RANK_TOP_K)
+            st.rows = db.replace(leaders, RANK_STRATEGY, BACKTEST_START)
+            leaders_today = ranking.latest(RANK_TOP_K)
+
+        # ----------------------------
+        # Sichten als indizierte Abfragen (gestern, 12 Monate, letzte 30)
+        # ----------------------------
+        with report.stage("query") as st:
+            history_12m = view(db.since(STRATEGY, HISTORY_12M, tickers), ranking)
+            signals_yesterday = view(db.on(STRATEGY, YESTERDAY, tickers), ranking)
+            signals_yesterday = signals_yesterday.sort_values("rs_score", ascending=False, kind="stable").reset_index(drop=True)
+            latest30 = view(db.latest(STRATEGY, 30, tickers), ranking)
+            st.rows = len(history_12m)
 
     # ----------------------------
-    # Excel-Dateien speichern
+    # Exporte (Primärformat, Excel nur für die kleinen Sichten)
     # ----------------------------
-    history_12m.to_excel(OUTPUT_HISTORY, index=False)
-    signals_yesterday.to_excel(OUTPUT_TODAY, index=False)
-    latest30.to_excel(OUTPUT_LATEST30, index=False)
+    with report.stage("views", rows=len(signals_yesterday) + len(latest30) + len(leaders_today)):
+        files = [write_table(history_12m, OUTPUT_HISTORY)]
+        files += write_view(signals_yesterday, OUTPUT_TODAY)
+        files += write_view(latest30, OUTPUT_LATEST30)
+        files += write_view(leaders_today, OUTPUT_LEADERS)
 
     # ----------------------------
     # LOG-AUSGABE
@@ -229,16 +335,25 @@ def run_trendscreener():
     print(latest30[cols].to_string(index=False))
 
     print("\n===== SIGNAL VON GESTERN =====")
-    cols2 = [c for c in ["date", "ticker", "close"] if c in signals_yesterday.columns]
+    cols2 = [c for c in ["date", "ticker", "close", "rs_score"] if c in signals_yesterday.columns]
     if signals_yesterday.empty:
         print("Keine neuen Signale gestern.")
     else:
         print(signals_yesterday[cols2].to_string(index=False))
 
+    print(f"\n===== RELATIVE STÄRKE TOP {RANK_TOP_K} (vs. ^NDX) =====")
+    if leaders_today.empty:
+        print("Kein Ranking (zu wenig Historie).")
+    else:
+        print(leaders_today[["date", "rs_rank", "ticker", "rs_score", "rs_3m", "rs_12m"]].to_string(index=False))
+
     print("\nDateien erstellt:")
-    print(f" → {OUTPUT_HISTORY}")
-    print(f" → {OUTPUT_TODAY}")
-    print(f" → {OUTPUT_LATEST30}")
+    for path in files:
+        print(f" → {path}")
+
+    report.info.update({"tickers": len(tickers), "loaded": loaded, "signals_new": inserted, "signals_12m": len(history_12m), "rs_leaders": len(leaders_today)})
+    print(report.summary())
+    print("Run-Report:", report.write())
 
 
 if __name__ == "__main__":
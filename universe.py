@@ -0,0 +1,89 @@
+# universe.py
+#
+# Universums-Registry
+# - Benannte Universen als CSV-Dateien in universes/ (Spalte "Ticker"), z.B. nasdaq100, mdax, sdax
+# - Duplikate werden entfernt (erste Nennung zählt), mehrere Universen lassen sich kombinieren
+# - universes/delisted.csv: bekannte tote Symbole, werden nie angefragt
+# - Ticker ohne Daten überspringt der Health-Cache (health.py)
+# - UNIVERSES=nasdaq100,mdax überschreibt das Standard-Universum eines Laufs
+
+import csv
+import os
+from typing import Iterable, List, Union
+
+
+# ============================================
+# Konfiguration
+# ============================================
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+UNIVERSE_DIR = os.getenv("UNIVERSE_DIR", os.path.join(BASE_DIR, "universes"))
+DELISTED = "delisted"
+
+
+# ============================================
+# Dateien lesen
+# ============================================
+def dedupe(tickers: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(t for t in tickers if t))
+
+
+def read_universe_file(path: str) -> List[str]:
+    # utf-8-sig: mdax.csv / sdax.csv haben ein BOM; nur die erste Spalte zählt
+    tickers = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            t = row[0].strip()
+            if not t or t.startswith("#") or t.lower() == "ticker":
+                continue
+            tickers.append(t)
+    return dedupe(tickers)
+
+
+def available(directory: str = UNIVERSE_DIR) -> List[str]:
+    return sorted(
+        os.path.splitext(f)[0]
+        for f in os.listdir(directory)
+        if f.endswith(".csv") and os.path.splitext(f)[0] != DELISTED
+    )
+
+
+def load(name: str, directory: str = UNIVERSE_DIR) -> List[str]:
+    path = os.path.join(directory, f"{name}.csv")
+    if not os.path.exists(path):
+        raise KeyError(f"Unbekanntes Universum: {name} (verfügbar: {', '.join(available(directory))})")
+    return read_universe_file(path)
+
+
+def delisted(directory: str = UNIVERSE_DIR) -> List[str]:
+    path = os.path.join(directory, f"{DELISTED}.csv")
+    return read_universe_file(path) if os.path.exists(path) else []
+
+
+# ============================================
+# Universum eines Laufs
+# ============================================
+def names_for_run(default: Union[str, List[str]]) -> List[str]:
+    names = os.getenv("UNIVERSES") or default
+    if isinstance(names, str):
+        names = names.split(",")
+    return [n.strip() for n in names if n.strip()]
+
+
+def load_universe(
+    default: Union[str, List[str]],
+    health=None,
+    directory: str = UNIVERSE_DIR,
+) -> List[str]:
+
+    names = names_for_run(default)
+    tickers = dedupe(t for name in names for t in load(name, directory))
+
+    dead = set(delisted(directory))
+    skipped = [t for t in tickers if t in dead or (health is not None and health.is_skipped(t))]
+    if skipped:
+        print(f"Übersprungen (delisted / ohne Daten): {len(skipped)} – {', '.join(skipped)}")
+
+    skipped = set(skipped)
+    return [t for t in tickers if t not in skipped]
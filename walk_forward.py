@@ -0,0 +1,264 @@
+# walk_forward.py
+#
+# Walk-Forward-Auswertung für den Week→Day-Backtest
+# - Historie in rollierende In-Sample/Out-of-Sample-Fenster zerlegen (oder verankert: In-Sample ab Start)
+# - Kurse und Indikatoren einmal über die ganze Historie laden und berechnen,
+#   jedes Fenster arbeitet nur auf Ausschnitten (Views) derselben Arrays
+# - Entry-Masken einmal pro Entry-Parametersatz und Prozess, Fenster nur über start_idx / Länge begrenzt
+# - Pro Fenster: beste Kombination im In-Sample (nach Kennzahl), dann Out-of-Sample mit dieser Kombination;
+#   ohne Grid sind das die Regeln aus run_strategy
+# - Zu Fensterende offene Positionen werden zum letzten Schlusskurs des Fensters bewertet
+# - Fenster parallel in Worker-Prozessen (Arrays per Shared Memory wie in sweep.py)
+#
+# Beispiele:
+#   python walk_forward.py --train-months 36 --test-months 12
+#   python walk_forward.py --anchored --adx-min 15,20,25 --tier1 30,50
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from strategy_engine import entry_mask, resolve_trades
+from sweep import DEFAULTS, ENTRY_PARAMS, EXIT_PARAMS, _values, attach_views, expand_grid, pack_arrays, trade_metrics
+
+
+# ============================================
+# Parameter
+# ============================================
+TRAIN_MONTHS = 36
+TEST_MONTHS = 12
+
+timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+OUTPUT_FILE = f"walk_forward_{timestamp}"    # ohne Endung, Format über output.py
+
+
+# ============================================
+# Fenster
+# ============================================
+@dataclass
+class Fold:
+    fold: int
+    train_start: pd.Timestamp
+    train_end: pd.Timestamp     # exklusiv = test_start
+    test_end: pd.Timestamp      # exklusiv
+
+
+def make_folds(
+    start,
+    end,
+    train_months: int = TRAIN_MONTHS,
+    test_months: int = TEST_MONTHS,
+    step_months: Optional[int] = None,
+    anchored: bool = False,
+) -> List[Fold]:
+
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    step = step_months or test_months
+
+    folds = []
+    k = 0
+    while True:
+        train_end = start + pd.DateOffset(months=k * step + train_months)
+        if train_end >= end:
+            break
+        train_start = start if anchored else start + pd.DateOffset(months=k * step)
+        test_end = min(train_end + pd.DateOffset(months=test_months), end)
+        folds.append(Fold(k + 1, train_start, train_end, test_end))
+        if test_end >= end:
+            break
+        k += 1
+    return folds
+
+
+def _day(ts) -> int:
+    return int(np.datetime64(pd.Timestamp(ts), "D").astype(np.int64))
+
+
+# ============================================
+# Worker: Arrays einmal pro Prozess anhängen, Masken pro Entry-Parametersatz cachen
+# ============================================
+_WORKER: Dict[str, object] = {}
+
+
+def _init(views: Dict[str, Dict[str, np.ndarray]]) -> None:
+    _WORKER.update({"views": views, "masks": {}})
+
+
+def _attach(shm_name: str, layout: dict) -> None:
+    shm, views = attach_views(shm_name, layout)
+    _init(views)
+    _WORKER["shm"] = shm
+
+
+def _masks(entry_params: dict) -> Dict[str, np.ndarray]:
+    # Entry-Maske über die ganze Historie; Fenster begrenzen nur start_idx und Länge
+    key = tuple(entry_params[k] for k in ENTRY_PARAMS)
+    cache = _WORKER["masks"]
+    if key not in cache:
+        cache[key] = {t: entry_mask(a, 0, **entry_params) for t, a in _WORKER["views"].items()}
+    return cache[key]
+
+
+def evaluate_window(lo_day: int, hi_day: int, entry_params: dict, exit_params: dict) -> Tuple[np.ndarray, np.ndarray, int]:
+    masks = _masks(entry_params)
+    returns, holds = [], []
+    open_trades = 0
+
+    for t, a in _WORKER["views"].items():
+        days = a["days"]
+        lo = int(np.searchsorted(days, lo_day))
+        hi = int(np.searchsorted(days, hi_day))
+        if hi - lo < 2:
+            continue
+
+        # Views bis Fensterende: keine Kopie, kein Blick über das Fenster hinaus
+        view = {f: x[:hi] for f, x in a.items()}
+        entries, exits = resolve_trades(view, masks[t][:hi], lo, **exit_params)
+        if not entries.size:
+            continue
+
+        still_open = exits < 0
+        open_trades += int(still_open.sum())
+        exits = np.where(still_open, hi - 1, exits)
+
+        close = view["close"]
+        returns.append((close[exits] / close[entries] - 1) * 100)
+        holds.append(view["days"][exits] - view["days"][entries])
+
+    return (
+        np.concatenate(returns) if returns else np.empty(0),
+        np.concatenate(holds) if holds else np.empty(0),
+        open_trades,
+    )
+
+
+def _rank_value(row: dict, rank_by: str) -> float:
+    v = row.get(rank_by, np.nan)
+    return -np.inf if v is None or np.isnan(v) else v
+
+
+def _evaluate_fold(fold: Fold, groups: List[Tuple[dict, List[dict]]], rank_by: str) -> dict:
+    train = (_day(fold.train_start), _day(fold.train_end))
+    test = (_day(fold.train_end), _day(fold.test_end))
+
+    # In-Sample: alle Kombinationen, beste nach rank_by
+    best = None
+    for entry_params, exit_grid in groups:
+        for exit_params in exit_grid:
+            returns, holds, open_trades = evaluate_window(*train, entry_params, exit_params)
+            row = trade_metrics(returns, holds, open_trades, {**entry_params, **exit_params})
+            if best is None or _rank_value(row, rank_by) > _rank_value(best[0], rank_by):
+                best = (row, entry_params, exit_params)
+
+    is_row, entry_params, exit_params = best
+    returns, holds, open_trades = evaluate_window(*test, entry_params, exit_params)
+    oos_row = trade_metrics(returns, holds, open_trades, {**entry_params, **exit_params})
+
+    info = asdict(fold)
+    return {
+        "rows": [
+            {**info, "segment": "in_sample", **is_row},
+            {**info, "segment": "out_of_sample", **oos_row},
+        ],
+        "oos_returns": returns,
+        "oos_holds": holds,
+        "oos_open": open_trades,
+    }
+
+
+# ============================================
+# Walk-Forward
+# ============================================
+def run_walk_forward(
+    arrays: Dict[str, Dict[str, np.ndarray]],
+    folds: List[Fold],
+    grid: Optional[Dict[str, List]] = None,
+    workers: Optional[int] = os.cpu_count() or 1,
+    rank_by: str = "sum_return_%",
+) -> Tuple[pd.DataFrame, dict]:
+
+    groups = expand_grid(grid or {})
+
+    if workers == 0:
+        # Ohne Prozesse (Debugging)
+        _init(arrays)
+        results = [_evaluate_fold(f, groups, rank_by) for f in folds]
+    else:
+        shm, layout = pack_arrays(arrays)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=max(1, min(workers or len(folds), len(folds))),
+                initializer=_attach,
+                initargs=(shm.name, layout),
+            ) as pool:
+                futures = [pool.submit(_evaluate_fold, f, groups, rank_by) for f in folds]
+                results = [fut.result() for fut in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+
+    table = pd.DataFrame([row for r in results for row in r["rows"]])
+
+    # Alle Out-of-Sample-Trades zusammen: das eigentliche Ergebnis des Walk-Forward
+    oos_returns = np.concatenate([r["oos_returns"] for r in results]) if results else np.empty(0)
+    oos_holds = np.concatenate([r["oos_holds"] for r in results]) if results else np.empty(0)
+    summary = trade_metrics(oos_returns, oos_holds, sum(r["oos_open"] for r in results), {"folds": len(folds)})
+
+    if not table.empty:
+        ins = table[table["segment"] == "in_sample"]["avg_return_%"].mean()
+        oos = table[table["segment"] == "out_of_sample"]["avg_return_%"].mean()
+        summary["oos_is_ratio"] = float(oos / ins) if ins and not np.isnan(ins) else np.nan
+    return table, summary
+
+
+# ============================================
+# CLI
+# ============================================
+def main(argv=None):
+    from backtest_week_to_day import BACKTEST_START, EXIT_DATE, HISTORY_START, load_tickers
+    from output import write_table
+    from sweep import load_arrays
+
+    parser = argparse.ArgumentParser(description="Walk-Forward Week→Day")
+    parser.add_argument("--train-months", type=int, default=TRAIN_MONTHS)
+    parser.add_argument("--test-months", type=int, default=TEST_MONTHS)
+    parser.add_argument("--step-months", type=int, default=None, help="Standard: --test-months")
+    parser.add_argument("--anchored", action="store_true", help="In-Sample immer ab BACKTEST_START")
+    for name, default in DEFAULTS.items():
+        cast = int if name in EXIT_PARAMS else float
+        parser.add_argument(f"--{name.replace('_', '-')}", type=lambda s, c=cast: _values(s, c), default=[default])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Anzahl Prozesse (0 = ohne Prozesse)")
+    parser.add_argument("--rank-by", default="sum_return_%")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args(argv)
+
+    folds = make_folds(BACKTEST_START, EXIT_DATE, args.train_months, args.test_months, args.step_months, args.anchored)
+    if not folds:
+        print("Zeitraum zu kurz für ein Walk-Forward-Fenster.")
+        return
+
+    grid = {name: getattr(args, name) for name in DEFAULTS}
+
+    # Indikatoren einmal über die ganze Historie; Fenster schneiden nur noch zu
+    arrays, _ = load_arrays(load_tickers(), BACKTEST_START, HISTORY_START, EXIT_DATE)
+    n_combos = int(np.prod([len(v) for v in grid.values()]))
+    print(f"Walk-Forward: {len(folds)} Fenster × {n_combos} Kombinationen × {len(arrays)} Ticker")
+
+    table, summary = run_walk_forward(arrays, folds, grid, workers=args.workers, rank_by=args.rank_by)
+    path = write_table(table, args.output)
+
+    print(table.to_string(index=False))
+    print("\n===== OUT-OF-SAMPLE GESAMT =====")
+    for k, v in summary.items():
+        print(f"{k:18s} {v}")
+    print(f"\nErgebnisse gespeichert in: {path}")
+
+
+if __name__ == "__main__":
+    main()